@@ -0,0 +1,343 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gst, GLib
+
+from time import time
+import threading
+import os
+
+from lollypop.define import App, TaskPriority
+from lollypop.logger import Logger
+
+
+class Analyzer:
+    """
+        Analyze local tracks with GStreamer pipelines, results are stored
+        in DB. Tracks without results are analyzed, so analysis resumes
+        where it stopped
+        Subclasses set _PIPELINE (with a "decoder" uridecodebin), _ELEMENT,
+        _SETTING and implement _get_pending(), _read_tags() and _save().
+        They may implement _read_file_tags() to skip decoding tagged files
+    """
+    # Files analyzed at the same time
+    _PARALLEL = 2
+    __BATCH_SIZE = 50
+    # Nice value of pipelines streaming threads
+    __NICE = 19
+
+    def __init__(self):
+        """
+            Init analyzer
+        """
+        self.__running = False
+        # Tracks to analyze: [(track_id, uri)]
+        self.__pending = []
+        # Running pipelines: pipeline => (track_id, result as {})
+        self.__pipelines = {}
+        # Tracks with file tags being read
+        self.__reading = set()
+        # Results not yet in DB
+        self.__saving = 0
+        # Tracks that could not be saved, not analyzed again
+        self.__failed = set()
+        self.__analyzed = 0
+        self.__audio_duration = 0
+        self.__start_time = 0
+
+    def start(self):
+        """
+            Start analyzing tracks in background
+        """
+        if self.__running or\
+                not App().settings.get_value(self._SETTING) or\
+                Gst.ElementFactory.find(self._ELEMENT) is None:
+            return
+        self.__running = True
+        self.__analyzed = 0
+        self.__audio_duration = 0
+        self.__start_time = time()
+        self.__pending = []
+        self.__next()
+
+    def stop(self):
+        """
+            Stop analyzing, current tracks will be analyzed again
+        """
+        self.__running = False
+        for pipeline in list(self.__pipelines.keys()):
+            self.__remove_pipeline(pipeline)
+
+    @property
+    def is_running(self):
+        """
+            True if analyzing
+            @return bool
+        """
+        return self.__running
+
+    @property
+    def stats(self):
+        """
+            Get analysis throughput
+            @return (tracks analyzed as int,
+                     audio seconds analyzed as float,
+                     elapsed seconds as float)
+        """
+        return (self.__analyzed,
+                self.__audio_duration,
+                time() - self.__start_time if self.__running else 0)
+
+#######################
+# PROTECTED           #
+#######################
+    def _get_pending(self, limit):
+        """
+            Get tracks to analyze
+            @param limit as int
+            @return [(track_id as int, uri as str)]
+        """
+        return []
+
+    def _read_tags(self, result, tags):
+        """
+            Read analysis result from tags
+            @param result as {}
+            @param tags as Gst.TagList
+        """
+        pass
+
+    def _read_file_tags(self, uri):
+        """
+            Read result from file tags
+            @param uri as str
+            @return {}/None (None if file needs to be analyzed)
+            @thread safe
+        """
+        return None
+
+    def _save(self, track_id, result):
+        """
+            Save result in DB, empty result if track can't be analyzed
+            @param track_id as int
+            @param result as {}
+            @thread safe
+        """
+        pass
+
+#######################
+# PRIVATE             #
+#######################
+    def __next(self):
+        """
+            Start pipelines until enough are running
+        """
+        # Do not compete with collection scanner, restarted after scan
+        if App().scanner.is_locked():
+            self.stop()
+            return
+        while self.__running and\
+                len(self.__pipelines) + len(self.__reading) < self._PARALLEL:
+            if not self.__pending:
+                # Wait for results, DB would return these tracks again
+                if self.__saving:
+                    return
+                ignored = set(v[0] for v in self.__pipelines.values())
+                ignored |= self.__reading | self.__failed
+                self.__pending = [
+                    (track_id, uri) for (track_id, uri) in
+                    self._get_pending(self.__BATCH_SIZE + len(ignored))
+                    if track_id not in ignored]
+                if not self.__pending:
+                    if not self.__pipelines and not self.__reading:
+                        self.__on_finished()
+                    return
+            (track_id, uri) = self.__pending.pop(0)
+            self.__reading.add(track_id)
+            App().task_helper.run(self.__read_file_tags, uri,
+                                  callback=(self.__on_file_tags,
+                                            track_id, uri),
+                                  priority=TaskPriority.BULK)
+
+    def __read_file_tags(self, uri):
+        """
+            Read result from file tags
+            @param uri as str
+            @return {}/None
+        """
+        try:
+            return self._read_file_tags(uri)
+        except Exception as e:
+            Logger.error("Analyzer::__read_file_tags(): %s", e)
+        return None
+
+    def __analyze(self, track_id, uri):
+        """
+            Start analysis pipeline for track
+            @param track_id as int
+            @param uri as str
+        """
+        try:
+            pipeline = Gst.parse_launch(self._PIPELINE)
+            pipeline.get_by_name("decoder").set_property("uri", uri)
+            bus = pipeline.get_bus()
+            bus.enable_sync_message_emission()
+            bus.connect("sync-message::stream-status",
+                        self.__on_bus_sync_stream_status)
+            bus.add_signal_watch()
+            bus.connect("message::tag", self.__on_bus_message_tag, pipeline)
+            bus.connect("message::eos", self.__on_bus_eos, pipeline)
+            bus.connect("message::error", self.__on_bus_error, pipeline)
+            self.__pipelines[pipeline] = (track_id, {})
+            pipeline.set_state(Gst.State.PLAYING)
+        except Exception as e:
+            Logger.error("Analyzer::__analyze(): %s", e)
+            # Do not try this track again
+            self.__save_result(track_id, {})
+
+    def __remove_pipeline(self, pipeline):
+        """
+            Stop pipeline and forget it
+            @param pipeline as Gst.Pipeline
+            @return (track_id as int, result as {})
+        """
+        bus = pipeline.get_bus()
+        bus.remove_signal_watch()
+        bus.disable_sync_message_emission()
+        pipeline.set_state(Gst.State.NULL)
+        return self.__pipelines.pop(pipeline, None)
+
+    def __save_result(self, track_id, result):
+        """
+            Save result in background
+            @param track_id as int
+            @param result as {}
+        """
+        self.__saving += 1
+        App().task_helper.run(self.__save, track_id, result,
+                              callback=(self.__on_saved,),
+                              priority=TaskPriority.BULK)
+
+    def __save(self, track_id, result):
+        """
+            Save result
+            @param track_id as int
+            @param result as {}
+        """
+        try:
+            self._save(track_id, result)
+        except Exception as e:
+            Logger.error("Analyzer::__save(): %s", e)
+            # Do not decode this track again
+            self.__failed.add(track_id)
+            if result:
+                try:
+                    self._save(track_id, {})
+                except Exception as e:
+                    Logger.error("Analyzer::__save(): %s", e)
+
+    def __on_saved(self, result):
+        """
+            Continue analysis
+            @param result as None
+        """
+        self.__saving -= 1
+        self.__next()
+
+    def __on_finished(self):
+        """
+            Log throughput
+        """
+        self.__running = False
+        elapsed = time() - self.__start_time
+        if self.__analyzed and elapsed:
+            Logger.info("%s: %s tracks, %.1fx realtime",
+                        self.__class__.__name__, self.__analyzed,
+                        self.__audio_duration / elapsed)
+
+    def __on_file_tags(self, result, track_id, uri):
+        """
+            Save result from file tags or analyze track
+            @param result as {}/None
+            @param track_id as int
+            @param uri as str
+        """
+        self.__reading.discard(track_id)
+        if not self.__running:
+            return
+        if result is None:
+            self.__analyze(track_id, uri)
+        else:
+            self.__save_result(track_id, result)
+            self.__next()
+
+    def __on_bus_sync_stream_status(self, bus, message):
+        """
+            Run streaming threads at lowest priority, playback first
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+            @thread safe
+        """
+        (status, owner) = message.parse_stream_status()
+        if status != Gst.StreamStatusType.ENTER:
+            return
+        try:
+            # Called in streaming thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(),
+                           self.__NICE)
+        except Exception as e:
+            Logger.debug("Analyzer::__on_bus_sync_stream_status(): %s", e)
+
+    def __on_bus_message_tag(self, bus, message, pipeline):
+        """
+            Read analysis result
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+            @param pipeline as Gst.Pipeline
+        """
+        if pipeline in self.__pipelines.keys():
+            self._read_tags(self.__pipelines[pipeline][1],
+                            message.parse_tag())
+
+    def __on_bus_eos(self, bus, message, pipeline):
+        """
+            Save result and analyze next track
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+            @param pipeline as Gst.Pipeline
+        """
+        (success, duration) = pipeline.query_duration(Gst.Format.TIME)
+        v = self.__remove_pipeline(pipeline)
+        if v is None:
+            return
+        (track_id, result) = v
+        if result:
+            self.__analyzed += 1
+            if success:
+                self.__audio_duration += duration / Gst.SECOND
+        self.__save_result(track_id, result)
+        GLib.idle_add(self.__next, priority=GLib.PRIORITY_LOW)
+
+    def __on_bus_error(self, bus, message, pipeline):
+        """
+            Ignore track and analyze next one
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+            @param pipeline as Gst.Pipeline
+        """
+        Logger.info("Analyzer::__on_bus_error(): %s",
+                    message.parse_error()[1])
+        v = self.__remove_pipeline(pipeline)
+        if v is None:
+            return
+        self.__save_result(v[0], {})
+        GLib.idle_add(self.__next, priority=GLib.PRIORITY_LOW)
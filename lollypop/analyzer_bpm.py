@@ -0,0 +1,67 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gst
+
+from os import cpu_count
+
+from lollypop.analyzer import Analyzer
+from lollypop.define import App
+
+
+class BpmAnalyzer(Analyzer):
+    """
+        Compute tempo for local tracks without BPM tag
+    """
+    # Use at most a quarter of CPUs
+    _PARALLEL = max(1, (cpu_count() or 1) // 4)
+    _PIPELINE = "uridecodebin name=decoder\
+                 ! audioconvert ! audioresample\
+                 ! bpmdetect\
+                 ! fakesink sync=false"
+    _ELEMENT = "bpmdetect"
+    _SETTING = "analyze-bpm"
+
+    def __init__(self):
+        """
+            Init analyzer
+        """
+        Analyzer.__init__(self)
+
+#######################
+# PROTECTED           #
+#######################
+    def _get_pending(self, limit):
+        """
+            Get tracks without BPM
+            @param limit as int
+            @return [(int, str)]
+        """
+        return App().tracks.get_without_bpm(limit)
+
+    def _read_tags(self, result, tags):
+        """
+            Read computed BPM, last estimation is the most accurate
+            @param result as {}
+            @param tags as Gst.TagList
+        """
+        (exists, bpm) = tags.get_double(Gst.TAG_BEATS_PER_MINUTE)
+        if exists and bpm > 0:
+            result["bpm"] = bpm
+
+    def _save(self, track_id, result):
+        """
+            Save track BPM, 0 if track can't be analyzed
+            @param track_id as int
+            @param result as {}
+        """
+        App().tracks.set_bpm(track_id, round(result.get("bpm", 0)))
@@ -0,0 +1,89 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gst
+
+from lollypop.analyzer import Analyzer
+from lollypop.define import App
+from lollypop.tagreader import TagReader
+
+
+class ReplayGainAnalyzer(Analyzer):
+    """
+        Compute ReplayGain for local tracks
+    """
+    _PIPELINE = "uridecodebin name=decoder\
+                 ! audioconvert ! audioresample\
+                 ! rganalysis forced=true\
+                 ! fakesink sync=false"
+    _ELEMENT = "rganalysis"
+    _SETTING = "analyze-replaygain"
+
+    def __init__(self):
+        """
+            Init analyzer
+        """
+        Analyzer.__init__(self)
+
+#######################
+# PROTECTED           #
+#######################
+    def _get_pending(self, limit):
+        """
+            Get tracks without ReplayGain
+            @param limit as int
+            @return [(int, str)]
+        """
+        return App().tracks.get_without_replaygain(limit)
+
+    def _read_tags(self, result, tags):
+        """
+            Read computed ReplayGain
+            @param result as {}
+            @param tags as Gst.TagList
+        """
+        (exists, gain) = tags.get_double(Gst.TAG_TRACK_GAIN)
+        if exists:
+            result["gain"] = gain
+        (exists, peak) = tags.get_double(Gst.TAG_TRACK_PEAK)
+        if exists:
+            result["peak"] = peak
+
+    def _read_file_tags(self, uri):
+        """
+            Read ReplayGain tags, files indexed before analysis was added
+            have them but no value in DB
+            @param uri as str
+            @return {}/None
+        """
+        reader = TagReader()
+        tags = reader.get_info(uri).get_tags()
+        replaygain = reader.get_replaygain(tags)
+        if replaygain is None:
+            return None
+        return {"gain": replaygain[0], "peak": replaygain[1]}
+
+    def _save(self, track_id, result):
+        """
+            Save track ReplayGain, update album if all tracks analyzed
+            Gain and peak are 0 if track can't be analyzed
+            @param track_id as int
+            @param result as {}
+        """
+        if "gain" in result.keys():
+            (gain, peak) = (result["gain"], result.get("peak", None))
+        else:
+            (gain, peak) = (0.0, 0.0)
+        App().tracks.set_replaygain(track_id, gain, peak)
+        album_id = App().tracks.get_album_id(track_id)
+        if album_id is not None:
+            App().albums.update_replaygain(album_id)
@@ -13,13 +13,13 @@
 import gi
 gi.require_version("Gst", "1.0")
 gi.require_version("GstAudio", "1.0")
+gi.require_version("GstController", "1.0")
 gi.require_version("GstPbutils", "1.0")
 gi.require_version("TotemPlParser", "1.0")
 from gi.repository import Gtk, Gio, GLib, Gdk, Gst
 Gst.init(None)
 
 from threading import current_thread
-from pickle import dump
 from signal import signal, SIGINT, SIGTERM
 
 
@@ -33,7 +33,7 @@ except Exception as e:
 from lollypop.utils import set_proxy_from_gnome
 from lollypop.application_actions import ApplicationActions
 from lollypop.utils import is_audio, is_pls
-from lollypop.define import Type, LOLLYPOP_DATA_PATH, ScanType
+from lollypop.define import Type, ScanType
 from lollypop.window import Window
 from lollypop.database import Database
 from lollypop.player import Player
@@ -47,6 +47,10 @@ from lollypop.database_albums import AlbumsDatabase
 from lollypop.database_artists import ArtistsDatabase
 from lollypop.database_genres import GenresDatabase
 from lollypop.database_tracks import TracksDatabase
+from lollypop.database_stats import PlaybackStats
+from lollypop.analyzer_replaygain import ReplayGainAnalyzer
+from lollypop.analyzer_bpm import BpmAnalyzer
+from lollypop.watchdog import Watchdog
 from lollypop.notification import NotificationManager
 from lollypop.playlists import Playlists
 from lollypop.objects import Album, Track
@@ -152,6 +156,7 @@ class Application(Gtk.Application, ApplicationActions):
             Init main application
         """
         self.settings = Settings.new()
+        self.watchdog = Watchdog()
         # Mount enclosing volume as soon as possible
         uris = self.settings.get_music_uris()
         try:
@@ -183,10 +188,15 @@ class Application(Gtk.Application, ApplicationActions):
         self.player = Player()
         self.inhibitor = Inhibitor()
         self.scanner = CollectionScanner()
+        self.scanner.connect("scan-finished", self.__on_scan_finished)
         self.art = Art()
         self.notify = NotificationManager()
         self.art.update_art_size()
         self.task_helper = TaskHelper()
+        self.stats = PlaybackStats()
+        self.replaygain_analyzer = ReplayGainAnalyzer()
+        self.bpm_analyzer = BpmAnalyzer()
+        GLib.timeout_add_seconds(60, self.__start_analyzers)
         self.art_helper = ArtHelper()
         self.spotify = SpotifyHelper()
         if not self.settings.get_value("disable-mpris"):
@@ -244,13 +254,16 @@ class Application(Gtk.Application, ApplicationActions):
         else:
             self.settings.set_value("state-one-ids", GLib.Variant("ai", []))
             self.settings.set_value("state-two-ids", GLib.Variant("ai", []))
+        self.stats.flush()
+        self.replaygain_analyzer.stop()
+        self.bpm_analyzer.stop()
+        self.watchdog.stop()
         # Then vacuum db
         if vacuum:
             self.__vacuum()
             self.art.clean_web()
         self.__window.hide()
-        for scrobbler in self.scrobblers:
-            scrobbler.save()
+        TaskHelper.save_cache()
         Gio.Application.quit(self)
 
     def set_mini(self):
@@ -362,41 +375,7 @@ class Application(Gtk.Application, ApplicationActions):
         if not self.settings.get_value("save-state"):
             return
 
-        if self.player.current_track.id is None or\
-                self.player.current_track.mtime == 0:
-            track_id = None
-        elif self.player.current_track.id == Type.RADIOS:
-            from lollypop.radios import Radios
-            radios = Radios()
-            track_id = radios.get_id(
-                self.player.current_track.radio_name)
-        else:
-            track_id = self.player.current_track.id
-            # Save albums context
-            try:
-                with open(LOLLYPOP_DATA_PATH + "/Albums.bin", "wb") as f:
-                    dump(list(self.player.albums), f)
-            except Exception as e:
-                Logger.error("Application::__save_state(): %s" % e)
-        dump(track_id, open(LOLLYPOP_DATA_PATH + "/track_id.bin", "wb"))
-        dump([self.player.is_playing, self.player.is_party],
-             open(LOLLYPOP_DATA_PATH + "/player.bin", "wb"))
-        dump(self.player.queue,
-             open(LOLLYPOP_DATA_PATH + "/queue.bin", "wb"))
-        # Save current playlist
-        if self.player.current_track.id == Type.RADIOS:
-            playlist_ids = [Type.RADIOS]
-        elif not self.player.playlist_ids:
-            playlist_ids = []
-        else:
-            playlist_ids = self.player.playlist_ids
-        dump(playlist_ids,
-             open(LOLLYPOP_DATA_PATH + "/playlist_ids.bin", "wb"))
-        if self.player.current_track.id is not None:
-            position = self.player.position
-        else:
-            position = 0
-        dump(position, open(LOLLYPOP_DATA_PATH + "/position.bin", "wb"))
+        self.player.save_state()
         self.player.stop_all()
         self.__window.container.stop_all()
 
@@ -579,6 +558,21 @@ class Application(Gtk.Application, ApplicationActions):
             GLib.timeout_add(500, self.quit, True)
         return widget.hide_on_delete()
 
+    def __start_analyzers(self):
+        """
+            Analyze tracks in background
+        """
+        self.replaygain_analyzer.start()
+        self.bpm_analyzer.start()
+
+    def __on_scan_finished(self, scanner, modifications):
+        """
+            Analyze new tracks
+            @param scanner as CollectionScanner
+            @param modifications as bool
+        """
+        self.__start_analyzers()
+
     def __on_activate(self, application):
         """
             Call default handler
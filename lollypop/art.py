@@ -14,6 +14,7 @@ from lollypop.art_base import BaseArt
 from lollypop.art_album import AlbumArt
 from lollypop.art_artist import ArtistArt
 from lollypop.art_radio import RadioArt
+from lollypop.art_cache import CacheArt
 from lollypop.logger import Logger
 from lollypop.downloader_art import ArtDownloader
 from lollypop.utils import create_dir
@@ -21,7 +22,7 @@ from lollypop.utils import create_dir
 from shutil import rmtree
 
 
-class Art(BaseArt, AlbumArt, ArtistArt, RadioArt, ArtDownloader):
+class Art(BaseArt, AlbumArt, ArtistArt, RadioArt, CacheArt, ArtDownloader):
     """
         Global artwork manager
     """
@@ -34,6 +35,7 @@ class Art(BaseArt, AlbumArt, ArtistArt, RadioArt, ArtDownloader):
         AlbumArt.__init__(self)
         ArtistArt.__init__(self)
         RadioArt.__init__(self)
+        CacheArt.__init__(self)
         ArtDownloader.__init__(self)
         create_dir(self._CACHE_PATH)
         create_dir(self._STORE_PATH)
@@ -52,6 +54,7 @@ class Art(BaseArt, AlbumArt, ArtistArt, RadioArt, ArtDownloader):
         """
             Remove all covers from cache
         """
+        self._clean_blur_cache()
         try:
             from pathlib import Path
             for p in Path(self._CACHE_PATH).glob("*.jpg"):
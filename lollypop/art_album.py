@@ -12,14 +12,13 @@
 
 from gi.repository import GLib, GdkPixbuf, Gio, Gst
 
-from random import choice
-
 from lollypop.tagreader import TagReader
 from lollypop.define import App, ArtSize, ArtBehaviour
 from lollypop.objects import Album
 from lollypop.logger import Logger
 from lollypop.utils import escape, is_readonly
 from lollypop.helper_task import TaskHelper
+from lollypop.helper_embedded_art import EmbeddedArtHelper
 
 
 class AlbumArt:
@@ -175,17 +174,23 @@ class AlbumArt:
             w = width
             h = height
         cache_path_jpg = "%s/%s_%s_%s.jpg" % (self._CACHE_PATH, filename, w, h)
-        pixbuf = None
+        pixbuf = self._get_blur_from_cache(filename, width, height, behaviour)
+        if pixbuf is not None:
+            return pixbuf
         try:
             # Look in cache
             f = Gio.File.new_for_path(cache_path_jpg)
             if not behaviour & ArtBehaviour.NO_CACHE and f.query_exists():
+                self._on_cache_hit(cache_path_jpg)
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path_jpg)
                 if optimized_blur:
                     pixbuf = self.load_behaviour(pixbuf, None,
                                                  width, height, behaviour)
+                self._add_blur_to_cache(pixbuf, filename,
+                                        width, height, behaviour)
                 return pixbuf
             else:
+                self._on_cache_miss()
                 # Use favorite folder artwork
                 if pixbuf is None:
                     uri = self.get_album_artwork_uri(album)
@@ -201,12 +206,7 @@ class AlbumArt:
                 # Use tags artwork
                 if pixbuf is None and album.tracks and album.uri != "":
                     try:
-                        if behaviour & (ArtBehaviour.BLUR |
-                                        ArtBehaviour.BLUR_HARD):
-                            track = album.tracks[0]
-                        else:
-                            track = choice(album.tracks)
-                        pixbuf = self.pixbuf_from_tags(track.uri)
+                        pixbuf = self.pixbuf_from_album_tags(album)
                     except Exception as e:
                         Logger.error("AlbumArt::get_album_artwork(): %s", e)
 
@@ -227,6 +227,8 @@ class AlbumArt:
                     return None
                 pixbuf = self.load_behaviour(pixbuf, cache_path_jpg,
                                              width, height, behaviour)
+                self._add_blur_to_cache(pixbuf, filename,
+                                        width, height, behaviour)
                 return pixbuf
         except Exception as e:
             Logger.error("AlbumArt::get_album_artwork(): %s" % e)
@@ -299,6 +301,7 @@ class AlbumArt:
         try:
             from pathlib import Path
             name = self.get_album_cache_name(album)
+            self._clean_blur_cache(name)
             if width == -1 or height == -1:
                 for p in Path(self._CACHE_PATH).glob("%s*.jpg" % name):
                     p.unlink()
@@ -313,10 +316,36 @@ class AlbumArt:
         except Exception as e:
             Logger.error("AlbumArt::clean_album_cache(): %s" % e)
 
+    def pixbuf_from_album_tags(self, album):
+        """
+            Return cover from album tracks tags
+            First track with an embedded cover wins
+            @param album as Album
+            @return GdkPixbuf.Pixbuf/None
+        """
+        helper = EmbeddedArtHelper()
+        unsupported_uri = None
+        for track in album.tracks:
+            data = helper.get_data(track.uri)
+            if data is None:
+                continue
+            elif data is EmbeddedArtHelper.UNSUPPORTED:
+                if unsupported_uri is None:
+                    unsupported_uri = track.uri
+                continue
+            pixbuf = self.__pixbuf_from_data(data)
+            if pixbuf is not None:
+                return pixbuf
+        # Fallback to Discoverer for unsupported formats only
+        if unsupported_uri is not None:
+            return self.pixbuf_from_tags(unsupported_uri)
+        return None
+
     def pixbuf_from_tags(self, uri):
         """
             Return cover from tags
             @param uri as str
+            @return GdkPixbuf.Pixbuf/None
         """
         pixbuf = None
         if uri.startswith("web:"):
@@ -333,10 +362,7 @@ class AlbumArt:
             if exist:
                 (exist, mapflags) = sample.get_buffer().map(Gst.MapFlags.READ)
             if exist:
-                bytes = GLib.Bytes(mapflags.data)
-                stream = Gio.MemoryInputStream.new_from_bytes(bytes)
-                pixbuf = GdkPixbuf.Pixbuf.new_from_stream(stream, None)
-                stream.close()
+                pixbuf = self.__pixbuf_from_data(mapflags.data)
         except Exception as e:
             Logger.error("AlbumArt::pixbuf_from_tags(): %s" % e)
         return pixbuf
@@ -354,6 +380,22 @@ class AlbumArt:
 #######################
 # PRIVATE             #
 #######################
+    def __pixbuf_from_data(self, data):
+        """
+            Load pixbuf from image data
+            @param data as bytes
+            @return GdkPixbuf.Pixbuf/None
+        """
+        try:
+            bytes = GLib.Bytes(data)
+            stream = Gio.MemoryInputStream.new_from_bytes(bytes)
+            pixbuf = GdkPixbuf.Pixbuf.new_from_stream(stream, None)
+            stream.close()
+            return pixbuf
+        except Exception as e:
+            Logger.error("AlbumArt::__pixbuf_from_data(): %s" % e)
+        return None
+
     def __update_album_uri(self, album):
         """
             Check if album uri exists, update if not
@@ -112,17 +112,23 @@ class ArtistArt:
             h = height
         filename = self.get_artist_cache_name(artist)
         cache_path_jpg = "%s/%s_%s_%s.jpg" % (self._CACHE_PATH, filename, w, h)
-        pixbuf = None
+        pixbuf = self._get_blur_from_cache(filename, width, height, behaviour)
+        if pixbuf is not None:
+            return pixbuf
         try:
             # Look in cache
             f = Gio.File.new_for_path(cache_path_jpg)
             if not behaviour & ArtBehaviour.NO_CACHE and f.query_exists():
+                self._on_cache_hit(cache_path_jpg)
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path_jpg)
                 if optimized_blur:
                     pixbuf = self.load_behaviour(pixbuf, None,
                                                  width, height, behaviour)
+                self._add_blur_to_cache(pixbuf, filename,
+                                        width, height, behaviour)
                 return pixbuf
             else:
+                self._on_cache_miss()
                 (exists, path) = self.artist_artwork_exists(artist)
                 if exists:
                     try:
@@ -133,6 +139,8 @@ class ArtistArt:
                     return None
                 pixbuf = self.load_behaviour(pixbuf, cache_path_jpg,
                                              width, height, behaviour)
+                self._add_blur_to_cache(pixbuf, filename,
+                                        width, height, behaviour)
             return pixbuf
         except Exception as e:
             Logger.error("ArtistArt::get_artist_artwork(): %s" % e)
@@ -153,7 +161,9 @@ class ArtistArt:
         """
         try:
             from pathlib import Path
-            search = "%s*.jpg" % self.get_artist_cache_name(artist)
+            name = self.get_artist_cache_name(artist)
+            self._clean_blur_cache(name)
+            search = "%s*.jpg" % name
             for p in Path(self._CACHE_PATH).glob(search):
                 p.unlink()
         except Exception as e:
@@ -14,6 +14,9 @@ from gi.repository import GObject, Gio, GLib, GdkPixbuf
 
 from PIL import Image, ImageFilter
 
+from collections import OrderedDict
+from threading import Lock
+
 from lollypop.define import ArtSize, App, TAG_EDITORS, ArtBehaviour
 from lollypop.logger import Logger
 
@@ -27,6 +30,10 @@ class BaseArt(GObject.GObject):
     _STORE_PATH = GLib.get_user_data_dir() + "/lollypop/store"
     # Store for Web
     _WEB_PATH = GLib.get_user_data_dir() + "/lollypop/web_store"
+    # Gaussian radius used once pixbuf has been downscaled for blur
+    _BLUR_RADIUS = 8
+    # Max blurred pixbufs kept in memory
+    _BLUR_CACHE_SIZE = 20
     __gsignals__ = {
         "album-artwork-changed": (GObject.SignalFlags.RUN_FIRST, None, (int,)),
         "artist-artwork-changed": (GObject.SignalFlags.RUN_FIRST,
@@ -41,6 +48,8 @@ class BaseArt(GObject.GObject):
             Init base art
         """
         GObject.GObject.__init__(self)
+        self.__blur_cache = OrderedDict()
+        self.__blur_lock = Lock()
         self.__kid3_available = False
         self.__tag_editor = App().settings.get_value("tag-editor").get_string()
         self.__kid3_cli_search()
@@ -65,20 +74,11 @@ class BaseArt(GObject.GObject):
 
         # Handle blur
         if behaviour & ArtBehaviour.BLUR:
-            pixbuf = pixbuf.scale_simple(width,
-                                         height,
-                                         GdkPixbuf.InterpType.NEAREST)
-            pixbuf = self._get_blur(pixbuf, 25)
+            pixbuf = self._get_blur(pixbuf, 25, width, height)
         elif behaviour & ArtBehaviour.BLUR_HARD:
-            pixbuf = pixbuf.scale_simple(width,
-                                         height,
-                                         GdkPixbuf.InterpType.NEAREST)
-            pixbuf = self._get_blur(pixbuf, 50)
+            pixbuf = self._get_blur(pixbuf, 50, width, height)
         elif behaviour & ArtBehaviour.BLUR_MAX:
-            pixbuf = pixbuf.scale_simple(width,
-                                         height,
-                                         GdkPixbuf.InterpType.NEAREST)
-            pixbuf = self._get_blur(pixbuf, 100)
+            pixbuf = self._get_blur(pixbuf, 100, width, height)
         elif behaviour & ArtBehaviour.CROP:
             pixbuf = pixbuf.scale_simple(width,
                                          height,
@@ -212,17 +212,27 @@ class BaseArt(GObject.GObject):
                                         width,
                                         height - diff)
 
-    def _get_blur(self, pixbuf, gaussian):
+    def _get_blur(self, pixbuf, gaussian, wanted_width=-1, wanted_height=-1):
         """
             Blur surface using PIL
+            Pixbuf is downscaled first and blurred with an equivalent radius,
+            as a strong blur removes details lost by downscaling
             @param pixbuf as GdkPixbuf.Pixbuf
             @param gaussian as int
+            @param wanted_width as int
+            @param wanted_height as int
             @return GdkPixbuf.Pixbuf
         """
         if pixbuf is None:
             return None
-        width = pixbuf.get_width()
-        height = pixbuf.get_height()
+        if wanted_width == -1 or wanted_height == -1:
+            wanted_width = pixbuf.get_width()
+            wanted_height = pixbuf.get_height()
+        factor = max(1, gaussian / self._BLUR_RADIUS)
+        width = max(1, int(wanted_width / factor))
+        height = max(1, int(wanted_height / factor))
+        pixbuf = pixbuf.scale_simple(width, height,
+                                     GdkPixbuf.InterpType.BILINEAR)
         data = pixbuf.get_pixels()
         stride = pixbuf.get_rowstride()
         has_alpha = pixbuf.get_has_alpha()
@@ -234,7 +244,7 @@ class BaseArt(GObject.GObject):
             dst_row_stride = width * 3
         tmp = Image.frombytes(mode, (width, height),
                               data, "raw", mode, stride)
-        tmp = tmp.filter(ImageFilter.GaussianBlur(gaussian))
+        tmp = tmp.filter(ImageFilter.GaussianBlur(gaussian / factor))
         bytes = GLib.Bytes.new(tmp.tobytes())
         pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(bytes,
                                                  GdkPixbuf.Colorspace.RGB,
@@ -243,11 +253,75 @@ class BaseArt(GObject.GObject):
                                                  width,
                                                  height,
                                                  dst_row_stride)
+        if width != wanted_width or height != wanted_height:
+            pixbuf = pixbuf.scale_simple(wanted_width, wanted_height,
+                                         GdkPixbuf.InterpType.BILINEAR)
+        return pixbuf
+
+    def _get_blur_from_cache(self, name, width, height, behaviour):
+        """
+            Get blurred pixbuf from memory cache
+            @param name as str
+            @param width as int
+            @param height as int
+            @param behaviour as ArtBehaviour
+            @return GdkPixbuf.Pixbuf/None
+            @thread safe
+        """
+        if not self.__is_blur_cacheable(behaviour):
+            return None
+        key = (name, width, height, behaviour)
+        with self.__blur_lock:
+            pixbuf = self.__blur_cache.get(key, None)
+            if pixbuf is not None:
+                self.__blur_cache.move_to_end(key)
         return pixbuf
 
+    def _add_blur_to_cache(self, pixbuf, name, width, height, behaviour):
+        """
+            Add blurred pixbuf to memory cache
+            @param pixbuf as GdkPixbuf.Pixbuf
+            @param name as str
+            @param width as int
+            @param height as int
+            @param behaviour as ArtBehaviour
+            @thread safe
+        """
+        if pixbuf is None or not self.__is_blur_cacheable(behaviour):
+            return
+        with self.__blur_lock:
+            self.__blur_cache[(name, width, height, behaviour)] = pixbuf
+            while len(self.__blur_cache) > self._BLUR_CACHE_SIZE:
+                self.__blur_cache.popitem(False)
+
+    def _clean_blur_cache(self, name=None):
+        """
+            Remove blurred pixbufs from memory cache
+            @param name as str, None for all
+            @thread safe
+        """
+        with self.__blur_lock:
+            if name is None:
+                self.__blur_cache.clear()
+            else:
+                for key in list(self.__blur_cache.keys()):
+                    if key[0] == name:
+                        del self.__blur_cache[key]
+
 #######################
 # PRIVATE             #
 #######################
+    def __is_blur_cacheable(self, behaviour):
+        """
+            True if behaviour produces a blurred pixbuf we can keep in memory
+            @param behaviour as ArtBehaviour
+            @return bool
+        """
+        return behaviour & (ArtBehaviour.BLUR |
+                            ArtBehaviour.BLUR_HARD |
+                            ArtBehaviour.BLUR_MAX) and\
+            not behaviour & ArtBehaviour.NO_CACHE
+
     def __tag_editor_search(self, editors=TAG_EDITORS):
         """
             Search for tag editor
@@ -0,0 +1,170 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from threading import Lock
+from os import scandir, utime
+from collections import OrderedDict
+
+from lollypop.define import App, TaskPriority
+from lollypop.logger import Logger
+from lollypop.helper_task import TaskHelper
+
+
+class CacheArt:
+    """
+         Keep artwork cache under a size budget
+         Files mtime is used as last access time
+         Should be inherited by a BaseArt
+    """
+
+    # Cached albums, artists and radios artworks start with these
+    _CACHE_PREFIXES = ("@ALBUM@", "@ARTIST@", "@@")
+    # Remember this many touched artworks per session
+    _CACHE_TOUCHED_SIZE = 1000
+    # Evict down to this ratio of the budget
+    _CACHE_LOW_WATERMARK = 0.9
+
+    def __init__(self):
+        """
+            Init cache manager
+        """
+        self.__hits = 0
+        self.__misses = 0
+        self.__touched = OrderedDict()
+        self.__touched_lock = Lock()
+        self.__evict_timeout_id = None
+        self.__evict_lock = Lock()
+        self.__schedule_eviction()
+
+    def get_cache_stats(self):
+        """
+            Get cache size and hit rate
+            @return (size in bytes as int, hit rate as float)
+            @thread safe
+        """
+        size = sum([entry.stat().st_size
+                    for entry in self.__get_cache_entries()])
+        total = self.__hits + self.__misses
+        rate = self.__hits / total if total else 0
+        return (size, rate)
+
+    def evict_cache(self):
+        """
+            Remove least recently used artworks until cache fits budget
+            @thread safe
+        """
+        if not self.__evict_lock.acquire(False):
+            return
+        try:
+            budget = App().settings.get_value(
+                "cover-cache-size").get_int32() * 1024 * 1024
+            if budget <= 0:
+                return
+            entries = []
+            size = 0
+            for entry in self.__get_cache_entries():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                size += stat.st_size
+            if size <= budget:
+                return
+            wanted = budget * self._CACHE_LOW_WATERMARK
+            entries.sort()
+            for (mtime, entry_size, path) in entries:
+                if size <= wanted:
+                    break
+                try:
+                    GLib.unlink(path)
+                    with self.__touched_lock:
+                        self.__touched.pop(path, None)
+                    size -= entry_size
+                except Exception as e:
+                    Logger.error("CacheArt::evict_cache(): %s", e)
+            Logger.info("CacheArt::evict_cache(): %s left",
+                        GLib.format_size(size))
+        except Exception as e:
+            Logger.error("CacheArt::evict_cache(): %s", e)
+        finally:
+            self.__evict_lock.release()
+
+#######################
+# PROTECTED           #
+#######################
+    def _on_cache_hit(self, path):
+        """
+            Mark cached artwork as used
+            @param path as str
+            @thread safe
+        """
+        self.__hits += 1
+        # Touch once per session, enough for LRU
+        with self.__touched_lock:
+            if path in self.__touched:
+                self.__touched.move_to_end(path)
+                return
+            self.__touched[path] = True
+            if len(self.__touched) > self._CACHE_TOUCHED_SIZE:
+                self.__touched.popitem(last=False)
+        try:
+            utime(path, None)
+        except Exception as e:
+            Logger.error("CacheArt::_on_cache_hit(): %s", e)
+
+    def _on_cache_write(self):
+        """
+            New artwork cached outside of a cache miss
+            @thread safe
+        """
+        self.__schedule_eviction()
+
+    def _on_cache_miss(self):
+        """
+            Count a cache miss, new artwork may be cached
+            @thread safe
+        """
+        self.__misses += 1
+        self.__schedule_eviction()
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_cache_entries(self):
+        """
+            Get cached artworks
+            @return [os.DirEntry]
+        """
+        try:
+            return [entry for entry in scandir(self._CACHE_PATH)
+                    if entry.name.startswith(self._CACHE_PREFIXES) and
+                    entry.is_file()]
+        except Exception as e:
+            Logger.error("CacheArt::__get_cache_entries(): %s", e)
+        return []
+
+    def __schedule_eviction(self):
+        """
+            Run eviction in background once cache writes settle
+            @thread safe
+        """
+        if self.__evict_timeout_id is None:
+            self.__evict_timeout_id = GLib.timeout_add_seconds(
+                10, self.__on_evict_timeout)
+
+    def __on_evict_timeout(self):
+        """
+            Evict cache in a thread
+        """
+        self.__evict_timeout_id = None
+        helper = TaskHelper()
+        helper.run(self.evict_cache, priority=TaskPriority.BULK)
@@ -55,6 +55,7 @@ class RadioArt:
                                                   height)
             f = Gio.File.new_for_path(cache_path_png)
             if f.query_exists():
+                self._on_cache_hit(cache_path_png)
                 return cache_path_png
             else:
                 self.get_radio_artwork(name, width, height, 1)
@@ -87,10 +88,12 @@ class RadioArt:
             # Look in cache
             f = Gio.File.new_for_path(cache_path_png)
             if not behaviour & ArtBehaviour.NO_CACHE and f.query_exists():
+                self._on_cache_hit(cache_path_png)
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_path_png,
                                                                 width,
                                                                 height)
             else:
+                self._on_cache_miss()
                 filepath = self.__get_radio_art_path(name)
                 f = Gio.File.new_for_path(filepath)
                 if f.query_exists():
@@ -219,4 +222,5 @@ class RadioArt:
             pixbuf = GdkPixbuf.Pixbuf.new_from_stream(stream, None)
             stream.close()
             pixbuf.savev(cache_path_png, "png", [None], [None])
+            self._on_cache_write()
             self.emit("radio-artwork-changed", name)
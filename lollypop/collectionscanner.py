@@ -591,6 +591,7 @@ class CollectionScanner(GObject.GObject, TagReader):
         tracknumber = self.get_tracknumber(tags, name)
         track_popm = self.get_popm(tags)
         bpm = self.get_bpm(tags)
+        replaygain = self.get_replaygain(tags)
         (year, timestamp) = self.get_original_year(tags)
         if year is None:
             (year, timestamp) = self.get_year(tags)
@@ -644,4 +645,7 @@ class CollectionScanner(GObject.GObject, TagReader):
                    tracknumber, discnumber, discname, year, timestamp,
                    track_mtime, track_pop, track_rate, track_loved,
                    track_ltime, mb_track_id, bpm)
+        # Tagged tracks do not need to be analyzed
+        if replaygain is not None:
+            App().tracks.set_replaygain(track_id, *replaygain)
         return track_id
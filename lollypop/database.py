@@ -68,7 +68,9 @@ class Database:
                                               rate INT NOT NULL,
                                               loved INT NOT NULL,
                                               mtime INT NOT NULL,
-                                              synced INT NOT NULL)"""
+                                              synced INT NOT NULL,
+                                              album_gain DOUBLE,
+                                              album_peak DOUBLE)"""
     __create_artists = """CREATE TABLE artists (id INTEGER PRIMARY KEY,
                                                name TEXT NOT NULL,
                                                sortname TEXT NOT NULL,
@@ -97,7 +99,9 @@ class Database:
                                               ltime INT NOT NULL,
                                               mtime INT NOT NULL,
                                               mb_track_id TEXT,
-                                              bpm DOUBLE
+                                              bpm DOUBLE,
+                                              track_gain DOUBLE,
+                                              track_peak DOUBLE
                                               )"""
     __create_track_artists = """CREATE TABLE track_artists (
                                                 track_id INT NOT NULL,
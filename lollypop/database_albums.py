@@ -11,6 +11,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import itertools
+from math import log10
 
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, Type, OrderBy
@@ -536,6 +537,38 @@ class AlbumsDatabase:
             result = sql.execute("SELECT uri FROM albums")
             return list(itertools.chain(*result))
 
+    def update_replaygain(self, album_id):
+        """
+            Compute album ReplayGain from its tracks once all are analyzed.
+            Album gain is the duration weighted mean of track loudness,
+            album peak the highest known track peak
+            @param album_id as int
+        """
+        with SqlCursor(App().db, True) as sql:
+            result = sql.execute("SELECT track_gain, track_peak, duration\
+                                  FROM tracks WHERE album_id=?",
+                                 (album_id,))
+            power = 0
+            total = 0
+            album_peak = 0
+            for (gain, peak, duration) in list(result):
+                if gain is None:
+                    return
+                # Not analyzable
+                if gain == 0 and peak == 0:
+                    continue
+                duration = max(duration or 0, 1)
+                power += duration * 10 ** (-gain / 10)
+                total += duration
+                # Missing in gain only tags
+                if peak is not None:
+                    album_peak = max(album_peak, peak)
+            if not total:
+                return
+            album_gain = -10 * log10(power / total)
+            sql.execute("UPDATE albums SET album_gain=?, album_peak=?\
+                         WHERE rowid=?", (album_gain, album_peak, album_id))
+
     def get_tracks_count(self, album_id):
         """
             Return tracks count
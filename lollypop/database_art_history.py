@@ -0,0 +1,110 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+
+
+class ArtLookup:
+    FOUND = 0
+    NOT_FOUND = 1
+    ERROR = 2
+
+
+class ArtHistory:
+    """
+        Artwork lookups history, allow Lollypop to not query web services
+        again for already searched artworks
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/art_history.db" % __LOCAL_PATH
+    # Seconds before querying web services again
+    __TTL = {ArtLookup.FOUND: 90 * 86400,
+             ArtLookup.NOT_FOUND: 30 * 86400,
+             ArtLookup.ERROR: 3600}
+    __create_history = """CREATE TABLE history (
+                            name TEXT PRIMARY KEY,
+                            status INT NOT NULL,
+                            uri TEXT,
+                            mtime INT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init history
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_history)
+        except:
+            pass
+        # Remove expired entries
+        with SqlCursor(self, True) as sql:
+            now = int(time())
+            for (status, ttl) in self.__TTL.items():
+                sql.execute("DELETE FROM history\
+                             WHERE status=? AND mtime<?",
+                            (status, now - ttl))
+
+    def add(self, name, status, uri=None):
+        """
+            Add a lookup result to history
+            @param name as str
+            @param status as ArtLookup
+            @param uri as str
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("INSERT OR REPLACE INTO history\
+                         (name, status, uri, mtime)\
+                         VALUES (?, ?, ?, ?)",
+                        (name, status, uri, int(time())))
+
+    def get(self, name):
+        """
+            Get lookup result for name if not expired
+            @param name as str
+            @return (ArtLookup, uri as str)/None
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT status, uri, mtime\
+                                  FROM history\
+                                  WHERE name=?", (name,))
+            v = result.fetchone()
+            if v is not None:
+                (status, uri, mtime) = v
+                if mtime + self.__TTL.get(status, 0) > time():
+                    return (status, uri)
+            return None
+
+    def reset(self):
+        """
+            Remove all lookup results
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("DELETE FROM history")
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
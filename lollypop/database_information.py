@@ -0,0 +1,121 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio
+
+import sqlite3
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import LOLLYPOP_DATA_PATH
+from lollypop.logger import Logger
+
+
+class InformationDatabase:
+    """
+        Artist information downloaded from web services
+    """
+    __DB_PATH = "%s/information.db" % LOLLYPOP_DATA_PATH
+    # Seconds before refreshing information
+    __TTL = 90 * 86400
+    __TTL_EMPTY = 7 * 86400
+    __create_information = """CREATE TABLE information (
+                                name TEXT PRIMARY KEY,
+                                content BLOB,
+                                source TEXT,
+                                fetched_at INT NOT NULL)"""
+
+    def __init__(self, info_path):
+        """
+            Init database, import old text files on creation
+            @param info_path as str
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_information)
+            self.__import_files(info_path)
+        except:
+            pass
+
+    def add(self, name, content, source):
+        """
+            Add information for name
+            @param name as str
+            @param content as bytes/None
+            @param source as str/None
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("INSERT OR REPLACE INTO information\
+                         (name, content, source, fetched_at)\
+                         VALUES (?, ?, ?, ?)",
+                        (name, content, source, int(time())))
+
+    def get(self, name):
+        """
+            Get information for name
+            @param name as str
+            @return (content as bytes/None, expired as bool)/None
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT content, fetched_at\
+                                  FROM information\
+                                  WHERE name=?", (name,))
+            v = result.fetchone()
+            if v is not None:
+                (content, fetched_at) = v
+                ttl = self.__TTL if content else self.__TTL_EMPTY
+                return (content, fetched_at + ttl < time())
+            return None
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
+
+#######################
+# PRIVATE             #
+#######################
+    def __import_files(self, info_path):
+        """
+            Move information text files to database
+            @param info_path as str
+        """
+        try:
+            d = Gio.File.new_for_path(info_path)
+            infos = d.enumerate_children(
+                "standard::name,time::modified",
+                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                None)
+            with SqlCursor(self, True) as sql:
+                for info in infos:
+                    filename = info.get_name()
+                    if not filename.endswith(".txt"):
+                        continue
+                    f = infos.get_child(info)
+                    (status, content, tag) = f.load_contents()
+                    if content:
+                        mtime = info.get_attribute_uint64("time::modified")
+                        sql.execute("INSERT OR REPLACE INTO information\
+                                     (name, content, source, fetched_at)\
+                                     VALUES (?, ?, ?, ?)",
+                                    (filename[:-4], content, None, mtime))
+                    f.delete(None)
+        except Exception as e:
+            Logger.error("InformationDatabase::__import_files(): %s", e)
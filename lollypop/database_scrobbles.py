@@ -0,0 +1,156 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+import json
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import LOLLYPOP_DATA_PATH
+
+
+class ScrobblesJournal:
+    """
+        Pending scrobbles for each service, kept on disk until submitted
+    """
+    __DB_PATH = "%s/scrobbles.db" % LOLLYPOP_DATA_PATH
+    # Seconds to wait after first failure, doubled on each new failure
+    __MIN_DELAY = 60
+    __MAX_DELAY = 6 * 3600
+    __create_scrobbles = """CREATE TABLE scrobbles (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            service TEXT NOT NULL,
+                            data TEXT NOT NULL,
+                            timestamp INT NOT NULL)"""
+    __create_scrobbles_idx = """CREATE INDEX idx_scrobbles ON scrobbles(
+                                service, timestamp)"""
+    __create_backoff = """CREATE TABLE backoff (
+                            service TEXT PRIMARY KEY,
+                            failures INT NOT NULL,
+                            next_try INT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init journal
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_scrobbles)
+                sql.execute(self.__create_scrobbles_idx)
+                sql.execute(self.__create_backoff)
+        except:
+            pass
+
+    def add(self, service, data, timestamp):
+        """
+            Add a scrobble to journal
+            @param service as str
+            @param data as {}
+            @param timestamp as int
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("INSERT INTO scrobbles (service, data, timestamp)\
+                         VALUES (?, ?, ?)",
+                        (service, json.dumps(data), timestamp))
+
+    def get(self, service, limit):
+        """
+            Get oldest scrobbles for service
+            @param service as str
+            @param limit as int
+            @return [(int, {})]
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT id, data FROM scrobbles\
+                                  WHERE service=?\
+                                  ORDER BY timestamp, id LIMIT ?",
+                                 (service, limit))
+            return [(row[0], json.loads(row[1])) for row in list(result)]
+
+    def count(self, service):
+        """
+            Get pending scrobbles count for service
+            @param service as str
+            @return int
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT COUNT(*) FROM scrobbles\
+                                  WHERE service=?", (service,))
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def remove(self, ids):
+        """
+            Remove scrobbles from journal
+            @param ids as [int]
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.executemany("DELETE FROM scrobbles WHERE id=?",
+                            [(scrobble_id,) for scrobble_id in ids])
+
+    def get_next_try(self, service):
+        """
+            Get time before which service should not be contacted
+            @param service as str
+            @return int
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT next_try FROM backoff\
+                                  WHERE service=?", (service,))
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def set_failure(self, service):
+        """
+            Register a submission failure for service
+            @param service as str
+            @return delay before next try in seconds as int
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            result = sql.execute("SELECT failures FROM backoff\
+                                  WHERE service=?", (service,))
+            v = result.fetchone()
+            failures = 0 if v is None else v[0]
+            delay = min(self.__MIN_DELAY * 2 ** failures, self.__MAX_DELAY)
+            sql.execute("INSERT OR REPLACE INTO backoff\
+                         (service, failures, next_try)\
+                         VALUES (?, ?, ?)",
+                        (service, failures + 1, int(time()) + delay))
+            return delay
+
+    def set_success(self, service):
+        """
+            Reset failures for service
+            @param service as str
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("DELETE FROM backoff WHERE service=?", (service,))
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
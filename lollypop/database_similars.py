@@ -0,0 +1,99 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+import json
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import LOLLYPOP_DATA_PATH
+
+
+class SimilarsCache:
+    """
+        Similar artists found on web services, as local artist ids
+    """
+    __DB_PATH = "%s/similars.db" % LOLLYPOP_DATA_PATH
+    # Seconds before querying web services again
+    __TTL = 30 * 86400
+    __TTL_EMPTY = 86400
+    __create_similars = """CREATE TABLE similars (
+                            name TEXT PRIMARY KEY COLLATE NOCASE,
+                            artist_ids TEXT NOT NULL,
+                            mtime INT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init cache
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_similars)
+        except:
+            pass
+        # Remove expired entries
+        with SqlCursor(self, True) as sql:
+            now = int(time())
+            sql.execute("DELETE FROM similars\
+                         WHERE mtime<? OR (artist_ids='[]' AND mtime<?)",
+                        (now - self.__TTL, now - self.__TTL_EMPTY))
+
+    def add(self, name, artist_ids):
+        """
+            Add similar artists for name
+            @param name as str
+            @param artist_ids as [int]
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("INSERT OR REPLACE INTO similars\
+                         (name, artist_ids, mtime)\
+                         VALUES (?, ?, ?)",
+                        (name, json.dumps(artist_ids), int(time())))
+
+    def get(self, name):
+        """
+            Get similar artists for name if not expired
+            @param name as str
+            @return [int]/None
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT artist_ids, mtime FROM similars\
+                                  WHERE name=?", (name,))
+            v = result.fetchone()
+            if v is not None:
+                artist_ids = json.loads(v[0])
+                ttl = self.__TTL if artist_ids else self.__TTL_EMPTY
+                if v[1] + ttl > time():
+                    return artist_ids
+            return None
+
+    def get_names(self):
+        """
+            Get artist names with similar artists in cache
+            @return set(str)
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT name FROM similars")
+            return set(row[0].lower() for row in result)
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
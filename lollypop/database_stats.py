@@ -0,0 +1,181 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from threading import Lock
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App, LOLLYPOP_DATA_PATH, TaskPriority
+from lollypop.logger import Logger
+
+
+class PlaybackStats:
+    """
+        Playback statistics (popularity, listening time), buffered in
+        memory, journaled on disk in background and written to main
+        database in one transaction
+    """
+    __DB_PATH = "%s/stats.db" % LOLLYPOP_DATA_PATH
+    # Seconds between two writes to main database
+    __FLUSH_INTERVAL = 300
+    __create_pending = """CREATE TABLE pending (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            track_id INT NOT NULL,
+                            album_id INT NOT NULL,
+                            track_popularity INT NOT NULL,
+                            album_popularity INT NOT NULL,
+                            ltime INT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init statistics, write statistics left by a previous session
+        """
+        self.thread_lock = Lock()
+        self.__flush_lock = Lock()
+        # Statistics not yet in journal
+        self.__buffer = []
+        self.__buffer_lock = Lock()
+        self.__journal_task = False
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_pending)
+        except:
+            pass
+        App().task_helper.run(self.flush, priority=TaskPriority.BULK)
+        GLib.timeout_add_seconds(self.__FLUSH_INTERVAL,
+                                 self.__on_flush_timeout)
+
+    def add_popularity(self, track_id, album_id, album_popularity):
+        """
+            Increment popularity for track and album
+            @param track_id as int
+            @param album_id as int
+            @param album_popularity as int
+            @thread safe
+        """
+        self.__add(track_id, album_id, 1, album_popularity, 0)
+
+    def set_listened_at(self, track_id, time):
+        """
+            Set listening time for track
+            @param track_id as int
+            @param time as int
+            @thread safe
+        """
+        self.__add(track_id, 0, 0, 0, time)
+
+    def flush(self):
+        """
+            Write pending statistics to main database
+            @thread safe
+        """
+        self.__write_journal()
+        with self.__flush_lock:
+            try:
+                with SqlCursor(self) as sql:
+                    result = sql.execute("SELECT id, track_id, album_id,\
+                                          track_popularity, album_popularity,\
+                                          ltime FROM pending ORDER BY id")
+                    rows = list(result)
+                if not rows:
+                    return
+                tracks = {}
+                albums = {}
+                ltimes = {}
+                for (rowid, track_id, album_id,
+                     track_popularity, album_popularity, ltime) in rows:
+                    if track_popularity:
+                        tracks[track_id] = tracks.get(track_id, 0) +\
+                            track_popularity
+                    if album_popularity:
+                        albums[album_id] = albums.get(album_id, 0) +\
+                            album_popularity
+                    if ltime:
+                        ltimes[track_id] = max(ltimes.get(track_id, 0), ltime)
+                with SqlCursor(App().db, True) as sql:
+                    sql.executemany("UPDATE tracks\
+                                     SET popularity=popularity+?\
+                                     WHERE rowid=?",
+                                    [(v, k) for (k, v) in tracks.items()])
+                    sql.executemany("UPDATE albums\
+                                     SET popularity=popularity+?\
+                                     WHERE rowid=?",
+                                    [(v, k) for (k, v) in albums.items()])
+                    sql.executemany("UPDATE tracks SET ltime=?\
+                                     WHERE rowid=? AND ltime<?",
+                                    [(v, k, v) for (k, v) in ltimes.items()])
+                with SqlCursor(self, True) as sql:
+                    sql.execute("DELETE FROM pending WHERE id<=?",
+                                (rows[-1][0],))
+            except Exception as e:
+                Logger.error("PlaybackStats::flush(): %s", e)
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
+
+#######################
+# PRIVATE             #
+#######################
+    def __add(self, track_id, album_id, track_popularity,
+              album_popularity, ltime):
+        """
+            Add statistics to buffer, journal is written in background
+            @param track_id as int
+            @param album_id as int
+            @param track_popularity as int
+            @param album_popularity as int
+            @param ltime as int
+        """
+        with self.__buffer_lock:
+            self.__buffer.append((track_id, album_id, track_popularity,
+                                  album_popularity, ltime))
+            if self.__journal_task:
+                return
+            self.__journal_task = True
+        App().task_helper.run(self.__write_journal,
+                              priority=TaskPriority.BULK)
+
+    def __write_journal(self):
+        """
+            Write buffered statistics to journal
+            @thread safe
+        """
+        with self.__buffer_lock:
+            rows = self.__buffer
+            self.__buffer = []
+            self.__journal_task = False
+        if not rows:
+            return
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.executemany("INSERT INTO pending (track_id, album_id,\
+                                 track_popularity, album_popularity, ltime)\
+                                 VALUES (?, ?, ?, ?, ?)", rows)
+        except Exception as e:
+            Logger.error("PlaybackStats::__write_journal(): %s", e)
+
+    def __on_flush_timeout(self):
+        """
+            Flush statistics in background
+            @return bool
+        """
+        App().task_helper.run(self.flush, priority=TaskPriority.BULK)
+        return True
@@ -145,6 +145,87 @@ class TracksDatabase:
                 return v[0]
             return None
 
+    def get_replaygain(self, track_id):
+        """
+            Get computed ReplayGain for track
+            @param track_id as int
+            @return (track gain, track peak, album gain, album peak)
+                    as (float/None, float/None, float/None, float/None)
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT tracks.track_gain, tracks.track_peak,\
+                                  albums.album_gain, albums.album_peak\
+                                  FROM tracks, albums\
+                                  WHERE tracks.rowid=?\
+                                  AND albums.rowid=tracks.album_id",
+                                 (track_id,))
+            v = result.fetchone()
+            if v is not None:
+                return v
+            return (None, None, None, None)
+
+    def set_replaygain(self, track_id, gain, peak):
+        """
+            Set computed ReplayGain for track
+            @param track_id as int
+            @param gain as float
+            @param peak as float/None
+        """
+        with SqlCursor(App().db, True) as sql:
+            sql.execute("UPDATE tracks SET track_gain=?, track_peak=?\
+                         WHERE rowid=?", (gain, peak, track_id))
+
+    def get_without_replaygain(self, limit):
+        """
+            Get local tracks without ReplayGain, tracks scanned since
+            analysis was added get their tags values at scan
+            @param limit as int
+            @return [(int, str)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, uri FROM tracks\
+                                  WHERE track_gain IS NULL\
+                                  AND uri LIKE 'file://%'\
+                                  LIMIT ?", (limit,))
+            return list(result)
+
+    def count_without_replaygain(self):
+        """
+            Count local tracks without computed ReplayGain
+            @return int
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT COUNT(*) FROM tracks\
+                                  WHERE track_gain IS NULL\
+                                  AND uri LIKE 'file://%'")
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def set_bpm(self, track_id, bpm):
+        """
+            Set BPM for track
+            @param track_id as int
+            @param bpm as double
+        """
+        with SqlCursor(App().db, True) as sql:
+            sql.execute("UPDATE tracks SET bpm=? WHERE rowid=?",
+                        (bpm, track_id))
+
+    def get_without_bpm(self, limit):
+        """
+            Get local tracks without BPM
+            @param limit as int
+            @return [(int, str)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, uri FROM tracks\
+                                  WHERE bpm IS NULL\
+                                  AND uri LIKE 'file://%'\
+                                  LIMIT ?", (limit,))
+            return list(result)
+
     def get_id_by_basename_duration(self, basename, duration):
         """
             Get track id by basename
@@ -372,6 +453,24 @@ class TracksDatabase:
                 return v[0]
             return -1
 
+    def get_album_ids_for_tracks(self, track_ids):
+        """
+            Get album ids for track ids
+            @param track_ids as [int]
+            @return {track_id as int: album_id as int}
+        """
+        album_ids = {}
+        with SqlCursor(App().db) as sql:
+            # Stay below SQLite host parameters limit
+            for i in range(0, len(track_ids), 500):
+                chunk = track_ids[i:i + 500]
+                result = sql.execute("SELECT rowid, album_id FROM tracks\
+                                      WHERE rowid IN (%s)" %
+                                     ", ".join(["?"] * len(chunk)),
+                                     chunk)
+                album_ids.update(result)
+        return album_ids
+
     def get_mb_track_id(self, track_id):
         """
             Get MusicBrainz recording id for track id
@@ -978,30 +1077,65 @@ class TracksDatabase:
                 items += list(itertools.chain(*result))
             return items
 
-    def search_track(self, artist, title):
+    def search_track(self, artist, title, index=None):
         """
             Get track id for artist and title
             @param artist as string
             @param title as string
+            @param index as {} (see get_search_index())
             @return track id as int
         """
         artist = noaccents(artist.lower())
+        if index is not None:
+            for (track_id, artists, joined) in index.get(noaccents(title),
+                                                         []):
+                if self.__match_artist(artist, artists, joined):
+                    return track_id
+            return None
         track_ids = self.get_ids_for_name(title)
         for track_id in track_ids:
             album_id = App().tracks.get_album_id(track_id)
             artist_ids = set(App().albums.get_artist_ids(album_id)) &\
                 set(App().tracks.get_artist_ids(track_id))
-            for artist_id in artist_ids:
-                db_artist = noaccents(
-                    App().artists.get_name(artist_id).lower())
-                if artist.find(db_artist) != -1 or\
-                        db_artist.find(artist) != -1:
-                    return track_id
-            artists = ", ".join(App().tracks.get_artists(track_id)).lower()
-            if noaccents(artists) == artist:
+            artists = [noaccents(App().artists.get_name(artist_id).lower())
+                       for artist_id in artist_ids]
+            joined = ", ".join(App().tracks.get_artists(track_id)).lower()
+            if self.__match_artist(artist, artists, noaccents(joined)):
                 return track_id
         return None
 
+    def get_search_index(self):
+        """
+            Get an index for search_track(), useful for bulk searches
+            @return {folded title as str: [(track id as int,
+                     folded artists also album artists as [str],
+                     folded track artists joined as str)]}
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT tracks.rowid, tracks.name,\
+                                  artists.name,\
+                                  EXISTS(SELECT 1 FROM album_artists\
+                                  WHERE album_artists.album_id=tracks.album_id\
+                                  AND album_artists.artist_id=artists.rowid)\
+                                  FROM tracks, track_artists, artists\
+                                  WHERE track_artists.track_id=tracks.rowid\
+                                  AND track_artists.artist_id=artists.rowid\
+                                  ORDER BY tracks.rowid")
+            tracks = {}
+            for (track_id, title, artist, album_artist) in result:
+                if track_id not in tracks.keys():
+                    tracks[track_id] = (noaccents(title), [], [])
+                artist = noaccents(artist.lower())
+                tracks[track_id][2].append(artist)
+                if album_artist:
+                    tracks[track_id][1].append(artist)
+        index = {}
+        for (track_id, (title, artists, track_artists)) in tracks.items():
+            if title not in index.keys():
+                index[title] = []
+            index[title].append((track_id, artists, ", ".join(track_artists)))
+        return index
+
     def remove(self, track_id):
         """
             Remove track
@@ -1014,3 +1148,19 @@ class TracksDatabase:
                          WHERE track_id=?", (track_id,))
             sql.execute("DELETE FROM tracks\
                          WHERE rowid=?", (track_id,))
+
+#######################
+# PRIVATE             #
+#######################
+    def __match_artist(self, artist, artists, joined):
+        """
+            True if artist matches track artists
+            @param artist as str (folded)
+            @param artists as [str] (folded, album and track artists)
+            @param joined as str (folded track artists)
+            @return bool
+        """
+        for db_artist in artists:
+            if artist.find(db_artist) != -1 or db_artist.find(artist) != -1:
+                return True
+        return joined == artist
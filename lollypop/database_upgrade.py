@@ -155,6 +155,10 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
             33: "ALTER TABLE artists ADD mb_artist_id TEXT",
             34: self.__upgrade_31,
             35: "UPDATE albums SET synced=2 WHERE synced=1",
+            36: "ALTER TABLE tracks ADD track_gain DOUBLE",
+            37: "ALTER TABLE tracks ADD track_peak DOUBLE",
+            38: "ALTER TABLE albums ADD album_gain DOUBLE",
+            39: "ALTER TABLE albums ADD album_peak DOUBLE",
         }
 
 #######################
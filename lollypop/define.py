@@ -35,12 +35,25 @@ class Repeat:
     ALL = 3
 
 
+class TransitionCurve:
+    LINEAR = 0
+    SMOOTH = 1
+    EQUAL_POWER = 2
+
+
 class GstPlayFlags:
     GST_PLAY_FLAG_VIDEO = 1 << 0  # We want video output
     GST_PLAY_FLAG_AUDIO = 1 << 1  # We want audio output
     GST_PLAY_FLAG_TEXT = 1 << 3   # We want subtitle output
 
 
+class TaskPriority:
+    INTERACTIVE = 0     # User is waiting for result
+    BACKGROUND = 1      # Result expected soon
+    BULK = 2            # Long running tasks
+    DOWNLOAD = 3        # Rate limited web services loops, own workers
+
+
 class ArtBehaviour:
     NONE = 1 << 0
     ROUNDED = 1 << 1
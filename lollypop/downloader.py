@@ -10,6 +10,55 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import json
+from threading import Lock
+from time import time, sleep
+
+from lollypop.define import App
+
+
+class WebServiceError(Exception):
+    """
+        Raised when a web service fails to answer, not when nothing matched
+    """
+    pass
+
+
+class TokenBucket:
+    """
+        Rate limiter allowing short bursts
+    """
+
+    def __init__(self, rate, burst):
+        """
+            Init bucket
+            @param rate as float (tokens per second)
+            @param burst as int
+        """
+        self.__rate = rate
+        self.__burst = burst
+        self.__tokens = burst
+        self.__last = time()
+        self.__lock = Lock()
+
+    def acquire(self):
+        """
+            Wait for a token
+            @thread safe
+        """
+        while True:
+            with self.__lock:
+                now = time()
+                self.__tokens = min(self.__burst,
+                                    self.__tokens +
+                                    (now - self.__last) * self.__rate)
+                self.__last = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait = (1 - self.__tokens) / self.__rate
+            sleep(wait)
+
 
 class Downloader:
     """
@@ -31,15 +80,68 @@ class Downloader:
                     "_get_lastfm_artist_info"),
                    ("Wikipedia", None, None, None)]
 
+    # Max concurrent downloads
+    _MAX_WORKERS = 4
+
+    # Requests per second and burst allowed by each service
+    # Shared by all downloaders
+    _BUCKETS = {"AudioDB": TokenBucket(2, 2),
+                "Deezer": TokenBucket(8, 10),
+                "Spotify": TokenBucket(5, 5),
+                "Itunes": TokenBucket(0.3, 3),
+                "Last.fm": TokenBucket(4, 5)}
+
     def __init__(self):
         """
             Init downloader
         """
         pass
 
+    @staticmethod
+    def wait_for_webservice(api):
+        """
+            Wait until service rate allows a request
+            @param api as str
+            @thread safe
+        """
+        bucket = Downloader._BUCKETS.get(api, None)
+        if bucket is not None:
+            bucket.acquire()
+
 #######################
 # PROTECTED           #
 #######################
+    def _call_webservice(self, api, helper, *args):
+        """
+            Call webservice helper once service rate allows it
+            @param api as str
+            @param helper as str
+            @param *args as helper arguments
+            @return helper result
+            @thread safe
+        """
+        self.wait_for_webservice(api)
+        return getattr(self, helper)(*args)
+
+    def _load_json(self, uri, cancellable=None, helper=None):
+        """
+            Load JSON from web service
+            @param uri as str
+            @param cancellable as Gio.Cancellable
+            @param helper as TaskHelper, App().task_helper if None
+            @return decoded JSON
+            @raise WebServiceError if service failed
+            @thread safe
+        """
+        if helper is None:
+            helper = App().task_helper
+        (status, data) = helper.load_uri_content_sync(uri, cancellable)
+        if not status:
+            raise WebServiceError(uri)
+        try:
+            return json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            raise WebServiceError("%s: %s" % (uri, e))
 
 #######################
 # PRIVATE             #
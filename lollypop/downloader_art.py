@@ -14,14 +14,16 @@ from gi.repository import GLib, Soup
 
 import json
 from base64 import b64encode
+from threading import Lock
 
 from lollypop.define import App, GOOGLE_API_ID, Type, AUDIODB_CLIENT_ID
-from lollypop.define import SPOTIFY_CLIENT_ID, SPOTIFY_SECRET
+from lollypop.define import SPOTIFY_CLIENT_ID, SPOTIFY_SECRET, TaskPriority
 from lollypop.utils import get_network_available, noaccents
 from lollypop.logger import Logger
 from lollypop.objects import Album
-from lollypop.downloader import Downloader
+from lollypop.downloader import Downloader, WebServiceError
 from lollypop.helper_task import TaskHelper
+from lollypop.database_art_history import ArtHistory, ArtLookup
 
 
 class ArtDownloader(Downloader):
@@ -36,7 +38,11 @@ class ArtDownloader(Downloader):
         Downloader.__init__(self)
         self.__albums_queue = []
         self.__albums_history = []
-        self.__in_albums_download = False
+        self.__history = ArtHistory()
+        self.__albums_workers = 0
+        self.__artists_queue = []
+        self.__artists_workers = 0
+        self.__queue_lock = Lock()
         self.__cache_artists_running = False
 
     def search_album_artworks(self, artist, album, cancellable):
@@ -51,8 +57,12 @@ class ArtDownloader(Downloader):
         for (api, a_helper, helper, b_helper) in self._WEBSERVICES:
             if helper is None:
                 continue
-            method = getattr(self, helper)
-            uri = method(artist, album, cancellable)
+            try:
+                uri = self._call_webservice(api, helper,
+                                            artist, album, cancellable)
+            except WebServiceError as e:
+                Logger.info("ArtDownloader::search_album_artworks(): %s", e)
+                continue
             if uri is not None:
                 results.append((uri, api))
         GLib.idle_add(self.emit, "uri-artwork-found", results)
@@ -68,8 +78,7 @@ class ArtDownloader(Downloader):
         for (api, helper, a_helper, b_helper) in self._WEBSERVICES:
             if helper is None:
                 continue
-            method = getattr(self, helper)
-            uri = method(artist, cancellable)
+            uri = self._call_webservice(api, helper, artist, cancellable)
             if uri is not None:
                 results.append((uri, api))
         GLib.idle_add(self.emit, "uri-artwork-found", results)
@@ -82,9 +91,16 @@ class ArtDownloader(Downloader):
         if album_id in self.__albums_history or\
                 not get_network_available("DATA"):
             return
-        self.__albums_queue.append(album_id)
-        if not self.__in_albums_download:
-            App().task_helper.run(self.__cache_albums_art)
+        with self.__queue_lock:
+            if album_id in self.__albums_queue:
+                return
+            self.__albums_queue.append(album_id)
+            start = self.__albums_workers < self._MAX_WORKERS
+            if start:
+                self.__albums_workers += 1
+        if start:
+            App().task_helper.run(self.__cache_albums_art,
+                                  priority=TaskPriority.DOWNLOAD)
 
     def cache_artists_artwork(self):
         """
@@ -93,7 +109,8 @@ class ArtDownloader(Downloader):
         if self.__cache_artists_running or not get_network_available("DATA"):
             return
         self.__cache_artists_running = True
-        App().task_helper.run(self.__cache_artists_artwork)
+        App().task_helper.run(self.__cache_artists_artwork,
+                              priority=TaskPriority.DOWNLOAD)
 
     def search_artwork_from_google(self, search, cancellable):
         """
@@ -136,6 +153,7 @@ class ArtDownloader(Downloader):
             Reset download history
         """
         self.__albums_history = []
+        self.__history.reset()
 
 #######################
 # PROTECTED           #
@@ -206,6 +224,7 @@ class ArtDownloader(Downloader):
             @param album as str
             @param cancellable as Gio.Cancellable
             @return uri as str
+            @raise WebServiceError
             @tread safe
         """
         if not get_network_available("DEEZER"):
@@ -214,16 +233,14 @@ class ArtDownloader(Downloader):
             album_formated = GLib.uri_escape_string(album, None, True)
             uri = "https://api.deezer.com/search/album/?" +\
                   "q=%s&output=json" % album_formated
-            (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
-            if status:
-                decode = json.loads(data.decode("utf-8"))
-                uri = None
-                for item in decode["data"]:
-                    if noaccents(item["artist"]["name"].lower()) ==\
-                            noaccents(artist.lower()):
-                        uri = item["cover_xl"]
-                        return uri
+            decode = self._load_json(uri, cancellable)
+            for item in decode["data"]:
+                if noaccents(item["artist"]["name"].lower()) ==\
+                        noaccents(artist.lower()):
+                    uri = item["cover_xl"]
+                    return uri
+        except WebServiceError:
+            raise
         except Exception as e:
             Logger.error("ArtDownloader::__get_deezer_album_artwork_uri: %s"
                          % e)
@@ -236,6 +253,7 @@ class ArtDownloader(Downloader):
             @param album as str
             @param cancellable as Gio.Cancellable
             @return uri as str
+            @raise WebServiceError
             @tread safe
         """
         if not get_network_available("SPOTIFY"):
@@ -243,6 +261,8 @@ class ArtDownloader(Downloader):
         artists_spotify_ids = []
         try:
             token = self.__get_spotify_token(cancellable)
+            if not token:
+                raise WebServiceError("Spotify token")
             artist_formated = GLib.uri_escape_string(
                 artist, None, True).replace(" ", "+")
             uri = "https://api.spotify.com/v1/search?q=%s" % artist_formated +\
@@ -250,23 +270,20 @@ class ArtDownloader(Downloader):
             token = "Bearer %s" % token
             helper = TaskHelper()
             helper.add_header("Authorization", token)
-            (status, data) = helper.load_uri_content_sync(uri, cancellable)
-            if status:
-                decode = json.loads(data.decode("utf-8"))
-                for item in decode["artists"]["items"]:
-                    artists_spotify_ids.append(item["id"])
+            decode = self._load_json(uri, cancellable, helper)
+            for item in decode["artists"]["items"]:
+                artists_spotify_ids.append(item["id"])
 
             for artist_spotify_id in artists_spotify_ids:
                 uri = "https://api.spotify.com/v1/artists/" +\
                       "%s/albums" % artist_spotify_id
-                (status, data) = helper.load_uri_content_sync(uri, cancellable)
-                if status:
-                    decode = json.loads(data.decode("utf-8"))
-                    uri = None
-                    for item in decode["items"]:
-                        if noaccents(item["name"].lower()) ==\
-                                noaccents(album.lower()):
-                            return item["images"][0]["url"]
+                decode = self._load_json(uri, cancellable, helper)
+                for item in decode["items"]:
+                    if noaccents(item["name"].lower()) ==\
+                            noaccents(album.lower()):
+                        return item["images"][0]["url"]
+        except WebServiceError:
+            raise
         except Exception as e:
             Logger.error("ArtDownloader::_get_album_art_spotify_uri: %s" % e)
         return None
@@ -278,6 +295,7 @@ class ArtDownloader(Downloader):
             @param album as str
             @param cancellable as Gio.Cancellable
             @return uri as str
+            @raise WebServiceError
             @tread safe
         """
         if not get_network_available("ITUNES"):
@@ -287,16 +305,15 @@ class ArtDownloader(Downloader):
                 album, None, True).replace(" ", "+")
             uri = "https://itunes.apple.com/search" +\
                   "?entity=album&term=%s" % album_formated
-            (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
-            if status:
-                decode = json.loads(data.decode("utf-8"))
-                for item in decode["results"]:
-                    if noaccents(item["artistName"].lower()) ==\
-                            noaccents(artist.lower()):
-                        uri = item["artworkUrl60"].replace("60x60",
-                                                           "1024x1024")
-                        return uri
+            decode = self._load_json(uri, cancellable)
+            for item in decode["results"]:
+                if noaccents(item["artistName"].lower()) ==\
+                        noaccents(artist.lower()):
+                    uri = item["artworkUrl60"].replace("60x60",
+                                                       "1024x1024")
+                    return uri
+        except WebServiceError:
+            raise
         except Exception as e:
             Logger.error("ArtDownloader::_get_album_art_itunes_uri: %s"
                          % e)
@@ -309,6 +326,7 @@ class ArtDownloader(Downloader):
             @param album as str
             @param cancellable as Gio.Cancellable
             @return uri as str
+            @raise WebServiceError
             @thread safe
         """
         if not get_network_available("AUDIODB"):
@@ -320,14 +338,13 @@ class ArtDownloader(Downloader):
             uri += "%s/searchalbum.php?s=%s&a=%s" % (AUDIODB_CLIENT_ID,
                                                      artist,
                                                      album)
-            (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
-            if status:
-                decode = json.loads(data.decode("utf-8"))
-                if decode["album"]:
-                    for item in decode["album"]:
-                        uri = item["strAlbumThumb"]
-                        return uri
+            decode = self._load_json(uri, cancellable)
+            if decode["album"]:
+                for item in decode["album"]:
+                    uri = item["strAlbumThumb"]
+                    return uri
+        except WebServiceError:
+            raise
         except Exception as e:
             Logger.error("ArtDownloader::_get_audiodb_album_artwork_uri: %s"
                          % e)
@@ -369,18 +386,23 @@ class ArtDownloader(Downloader):
             @param album as str
             @param cancellable as Gio.Cancellable
             @return uri as str
+            @raise WebServiceError
             @tread safe
         """
         if not get_network_available("LASTFM"):
             return None
         if App().lastfm is not None:
+            from pylast import WSError
             try:
                 last_album = App().lastfm.get_album(artist, album)
                 uri = last_album.get_cover_image(4)
                 return uri
-            except Exception as e:
+            # Service answered, album not found
+            except WSError as e:
                 Logger.error("ArtDownloader::_get_album_art_lastfm_uri: %s"
                              % e)
+            except Exception as e:
+                raise WebServiceError(e)
         return None
 
 #######################
@@ -397,9 +419,10 @@ class ArtDownloader(Downloader):
             credentials = "%s:%s" % (SPOTIFY_CLIENT_ID, SPOTIFY_SECRET)
             encoded = b64encode(credentials.encode("utf-8"))
             credentials = encoded.decode("utf-8")
-            session = Soup.Session.new()
+            session = TaskHelper.get_session("spotify")
             data = {"grant_type": "client_credentials"}
-            msg = Soup.form_request_new_from_hash("POST", token_uri, data)
+            msg = Soup.form_request_new_from_hash(
+                "POST", TaskHelper.get_web_service_uri(token_uri), data)
             msg.request_headers.append("Authorization",
                                        "Basic %s" % credentials)
             status = session.send_message(msg)
@@ -415,16 +438,38 @@ class ArtDownloader(Downloader):
         """
             Cache artwork for all artists
         """
-        # Then cache for lastfm/spotify/deezer/...
-        for (artist_id, artist, sort) in App().artists.get([]):
-            if App().art.artist_artwork_exists(artist)[0]:
-                continue
+        artists = [artist for (artist_id, artist, sort)
+                   in App().artists.get([])
+                   if not App().art.artist_artwork_exists(artist)[0]]
+        with self.__queue_lock:
+            self.__artists_queue = artists
+            workers = min(self._MAX_WORKERS, len(artists))
+            self.__artists_workers = workers
+        if workers == 0:
+            self.__cache_artists_running = False
+        for i in range(0, workers):
+            App().task_helper.run(self.__cache_artists_art,
+                                  priority=TaskPriority.DOWNLOAD)
+
+    def __cache_artists_art(self):
+        """
+            Cache artists artwork (from queue)
+            @thread safe
+        """
+        while True:
+            with self.__queue_lock:
+                if not self.__artists_queue:
+                    self.__artists_workers -= 1
+                    if self.__artists_workers == 0:
+                        self.__cache_artists_running = False
+                    return
+                artist = self.__artists_queue.pop(0)
+            # Then cache for lastfm/spotify/deezer/...
             for (api, helper, a_helper, b_helper) in self._WEBSERVICES:
                 if helper is None:
                     continue
                 try:
-                    method = getattr(self, helper)
-                    uri = method(artist)
+                    uri = self._call_webservice(api, helper, artist)
                     if uri is not None:
                         (status,
                          data) = App().task_helper.load_uri_content_sync(uri,
@@ -434,44 +479,75 @@ class ArtDownloader(Downloader):
                             break
                 except Exception as e:
                     Logger.error(
-                        "ArtDownloader::__cache_artists_artwork(): %s" % e)
+                        "ArtDownloader::__cache_artists_art(): %s" % e)
                     App().art.add_artist_artwork(artist, None)
-        self.__cache_artists_running = False
 
     def __cache_albums_art(self):
         """
             Cache albums artwork (from queue)
             @thread safe
         """
-        self.__in_albums_download = True
-        try:
-            while self.__albums_queue:
+        while True:
+            with self.__queue_lock:
+                if not self.__albums_queue:
+                    self.__albums_workers -= 1
+                    return
                 album_id = self.__albums_queue.pop()
-                album = App().albums.get_name(album_id)
-                artist_ids = App().albums.get_artist_ids(album_id)
-                is_compilation = artist_ids and\
-                    artist_ids[0] == Type.COMPILATIONS
-                if is_compilation:
-                    artist = ""
-                else:
-                    artist = ", ".join(App().albums.get_artists(album_id))
-                for (api, a_helper, helper, b_helper) in self._WEBSERVICES:
-                    if helper is None:
-                        continue
-                    method = getattr(self, helper)
-                    uri = method(artist, album)
-                    if uri is not None:
-                        (status,
-                         data) = App().task_helper.load_uri_content_sync(uri,
-                                                                         None)
-                        if status:
-                            self.__albums_history.append(album_id)
-                            App().art.save_album_artwork(data, Album(album_id))
-                            break
-        except Exception as e:
-            Logger.error("ArtDownloader::__cache_albums_art: %s" % e)
-        self.__albums_history.append(album_id)
-        self.__in_albums_download = False
+            self.__albums_history.append(album_id)
+            try:
+                self.__cache_album_art(album_id)
+            except Exception as e:
+                Logger.error("ArtDownloader::__cache_albums_art: %s" % e)
+
+    def __cache_album_art(self, album_id):
+        """
+            Cache album artwork, services are tried in order
+            Previous lookups are used to skip web services
+            @param album_id as int
+            @thread safe
+        """
+        name = self.get_album_cache_name(Album(album_id))
+        lookup = self.__history.get(name)
+        if lookup is not None:
+            (status, uri) = lookup
+            if status != ArtLookup.FOUND:
+                return
+            (status, data) = App().task_helper.load_uri_content_sync(uri,
+                                                                     None)
+            if status:
+                App().art.save_album_artwork(data, Album(album_id))
+                return
+        album = App().albums.get_name(album_id)
+        artist_ids = App().albums.get_artist_ids(album_id)
+        is_compilation = artist_ids and\
+            artist_ids[0] == Type.COMPILATIONS
+        if is_compilation:
+            artist = ""
+        else:
+            artist = ", ".join(App().albums.get_artists(album_id))
+        # Not found only if all services answered
+        lookup = ArtLookup.NOT_FOUND
+        for (api, a_helper, helper, b_helper) in self._WEBSERVICES:
+            if helper is None:
+                continue
+            try:
+                uri = self._call_webservice(api, helper, artist, album)
+            except WebServiceError as e:
+                Logger.info("ArtDownloader::__cache_album_art(): %s", e)
+                lookup = ArtLookup.ERROR
+                continue
+            if uri is not None:
+                (status,
+                 data) = App().task_helper.load_uri_content_sync(uri, None)
+                if status:
+                    self.__history.add(name, ArtLookup.FOUND, uri)
+                    App().art.save_album_artwork(data, Album(album_id))
+                    return
+                lookup = ArtLookup.ERROR
+        # Network lost while searching, not a real result
+        if not get_network_available("DATA"):
+            lookup = ArtLookup.ERROR
+        self.__history.add(name, lookup)
 
     def __on_load_google_content(self, uri, loaded, content):
         """
@@ -15,7 +15,7 @@ from gi.repository import GLib
 import json
 from locale import getdefaultlocale
 
-from lollypop.define import App, AUDIODB_CLIENT_ID
+from lollypop.define import App, AUDIODB_CLIENT_ID, TaskPriority
 from lollypop.utils import get_network_available
 from lollypop.logger import Logger
 from lollypop.downloader import Downloader
@@ -99,11 +99,21 @@ class InfoDownloader(Downloader):
             Cache info for artist
             @param artist as str
         """
-        if not get_network_available("DATA"):
+        if not get_network_available("DATA") or self.has_information(artist):
             self.emit("artist-info-changed", artist)
             return
         App().task_helper.run(self.__cache_artist_info, artist)
 
+    def cache_artists_info(self, artists):
+        """
+            Cache info for artists without information or with expired one
+            @param artists as [str]
+            @thread safe
+        """
+        if get_network_available("DATA"):
+            App().task_helper.run(self.__cache_artists_info, artists,
+                                  priority=TaskPriority.DOWNLOAD)
+
 #######################
 # PROTECTED           #
 #######################
@@ -151,30 +161,41 @@ class InfoDownloader(Downloader):
 #######################
 # PRIVATE             #
 #######################
+    def __cache_artists_info(self, artists):
+        """
+            Cache artists information
+            @param artists as [str]
+        """
+        for artist in artists:
+            if not self.has_information(artist):
+                self.__cache_artist_info(artist)
+
     def __cache_artist_info(self, artist):
         """
             Cache artist information
             @param artist as str
         """
         content = None
+        source = None
         try:
             if get_network_available("WIKIPEDIA"):
                 wikipedia = Wikipedia()
                 content = wikipedia.get_content(artist)
+                source = "Wikipedia"
             else:
                 for (api, a_helper, ar_helper, helper) in self._WEBSERVICES:
                     if helper is None:
                         continue
                     try:
-                        method = getattr(self, helper)
-                        content = method(artist)
+                        content = self._call_webservice(api, helper, artist)
                         if content is not None:
+                            source = api
                             break
                     except Exception as e:
                         Logger.error(
                             "InfoDownloader::__cache_artists_artwork(): %s"
                             % e)
-            self.save_artist_information(artist, content)
+            self.save_artist_information(artist, content, source)
         except Exception as e:
             Logger.info("InfoDownloader::__cache_artist_info(): %s" % e)
         GLib.idle_add(self.emit, "artist-info-changed", artist)
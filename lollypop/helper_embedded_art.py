@@ -0,0 +1,395 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from base64 import b64decode
+from struct import unpack
+
+from lollypop.logger import Logger
+
+
+class EmbeddedArtHelper:
+    """
+        Extract embedded artwork without decoding the whole file
+        Supported containers: ID3v2 (APIC/PIC), FLAC (PICTURE),
+        Ogg Vorbis/Opus (METADATA_BLOCK_PICTURE), MP4 (covr), each one
+        may be prefixed with ID3v2 tags
+        get_data() returns UNSUPPORTED when files need a full decode
+    """
+    # Returned for files that can't be parsed here
+    UNSUPPORTED = object()
+
+    # ID3 APIC picture type for front cover
+    _FRONT_COVER = 3
+    # Never read more than this for a comment header/picture
+    _MAX_SIZE = 16 * 1024 * 1024
+    # Ogg comment header should be in first pages
+    _MAX_OGG_PAGES = 512
+    # MP4 containers holding covr
+    _MP4_CONTAINERS = [b"moov", b"udta", b"meta", b"ilst", b"covr"]
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        pass
+
+    def get_data(self, uri):
+        """
+            Get embedded artwork data for uri
+            @param uri as str
+            @return bytes/None/UNSUPPORTED
+        """
+        if not uri.startswith("file:"):
+            return self.UNSUPPORTED
+        try:
+            path = GLib.filename_from_uri(uri)[0]
+            with open(path, "rb") as f:
+                return self.get_data_from_stream(f)
+        except Exception as e:
+            Logger.error("EmbeddedArtHelper::get_data(): %s, %s", e, uri)
+        return self.UNSUPPORTED
+
+    def get_data_from_stream(self, f):
+        """
+            Get embedded artwork data from a seekable binary stream
+            @param f as io.BufferedReader
+            @return bytes/None/UNSUPPORTED
+        """
+        return self.__get_data(f, 0)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_data(self, f, start):
+        """
+            Get embedded artwork data from stream position
+            @param f as io.BufferedReader
+            @param start as int
+            @return bytes/None/UNSUPPORTED
+        """
+        f.seek(start)
+        magic = f.read(12)
+        f.seek(start)
+        if magic[0:3] == b"ID3":
+            data = self.__get_id3(f, start)
+            if data is not None:
+                return data
+            # No picture, continue with data after tag, FLAC files may
+            # start with an ID3v2 tag
+            end = start + 10 + self.__syncsafe(magic[6:10])
+            # ID3v2.4 footer
+            if magic[3] == 4 and magic[5] & 0x10:
+                end += 10
+            return self.__get_data(f, end)
+        elif magic[0:4] == b"fLaC":
+            return self.__get_flac(f)
+        elif magic[0:4] == b"OggS":
+            return self.__get_ogg(f)
+        elif magic[4:8] == b"ftyp":
+            return self.__get_mp4(f, -1, 0)
+        # End of file or MPEG audio frames, no other tags
+        elif not magic or (magic[0:1] == b"\xff" and
+                           magic[1:2] >= b"\xe0"):
+            return None
+        return self.UNSUPPORTED
+
+    def __syncsafe(self, data):
+        """
+            Decode a syncsafe integer
+            @param data as bytes
+            @return int
+        """
+        value = 0
+        for byte in data:
+            value = (value << 7) | (byte & 0x7f)
+        return value
+
+    def __skip_string(self, data, offset, encoding):
+        """
+            Get offset after a null terminated string
+            @param data as bytes
+            @param offset as int
+            @param encoding as int (ID3 text encoding)
+            @return int
+        """
+        if encoding in [1, 2]:
+            while offset + 1 < len(data):
+                if data[offset:offset + 2] == b"\x00\x00":
+                    return offset + 2
+                offset += 2
+            return len(data)
+        index = data.find(b"\x00", offset)
+        return len(data) if index == -1 else index + 1
+
+    def __get_id3_frame_data(self, frame, version, flags):
+        """
+            Remove ID3v2.3/ID3v2.4 frame format from frame data
+            @param frame as bytes
+            @param version as int
+            @param flags as int (second frame flags byte)
+            @return bytes/None if frame needs a full decode
+        """
+        if version == 3:
+            # Compression, encryption
+            if flags & 0xc0:
+                return None
+            # Group identifier
+            if flags & 0x20:
+                frame = frame[1:]
+        else:
+            # Compression, encryption
+            if flags & 0x0c:
+                return None
+            # Group identifier
+            if flags & 0x40:
+                frame = frame[1:]
+            # Data length indicator
+            if flags & 0x01:
+                frame = frame[4:]
+            # Unsynchronisation
+            if flags & 0x02:
+                frame = frame.replace(b"\xff\x00", b"\xff")
+        return frame
+
+    def __get_id3(self, f, start):
+        """
+            Get APIC/PIC data, front cover first
+            @param f as io.BufferedReader
+            @param start as int (tag position)
+            @return bytes/None/UNSUPPORTED
+        """
+        header = f.read(10)
+        version = header[3]
+        flags = header[5]
+        tag_size = self.__syncsafe(header[6:10])
+        # ID3v2.2/ID3v2.3 unsynchronised tags need a full decode
+        # ID3v2.4 sets unsynchronisation on each frame
+        if (flags & 0x80 and version != 4) or version not in [2, 3, 4]:
+            return self.UNSUPPORTED
+        position = start + 10
+        end = position + tag_size
+        if flags & 0x40 and version != 2:
+            extended = f.read(4)
+            if version == 4:
+                extended_size = self.__syncsafe(extended)
+            else:
+                extended_size = unpack(">I", extended)[0] + 4
+            position += extended_size
+            f.seek(position)
+        frame_header_size = 6 if version == 2 else 10
+        found = None
+        skipped = False
+        while position + frame_header_size <= end:
+            frame_header = f.read(frame_header_size)
+            if version == 2:
+                frame_id = frame_header[0:3]
+                size = unpack(">I", b"\x00" + frame_header[3:6])[0]
+            else:
+                frame_id = frame_header[0:4]
+                if version == 4:
+                    size = self.__syncsafe(frame_header[4:8])
+                else:
+                    size = unpack(">I", frame_header[4:8])[0]
+            # Padding
+            if not frame_id.strip(b"\x00") or size == 0:
+                break
+            position += frame_header_size + size
+            if frame_id not in [b"APIC", b"PIC"] or size > self._MAX_SIZE:
+                f.seek(position)
+                continue
+            frame = f.read(size)
+            if version != 2:
+                frame = self.__get_id3_frame_data(frame, version,
+                                                  frame_header[9])
+                if not frame:
+                    skipped = skipped or frame is None
+                    continue
+            encoding = frame[0]
+            if version == 2:
+                # Fixed 3 bytes image format
+                offset = 4
+            else:
+                offset = self.__skip_string(frame, 1, 0)
+            picture_type = frame[offset] if offset < len(frame) else 0
+            offset = self.__skip_string(frame, offset + 1, encoding)
+            data = frame[offset:]
+            if not data:
+                continue
+            if picture_type == self._FRONT_COVER:
+                return data
+            elif found is None:
+                found = data
+        if found is None and skipped:
+            return self.UNSUPPORTED
+        return found
+
+    def __get_picture_block(self, data):
+        """
+            Get image data from a FLAC PICTURE block
+            @param data as bytes
+            @return (picture type as int, data as bytes)
+        """
+        picture_type = unpack(">I", data[0:4])[0]
+        offset = 4
+        mime_size = unpack(">I", data[offset:offset + 4])[0]
+        offset += 4 + mime_size
+        description_size = unpack(">I", data[offset:offset + 4])[0]
+        # Skip description, width, height, depth and colors
+        offset += 4 + description_size + 16
+        size = unpack(">I", data[offset:offset + 4])[0]
+        offset += 4
+        return (picture_type, data[offset:offset + size])
+
+    def __get_flac(self, f):
+        """
+            Get PICTURE block data, front cover first
+            @param f as io.BufferedReader
+            @return bytes/None
+        """
+        f.seek(4, 1)
+        found = None
+        last = False
+        while not last:
+            header = f.read(4)
+            if len(header) != 4:
+                break
+            last = header[0] & 0x80
+            block_type = header[0] & 0x7f
+            size = unpack(">I", b"\x00" + header[1:4])[0]
+            if block_type != 6 or size > self._MAX_SIZE:
+                f.seek(size, 1)
+                continue
+            (picture_type, data) = self.__get_picture_block(f.read(size))
+            if picture_type == self._FRONT_COVER:
+                return data
+            elif found is None:
+                found = data
+        return found
+
+    def __get_ogg_comment_packet(self, f):
+        """
+            Get second packet of first Ogg logical stream
+            @param f as io.BufferedReader
+            @return bytes/None
+        """
+        packets = []
+        packet = bytearray()
+        serial = None
+        for i in range(0, self._MAX_OGG_PAGES):
+            header = f.read(27)
+            if len(header) != 27 or header[0:4] != b"OggS":
+                return None
+            page_serial = header[14:18]
+            segments = f.read(header[26])
+            size = sum(segments)
+            if serial is None:
+                serial = page_serial
+            elif page_serial != serial:
+                f.seek(size, 1)
+                continue
+            body = f.read(size)
+            offset = 0
+            for segment in segments:
+                packet += body[offset:offset + segment]
+                offset += segment
+                if segment < 255:
+                    packets.append(bytes(packet))
+                    packet = bytearray()
+                    if len(packets) == 2:
+                        return packets[1]
+            if len(packet) > self._MAX_SIZE:
+                return None
+        return None
+
+    def __get_ogg(self, f):
+        """
+            Get METADATA_BLOCK_PICTURE data, front cover first
+            @param f as io.BufferedReader
+            @return bytes/None/UNSUPPORTED
+        """
+        packet = self.__get_ogg_comment_packet(f)
+        if packet is None:
+            return self.UNSUPPORTED
+        if packet.startswith(b"\x03vorbis"):
+            offset = 7
+        elif packet.startswith(b"OpusTags"):
+            offset = 8
+        else:
+            return self.UNSUPPORTED
+        vendor_size = unpack("<I", packet[offset:offset + 4])[0]
+        offset += 4 + vendor_size
+        count = unpack("<I", packet[offset:offset + 4])[0]
+        offset += 4
+        found = None
+        for i in range(0, count):
+            size = unpack("<I", packet[offset:offset + 4])[0]
+            offset += 4
+            comment = packet[offset:offset + size]
+            offset += size
+            (key, sep, value) = comment.partition(b"=")
+            key = key.upper()
+            if key == b"METADATA_BLOCK_PICTURE":
+                (picture_type, data) = self.__get_picture_block(
+                    b64decode(value))
+                if picture_type == self._FRONT_COVER:
+                    return data
+                elif found is None:
+                    found = data
+            elif key == b"COVERART" and found is None:
+                found = b64decode(value)
+        return found
+
+    def __get_mp4(self, f, end, depth):
+        """
+            Walk MP4 atoms down to covr data
+            @param f as io.BufferedReader
+            @param end as int (-1 for end of file)
+            @param depth as int
+            @return bytes/None
+        """
+        while end == -1 or f.tell() + 8 <= end:
+            start = f.tell()
+            header = f.read(8)
+            if len(header) != 8:
+                return None
+            size = unpack(">I", header[0:4])[0]
+            atom = header[4:8]
+            header_size = 8
+            if size == 1:
+                size = unpack(">Q", f.read(8))[0]
+                header_size = 16
+            elif size == 0:
+                if end == -1:
+                    return None
+                size = end - start
+            if size < header_size:
+                return None
+            atom_end = start + size
+            if depth < len(self._MP4_CONTAINERS) and\
+                    atom == self._MP4_CONTAINERS[depth]:
+                # meta is a full box: skip version and flags
+                if atom == b"meta":
+                    f.seek(4, 1)
+                data = self.__get_mp4(f, atom_end, depth + 1)
+                if data is not None:
+                    return data
+            elif depth == len(self._MP4_CONTAINERS) and atom == b"data":
+                data_size = size - header_size - 8
+                if data_size > self._MAX_SIZE:
+                    return None
+                # Skip type and locale
+                f.seek(8, 1)
+                return f.read(data_size)
+            f.seek(atom_end)
+        return None
@@ -12,6 +12,10 @@
 
 from gi.repository import Gio
 
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+
 from lollypop.logger import Logger
 
 
@@ -20,11 +24,20 @@ class SyncLyricsHelper:
         Sync lyrics helper
     """
 
+    # Parsed lyrics for last tracks: uri => (timestamps, lyrics)
+    __CACHE = OrderedDict()
+    __CACHE_LOCK = Lock()
+    __CACHE_SIZE = 20
+    # Lines shown before and after current line
+    __PREVIOUS = 4
+    __NEXT = 5
+
     def __init__(self):
         """
             Init helper
         """
-        self.__timestamps = {}
+        self.__timestamps = []
+        self.__lyrics = []
 
     def load(self, track):
         """
@@ -32,11 +45,16 @@ class SyncLyricsHelper:
             @param track as Track
         """
         self.__track = track
-        self.__timestamps = {}
+        with self.__CACHE_LOCK:
+            if track.uri in self.__CACHE.keys():
+                self.__CACHE.move_to_end(track.uri)
+                (self.__timestamps, self.__lyrics) = self.__CACHE[track.uri]
+                return
+        timestamps = {}
         uri_no_ext = ".".join(track.uri.split(".")[:-1])
         self.__lrc_file = Gio.File.new_for_uri(uri_no_ext + ".lrc")
         if self.__lrc_file.query_exists():
-            self.__get_timestamps()
+            timestamps = self.__get_timestamps()
         else:
             from lollypop.tagreader import TagReader
             reader = TagReader()
@@ -47,7 +65,21 @@ class SyncLyricsHelper:
             if info is not None:
                 tags = info.get_tags()
                 for (lyrics, timestamp) in reader.get_synced_lyrics(tags):
-                    self.__timestamps[timestamp] = lyrics
+                    timestamps[timestamp] = lyrics
+        self.__timestamps = sorted(timestamps.keys())
+        self.__lyrics = [timestamps[key] for key in self.__timestamps]
+        with self.__CACHE_LOCK:
+            self.__CACHE[track.uri] = (self.__timestamps, self.__lyrics)
+            if len(self.__CACHE) > self.__CACHE_SIZE:
+                self.__CACHE.popitem(last=False)
+
+    def get_index_for_timestamp(self, timestamp):
+        """
+            Get current line index for timestamp
+            @param timestamp as int
+            @return int (-1 before first line)
+        """
+        return bisect_left(self.__timestamps, timestamp) - 1
 
     def get_lyrics_for_timestamp(self, timestamp):
         """
@@ -55,24 +87,12 @@ class SyncLyricsHelper:
             @param timestamp as int
             @return ([str], str, [str])
         """
-        previous = []
-        next = []
-        current = None
-        for key in self.__timestamps.keys():
-            if timestamp > key and current is None:
-                if len(previous) == 5:
-                    previous.pop(0)
-                previous.append(self.__timestamps[key])
-            elif current is None and previous:
-                current = previous.pop(-1)
-                next.append(self.__timestamps[key])
-            elif timestamp < key and len(next) != 5:
-                next.append(self.__timestamps[key])
-            else:
-                break
-        if current is None:
-            current = ""
-        return (previous, [" ", current, " "], next)
+        index = self.get_index_for_timestamp(timestamp)
+        if index == -1:
+            return ([], [" ", "", " "], self.__lyrics[:self.__NEXT])
+        previous = self.__lyrics[max(0, index - self.__PREVIOUS):index]
+        next = self.__lyrics[index + 1:index + 1 + self.__NEXT]
+        return (previous, [" ", self.__lyrics[index], " "], next)
 
     @property
     def available(self):
@@ -80,7 +100,7 @@ class SyncLyricsHelper:
             True if lyrics available
             @return bool
         """
-        return len(self.__timestamps.keys()) != 0
+        return len(self.__timestamps) != 0
 
 ############
 # PRIVATE  #
@@ -101,7 +121,9 @@ class SyncLyricsHelper:
     def __get_timestamps(self):
         """
             Get timestamps from file
+            @return {int: str}
         """
+        timestamps = {}
         try:
             status = False
             if self.__lrc_file.query_exists():
@@ -115,8 +137,9 @@ class SyncLyricsHelper:
                         str_timestamp = line.split("]")[0].split("[")[1]
                         timestamp = self.__str_to_timestamp(str_timestamp)
                         lyrics = " ".join(line.split("]")[1:])
-                        self.__timestamps[timestamp] = lyrics
+                        timestamps[timestamp] = lyrics
                     except:
                         continue
         except Exception as e:
             Logger.error("SyncLyricsHelper::__get_timestamps(): %s", e)
+        return timestamps
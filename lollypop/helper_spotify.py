@@ -52,9 +52,10 @@ class SpotifyHelper(GObject.Object):
             credentials = "%s:%s" % (SPOTIFY_CLIENT_ID, SPOTIFY_SECRET)
             encoded = b64encode(credentials.encode("utf-8"))
             credentials = encoded.decode("utf-8")
-            session = Soup.Session.new()
+            session = TaskHelper.get_session("spotify")
             data = {"grant_type": "client_credentials"}
-            msg = Soup.form_request_new_from_hash("POST", token_uri, data)
+            msg = Soup.form_request_new_from_hash(
+                "POST", TaskHelper.get_web_service_uri(token_uri), data)
             msg.request_headers.append("Authorization",
                                        "Basic %s" % credentials)
             status = session.send_message(msg)
@@ -116,6 +117,34 @@ class SpotifyHelper(GObject.Object):
             Logger.error("SpotifyHelper::get_artist_id(): %s", e)
             callback(None)
 
+    def get_artist_id_sync(self, artist_name, cancellable):
+        """
+            Get artist id
+            @param artist_name as str
+            @param cancellable as Gio.Cancellable
+            @return str/None
+        """
+        try:
+            while self.wait_for_token():
+                if cancellable.is_cancelled():
+                    raise Exception("cancelled")
+                sleep(1)
+            artist_name = GLib.uri_escape_string(
+                artist_name, None, True).replace(" ", "+")
+            token = "Bearer %s" % self.__token
+            helper = TaskHelper()
+            helper.add_header("Authorization", token)
+            uri = "https://api.spotify.com/v1/search?q=%s&type=artist" %\
+                artist_name
+            (status, data) = helper.load_uri_content_sync(uri, cancellable)
+            if status:
+                decode = json.loads(data.decode("utf-8"))
+                for item in decode["artists"]["items"]:
+                    return item["uri"].split(":")[-1]
+        except Exception as e:
+            Logger.error("SpotifyHelper::get_artist_id_sync(): %s", e)
+        return None
+
     def get_similar_artists(self, artist_id, cancellable):
         """
            Get similar artists
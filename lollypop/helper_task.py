@@ -14,9 +14,104 @@ import gi
 gi.require_version("Soup", "2.4")
 from gi.repository import GLib, Soup
 
-from threading import Thread
+from threading import Thread, Condition, Lock
+from collections import deque
 
+from lollypop.define import App, TaskPriority
 from lollypop.logger import Logger
+from lollypop.utils import create_dir
+
+
+class TaskPool:
+    """
+        Worker threads running tasks by priority
+        Lower priorities can't use all workers, so interactive tasks
+        always find a free worker
+    """
+
+    def __init__(self, workers, limits):
+        """
+            Init pool
+            @param workers as int
+            @param limits as {TaskPriority: int}, max running tasks
+        """
+        self.__max_workers = workers
+        self.__limits = limits
+        self.__queues = {priority: deque() for priority in self.__limits}
+        self.__running = {priority: 0 for priority in self.__limits}
+        self.__max_depth = 0
+        self.__workers = 0
+        self.__idle = 0
+        self.__condition = Condition()
+
+    def add(self, priority, task):
+        """
+            Queue task
+            @param priority as TaskPriority
+            @param task as (function, *args)
+            @thread safe
+        """
+        with self.__condition:
+            self.__queues[priority].append(task)
+            depth = sum([len(queue) for queue in self.__queues.values()])
+            self.__max_depth = max(self.__max_depth, depth)
+            if depth > self.__idle and self.__workers < self.__max_workers:
+                self.__workers += 1
+                thread = Thread(target=self.__worker)
+                thread.daemon = True
+                thread.start()
+            self.__condition.notify()
+
+    def get_stats(self):
+        """
+            Get queue depth metrics
+            @return {str: int}
+            @thread safe
+        """
+        with self.__condition:
+            stats = {"workers": self.__workers,
+                     "idle": self.__idle,
+                     "max_depth": self.__max_depth}
+            for priority in self.__limits:
+                stats["queued_%s" % priority] = len(self.__queues[priority])
+                stats["running_%s" % priority] = self.__running[priority]
+            return stats
+
+#######################
+# PRIVATE             #
+#######################
+    def __pop(self):
+        """
+            Get next task allowed to run
+            @return (priority as TaskPriority, task)/None
+        """
+        for priority in sorted(self.__limits.keys()):
+            if self.__queues[priority] and\
+                    self.__running[priority] < self.__limits[priority]:
+                return (priority, self.__queues[priority].popleft())
+        return None
+
+    def __worker(self):
+        """
+            Run tasks forever
+        """
+        while True:
+            with self.__condition:
+                self.__idle += 1
+                item = self.__pop()
+                while item is None:
+                    self.__condition.wait()
+                    item = self.__pop()
+                self.__idle -= 1
+                (priority, (command, *args)) = item
+                self.__running[priority] += 1
+            try:
+                command(*args)
+            except Exception as e:
+                Logger.error("TaskPool::__worker(): %s" % e)
+            with self.__condition:
+                self.__running[priority] -= 1
+                self.__condition.notify_all()
 
 
 class TaskHelper:
@@ -24,6 +119,25 @@ class TaskHelper:
         Simple helper for running a task in background
     """
 
+    __POOL = None
+    # Downloaders sleep waiting for web services, keep them in their own
+    # pool so they never hold workers needed by other tasks
+    __DOWNLOAD_POOL = None
+    __POOL_LOCK = Lock()
+    __DEFAULT_WORKERS = 8
+    __DOWNLOAD_WORKERS = 8
+    __SESSIONS = {}
+    __SESSIONS_LOCK = Lock()
+    __CACHE = None
+    __CACHE_PATH = GLib.get_user_cache_dir() + "/lollypop/http"
+    __CACHE_SIZE = 50 * 1024 * 1024
+    # Requests in flight: {(uri, headers): [(callback, cancellable, args)]}
+    __PENDING = {}
+    __PENDING_LOCK = Lock()
+    # Send web services requests to a local server, for offline testing:
+    # https://host/path => $LOLLYPOP_WEB_SERVICES_URI/host/path
+    __WEB_SERVICES_URI = GLib.getenv("LOLLYPOP_WEB_SERVICES_URI")
+
     def __init__(self):
         """
             Init helper
@@ -31,6 +145,70 @@ class TaskHelper:
         self.__signals = {}
         self.__headers = []
 
+    @staticmethod
+    def get_stats():
+        """
+            Get background tasks metrics
+            @return {str: int}
+        """
+        stats = {}
+        if TaskHelper.__POOL is not None:
+            stats.update(TaskHelper.__POOL.get_stats())
+        if TaskHelper.__DOWNLOAD_POOL is not None:
+            for (key, value) in TaskHelper.__DOWNLOAD_POOL.get_stats().items():
+                stats["download_%s" % key] = value
+        return stats
+
+    @staticmethod
+    def get_session(service="default"):
+        """
+            Get shared session for service, connections are kept alive
+            Default session uses an HTTP disk cache
+            @param service as str
+            @return Soup.Session
+            @thread safe
+        """
+        with TaskHelper.__SESSIONS_LOCK:
+            if service not in TaskHelper.__SESSIONS.keys():
+                session = Soup.Session.new()
+                session.set_property("accept-language-auto", True)
+                session.set_property("use-thread-context", True)
+                if service == "default":
+                    create_dir(TaskHelper.__CACHE_PATH)
+                    cache = Soup.Cache.new(TaskHelper.__CACHE_PATH,
+                                           Soup.CacheType.SINGLE_USER)
+                    cache.set_max_size(TaskHelper.__CACHE_SIZE)
+                    cache.load()
+                    session.add_feature(cache)
+                    TaskHelper.__CACHE = cache
+                TaskHelper.__SESSIONS[service] = session
+            return TaskHelper.__SESSIONS[service]
+
+    @staticmethod
+    def get_web_service_uri(uri):
+        """
+            Get uri to use for a web service request
+            @param uri as str
+            @return str
+        """
+        if TaskHelper.__WEB_SERVICES_URI:
+            parsed = GLib.uri_parse_scheme(uri)
+            if parsed in ["http", "https"]:
+                return "%s/%s" % (TaskHelper.__WEB_SERVICES_URI.rstrip("/"),
+                                  uri.split("://", 1)[1])
+        return uri
+
+    @staticmethod
+    def save_cache():
+        """
+            Save HTTP cache index to disk
+        """
+        try:
+            if TaskHelper.__CACHE is not None:
+                TaskHelper.__CACHE.dump()
+        except Exception as e:
+            Logger.error("TaskHelper::save_cache(): %s" % e)
+
     def add_header(self, name, value):
         """
             Add header
@@ -44,46 +222,42 @@ class TaskHelper:
             Run command with params and return to callback
             @param command as function
             @param *args as command arguments
-            @param **kwargs
+            @param **kwargs: callback as (function, *args),
+                             priority as TaskPriority,
+                             cancellable as Gio.Cancellable
         """
-        thread = Thread(target=self.__run,
-                        args=(command, kwargs, *args))
-        thread.daemon = True
-        thread.start()
+        priority = kwargs.get("priority", TaskPriority.INTERACTIVE)
+        with TaskHelper.__POOL_LOCK:
+            if priority == TaskPriority.DOWNLOAD:
+                if TaskHelper.__DOWNLOAD_POOL is None:
+                    TaskHelper.__DOWNLOAD_POOL = TaskPool(
+                        self.__DOWNLOAD_WORKERS,
+                        {TaskPriority.DOWNLOAD: self.__DOWNLOAD_WORKERS})
+                pool = TaskHelper.__DOWNLOAD_POOL
+            else:
+                if TaskHelper.__POOL is None:
+                    TaskHelper.__POOL = self.__create_pool()
+                pool = TaskHelper.__POOL
+        pool.add(priority, (self.__run, command, kwargs, *args))
 
     def load_uri_content(self, uri, cancellable, callback, *args):
         """
             Load uri with libsoup
+            Concurrent loads of same uri with same headers share one request
             @param uri as str
             @param cancellable as Gio.Cancellable
             @param callback as a function
             @callback (uri as str, status as bool, content as bytes, args)
         """
-        try:
-            session = Soup.Session.new()
-            session.set_property('accept-language-auto', True)
-            # Post message
-            if self.__headers:
-                msg = Soup.Message.new("GET", uri)
-                headers = msg.get_property("request-headers")
-                for header in self.__headers:
-                    headers.append(header[0],
-                                   header[1])
-                session.send_async(msg, cancellable,
-                                   self.__on_load_uri_content,
-                                   callback, cancellable, uri, *args)
-            # Get message
-            else:
-                request = session.request(uri)
-                request.send_async(cancellable,
-                                   self.__on_request_send_async,
-                                   callback,
-                                   cancellable,
-                                   uri,
-                                   *args)
-        except Exception as e:
-            Logger.error("HelperTask::load_uri_content(): %s" % e)
-            callback(uri, False, b"", *args)
+        uri = self.get_web_service_uri(uri)
+        key = (uri, tuple(self.__headers))
+        with TaskHelper.__PENDING_LOCK:
+            waiters = TaskHelper.__PENDING.get(key, None)
+            TaskHelper.__PENDING[key] = (waiters or []) +\
+                [(callback, cancellable, args)]
+            if waiters is not None:
+                return
+        self.__load_uri_content(uri, cancellable, key)
 
     def load_uri_content_sync(self, uri, cancellable=None):
         """
@@ -93,7 +267,8 @@ class TaskHelper:
             @return (loaded as bool, content as bytes)
         """
         try:
-            session = Soup.Session.new()
+            uri = self.get_web_service_uri(uri)
+            session = self.get_session()
             # Set headers
             if self.__headers:
                 msg = Soup.Message.new("GET", uri)
@@ -101,19 +276,28 @@ class TaskHelper:
                 for header in self.__headers:
                     headers.append(header[0],
                                    header[1])
-                session.send_message(msg)
-                body = msg.get_property("response-body")
-                bytes = body.flatten().get_data()
+                # Use send() as send_message() bypasses cache
+                stream = session.send(msg, cancellable)
             # Get message
             else:
                 request = session.request(uri)
                 stream = request.send(cancellable)
-                bytes = bytearray(0)
-                buf = stream.read_bytes(1024, cancellable).get_data()
-                while buf:
-                    bytes += buf
-                    buf = stream.read_bytes(1024, cancellable).get_data()
+                msg = request.get_message()\
+                    if isinstance(request, Soup.RequestHTTP) else None
+            # Error pages are not content
+            if msg is not None and\
+                    (msg.status_code < 200 or msg.status_code >= 300):
                 stream.close()
+                Logger.warning(
+                    "TaskHelper::load_uri_content_sync(): %s, %s" % (
+                        msg.status_code, uri))
+                return (False, b"")
+            bytes = bytearray(0)
+            buf = stream.read_bytes(4096, cancellable).get_data()
+            while buf:
+                bytes += buf
+                buf = stream.read_bytes(4096, cancellable).get_data()
+            stream.close()
             return (True, bytes)
         except Exception as e:
             Logger.error("TaskHelper::load_uri_content_sync(): %s" % e)
@@ -122,15 +306,70 @@ class TaskHelper:
 #######################
 # PRIVATE             #
 #######################
+    def __create_pool(self):
+        """
+            Create main pool
+            @return TaskPool
+        """
+        try:
+            workers = App().settings.get_value("task-workers").get_int32()
+        except:
+            workers = self.__DEFAULT_WORKERS
+        workers = max(2, workers)
+        return TaskPool(workers,
+                        {TaskPriority.INTERACTIVE: workers,
+                         TaskPriority.BACKGROUND: workers - 1,
+                         TaskPriority.BULK: max(1, workers // 2)})
+
+    def __load_uri_content(self, uri, cancellable, key):
+        """
+            Load uri with libsoup
+            @param uri as str
+            @param cancellable as Gio.Cancellable
+            @param key as (str, tuple)
+        """
+        try:
+            session = self.get_session()
+            # Post message
+            if self.__headers:
+                msg = Soup.Message.new("GET", uri)
+                headers = msg.get_property("request-headers")
+                for header in self.__headers:
+                    headers.append(header[0],
+                                   header[1])
+                session.send_async(msg, cancellable,
+                                   self.__on_load_uri_content,
+                                   self.__on_uri_content, cancellable, uri,
+                                   key, cancellable)
+            # Get message
+            else:
+                request = session.request(uri)
+                request.send_async(cancellable,
+                                   self.__on_request_send_async,
+                                   self.__on_uri_content,
+                                   cancellable,
+                                   uri,
+                                   key,
+                                   cancellable)
+        except Exception as e:
+            Logger.error("HelperTask::load_uri_content(): %s" % e)
+            self.__on_uri_content(uri, False, b"", key, cancellable)
+
     def __run(self, command, kwd, *args):
         """
             Pass command result to callback
             @param command as function
             @param *args as command arguments
-            @param kwd as { "callback": (function, *args) }
+            @param kwd as { "callback": (function, *args),
+                            "cancellable": Gio.Cancellable }
         """
         try:
+            cancellable = kwd.get("cancellable", None)
+            if cancellable is not None and cancellable.is_cancelled():
+                return
             result = command(*args)
+            if cancellable is not None and cancellable.is_cancelled():
+                return
             if "callback" in kwd.keys():
                 (callback, *callback_args) = kwd["callback"]
                 if callback is not None:
@@ -139,6 +378,35 @@ class TaskHelper:
             Logger.error("TaskHelper::__run(): %s: %s -> %s"
                          % (e, command, kwd))
 
+    def __on_uri_content(self, uri, status, content, key, cancellable):
+        """
+            Pass content to all callbacks waiting for uri
+            @param uri as str
+            @param status as bool
+            @param content as bytes
+            @param key as (str, tuple)
+            @param cancellable as Gio.Cancellable used for request
+        """
+        retry = []
+        with TaskHelper.__PENDING_LOCK:
+            waiters = TaskHelper.__PENDING.pop(key, [])
+            # Request cancelled by first caller, restart it for others
+            if not status and cancellable is not None and\
+                    cancellable.is_cancelled():
+                retry = [waiter for waiter in waiters
+                         if waiter[1] is None or
+                         not waiter[1].is_cancelled()]
+                if retry:
+                    TaskHelper.__PENDING[key] = retry
+        if retry:
+            waiters = [waiter for waiter in waiters if waiter not in retry]
+            self.__load_uri_content(uri, retry[0][1], key)
+        for (callback, waiter_cancellable, args) in waiters:
+            try:
+                callback(uri, status, content, *args)
+            except Exception as e:
+                Logger.error("TaskHelper::__on_uri_content(): %s" % e)
+
     def __on_read_bytes_async(self, stream, result, content,
                               cancellable, callback, uri, *args):
         """
@@ -205,4 +473,5 @@ class TaskHelper:
                                     bytearray(0), cancellable, callback, uri,
                                     *args)
         except Exception as e:
-            Logger.error("TaskHelper::__on_soup_msg_finished(): %s" % e)
+            Logger.error("TaskHelper::__on_load_uri_content(): %s" % e)
+            callback(uri, False, b"", *args)
@@ -10,6 +10,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from threading import Lock
+from time import time
+from urllib.parse import urlparse, parse_qs
+
 from lollypop.helper_web_youtube import YouTubeHelper
 from lollypop.define import App
 
@@ -19,6 +23,14 @@ class WebHelper:
         Web helper
     """
 
+    # Resolved content uris: track uri => (content uri, expiration time)
+    __CONTENT_URIS = {}
+    __CONTENT_URIS_LOCK = Lock()
+    # Seconds a content uri is kept when it does not give its expiration
+    __TTL = 3600
+    # Do not start playing a content uri expiring in less than this
+    __MARGIN = 600
+
     def __init__(self):
         """
             Init helper
@@ -46,8 +58,58 @@ class WebHelper:
             @param track as Track
             @return content uri as str
         """
+        uri = self.get_cached_track_content(track)
+        if uri is not None:
+            return uri
         for helper in self.__helpers:
             uri = helper.get_uri_content(track)
             if uri:
+                with self.__CONTENT_URIS_LOCK:
+                    self.__CONTENT_URIS[track.uri] = (uri,
+                                                      self.__get_expires(uri))
                 return uri
         return ""
+
+    def get_cached_track_content(self, track):
+        """
+            Get content uri if already resolved and not expiring
+            @param track as Track
+            @return content uri as str/None
+            @thread safe
+        """
+        with self.__CONTENT_URIS_LOCK:
+            if track.uri in self.__CONTENT_URIS.keys():
+                (uri, expires) = self.__CONTENT_URIS[track.uri]
+                if expires - self.__MARGIN > time():
+                    return uri
+                del self.__CONTENT_URIS[track.uri]
+        return None
+
+    def prefetch(self, tracks):
+        """
+            Resolve content uris for tracks, so they can be played without
+            waiting for web services
+            @param tracks as [Track]
+            @thread safe
+        """
+        for track in tracks:
+            if not track.is_web:
+                continue
+            self.set_uri(track, None)
+            if track.is_http:
+                self.get_track_content(track)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_expires(self, uri):
+        """
+            Get content uri expiration time
+            @param uri as str
+            @return int
+        """
+        try:
+            query = parse_qs(urlparse(uri).query)
+            return int(query["expire"][0])
+        except:
+            return int(time()) + self.__TTL
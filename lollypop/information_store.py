@@ -16,6 +16,7 @@ from lollypop.utils import escape
 from lollypop.define import App
 from lollypop.logger import Logger
 from lollypop.downloader_info import InfoDownloader
+from lollypop.database_information import InformationDatabase
 
 
 class InformationStore(GObject.Object, InfoDownloader):
@@ -33,37 +34,52 @@ class InformationStore(GObject.Object, InfoDownloader):
         """
         GObject.Object.__init__(self)
         InfoDownloader.__init__(self)
+        self.__db = InformationDatabase(App().art._INFO_PATH)
 
     def get_information(self, artist):
         """
-            Get artist information
+            Get artist information, refresh it in background if expired
+            User edited file is preferred
             @param artist as str
             @return content as bytes
         """
         filepath = "%s/%s.txt" % (App().art._INFO_PATH,
                                   escape(artist))
-        content = None
         f = Gio.File.new_for_path(filepath)
         if f.query_exists():
             (status, content, tag) = f.load_contents()
+            return content
+        v = self.__db.get(escape(artist))
+        if v is None:
+            return None
+        (content, expired) = v
+        if expired:
+            self.cache_artists_info([artist])
         return content
 
-    def save_artist_information(self, artist, content):
+    def has_information(self, artist):
+        """
+            True if information for artist is cached and not expired,
+            even if web services found nothing
+            @param artist as str
+            @return bool
+        """
+        v = self.__db.get(escape(artist))
+        return v is not None and not v[1]
+
+    def save_artist_information(self, artist, content, source=None):
         """
             Save artist information
             @param artist as str
-            @param content as bytes
+            @param content as bytes/None
+            @param source as str
         """
         try:
-            if content is not None:
-                filepath = "%s/%s.txt" % (App().art._INFO_PATH,
-                                          escape(artist))
-                f = Gio.File.new_for_path(filepath)
-                fstream = f.replace(None, False,
-                                    Gio.FileCreateFlags.REPLACE_DESTINATION,
-                                    None)
-                if fstream is not None:
-                    fstream.write(content, None)
-                    fstream.close()
+            # Keep expired information if web services failed
+            if content is None:
+                v = self.__db.get(escape(artist))
+                if v is not None and v[0]:
+                    return
+            self.__db.add(escape(artist), content, source)
         except Exception as e:
             Logger.error("InformationStore::save_artist_information(): %s", e)
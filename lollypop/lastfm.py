@@ -26,14 +26,16 @@ except Exception as e:
 from pylast import LastFMNetwork, LibreFMNetwork, md5, WSError
 from pylast import SessionKeyGenerator
 from locale import getdefaultlocale
-from pickle import load, dump
+from pickle import load
+from time import time
 import re
 
-from lollypop.define import App, LOLLYPOP_DATA_PATH
-from lollypop.objects import Track
+from lollypop.define import App, LOLLYPOP_DATA_PATH, TaskPriority
+from lollypop.sqlcursor import SqlCursor
 from lollypop.utils import get_network_available
 from lollypop.logger import Logger
 from lollypop.goa import GoaSyncedAccount
+from lollypop.database_scrobbles import ScrobblesJournal
 
 
 class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
@@ -50,6 +52,11 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
     __gsignals__ = {
         "new-artist": (GObject.SignalFlags.RUN_FIRST, None, (str, str)),
     }
+    # Maximum tracks accepted by track.scrobble
+    __BATCH_SIZE = 50
+    # WSError ids worth retrying: invalid session, service offline,
+    # temporary error, rate limit exceeded
+    __RETRY_ERRORS = ["9", "11", "16", "29"]
 
     def __init__(self, name):
         """
@@ -62,12 +69,10 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
         self.session_key = ""
         self.__password = None
         self.__goa = None
-        try:
-            self.__queue = load(
-                open(LOLLYPOP_DATA_PATH + "/%s_queue.bin" % self.__name, "rb"))
-        except Exception as e:
-            Logger.info("LastFM::__init__(): %s", e)
-            self.__queue = []
+        self.__journal = ScrobblesJournal()
+        self.__flushing = False
+        self.__timeout_id = None
+        self.__import_queue()
         if name == "librefm":
             LibreFMNetwork.__init__(self)
             Logger.debug("LibreFMNetwork.__init__()")
@@ -108,14 +113,6 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
                        callback,
                        *args)
 
-    def save(self):
-        """
-            Save queue to disk
-        """
-        with open(LOLLYPOP_DATA_PATH + "/%s_queue.bin" % self.__name,
-                  "wb") as f:
-            dump(list(self.__queue), f)
-
     def get_artist_artwork_uri(self, artist):
         """
             Get artist infos
@@ -151,18 +148,12 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
             @param track as Track
             @param timestamp as int
         """
-        if get_network_available("LASTFM") and\
-                track.id >= 0 and self.available:
-            self.__clean_queue()
-            App().task_helper.run(
-                       self.__scrobble,
-                       track.artists[0],
-                       track.album_name,
-                       track.title,
-                       timestamp,
-                       track.mb_track_id)
-        else:
-            self.__queue.append((track, timestamp))
+        if App().settings.get_value("disable-scrobbling") or track.id < 0:
+            return
+        self.__journal.add(self.__name,
+                           self.__get_scrobble(track, timestamp),
+                           timestamp)
+        self.__flush_journal()
 
     def playing_now(self, track):
         """
@@ -300,20 +291,84 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
 #######################
 # PRIVATE             #
 #######################
-    def __clean_queue(self):
+    def __get_scrobble(self, track, timestamp):
+        """
+            Get scrobble parameters for track
+            @param track as Track
+            @param timestamp as int
+            @return {}
+        """
+        scrobble = {"artist": track.artists[0],
+                    "album": track.album_name,
+                    "title": track.title,
+                    "timestamp": timestamp}
+        if track.mb_track_id:
+            scrobble["mbid"] = track.mb_track_id
+        return scrobble
+
+    def __import_queue(self):
         """
-            Send tracks in queue
+            Move scrobbles from old pickled queue to journal
         """
-        if self.__queue:
-            (track, timestamp) = self.__queue.pop(0)
-            App().task_helper.run(
-                       self.__scrobble,
-                       ", ".join(track.artists),
-                       track.album_name,
-                       track.title,
-                       timestamp,
-                       track.mb_track_id)
-            GLib.timeout_add(1000, self.__clean_queue)
+        path = LOLLYPOP_DATA_PATH + "/%s_queue.bin" % self.__name
+        f = Gio.File.new_for_path(path)
+        if not f.query_exists():
+            return
+        try:
+            for (track, timestamp) in load(open(path, "rb")):
+                self.__journal.add(self.__name,
+                                   self.__get_scrobble(track, timestamp),
+                                   timestamp)
+            f.delete(None)
+        except Exception as e:
+            Logger.error("LastFM::__import_queue(): %s", e)
+
+    def __flush_journal(self):
+        """
+            Submit pending scrobbles in a thread
+        """
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+            self.__timeout_id = None
+        if self.__flushing or not self.available or\
+                App().settings.get_value("disable-scrobbling") or\
+                not get_network_available("LASTFM"):
+            return
+        delay = self.__journal.get_next_try(self.__name) - time()
+        if delay > 0:
+            self.__timeout_id = GLib.timeout_add_seconds(
+                int(delay) + 1, self.__on_retry_timeout)
+            return
+        self.__flushing = True
+        App().task_helper.run(self.__submit_journal,
+                              callback=(self.__on_journal_submitted,))
+
+    def __submit_journal(self):
+        """
+            Scrobble pending tracks by batches, oldest first
+            @return delay before next try as int (0 if journal is empty)
+            @thread safe
+        """
+        while True:
+            scrobbles = self.__journal.get(self.__name, self.__BATCH_SIZE)
+            if not scrobbles:
+                return 0
+            ids = [scrobble_id for (scrobble_id, data) in scrobbles]
+            tracks = [data for (scrobble_id, data) in scrobbles]
+            Logger.debug("LastFM::__submit_journal(): %s tracks",
+                         len(tracks))
+            try:
+                self.scrobble_many(tracks)
+                self.__journal.set_success(self.__name)
+            except WSError as e:
+                if e.get_id() in self.__RETRY_ERRORS:
+                    return self.__journal.set_failure(self.__name)
+                # Rejected by service, retrying will not help
+                Logger.warning("LastFM::__submit_journal(): %s", e)
+            except Exception as e:
+                Logger.error("LastFM::__submit_journal(): %s", e)
+                return self.__journal.set_failure(self.__name)
+            self.__journal.remove(ids)
 
     def __connect(self, full_sync=False):
         """
@@ -335,8 +390,10 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
                 self.session_key = skg.get_session_key(
                     username=self.__login,
                     password_hash=md5(self.__password))
+            GLib.idle_add(self.__flush_journal)
             if full_sync:
-                App().task_helper.run(self.__populate_loved_tracks)
+                App().task_helper.run(self.__populate_loved_tracks,
+                                      priority=TaskPriority.BULK)
             track = App().player.current_track
             if track.id is not None:
                 self.__now_playing(
@@ -348,37 +405,6 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
         except Exception as e:
             Logger.debug("LastFM::__connect(): %s" % e)
 
-    def __scrobble(self, artist, album, title, timestamp, mb_track_id):
-        """
-            Scrobble track
-            @param artist as str
-            @param title as str
-            @param album_title as str
-            @param timestamp as int
-            @param duration as int
-            @param mb_track_id as str
-            @thread safe
-        """
-        if App().settings.get_value("disable-scrobbling") or\
-                not get_network_available("LASTFM"):
-            return
-        Logger.debug("LastFM::__scrobble(): %s, %s, %s, %s, %s" % (
-                                                            artist,
-                                                            album,
-                                                            title,
-                                                            timestamp,
-                                                            mb_track_id))
-        try:
-            self.scrobble(artist=artist,
-                          album=album,
-                          title=title,
-                          timestamp=timestamp,
-                          mbid=mb_track_id)
-        except WSError:
-            pass
-        except Exception as e:
-            Logger.error("LastFM::__scrobble(): %s" % e)
-
     def __now_playing(self, artist, album, title, duration, mb_track_id):
         """
             Now playing track
@@ -412,16 +438,19 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
             return
         try:
             user = self.get_user(self.__login)
-            for loved in user.get_loved_tracks(limit=None):
-                artist = str(loved.track.artist)
-                title = str(loved.track.title)
-                track_id = App().tracks.search_track(artist, title)
-                if track_id is None:
-                    Logger.warning(
-                        "LastFM::__populate_loved_tracks(): %s, %s" % (
-                            artist, title))
-                else:
-                    Track(track_id).set_loved(1)
+            loved_tracks = user.get_loved_tracks(limit=None)
+            index = App().tracks.get_search_index()
+            with SqlCursor(App().db, True):
+                for loved in loved_tracks:
+                    artist = str(loved.track.artist)
+                    title = str(loved.track.title)
+                    track_id = App().tracks.search_track(artist, title, index)
+                    if track_id is None:
+                        Logger.warning(
+                            "LastFM::__populate_loved_tracks(): %s, %s" % (
+                                artist, title))
+                    else:
+                        App().tracks.set_loved(track_id, 1)
         except Exception as e:
             Logger.error("LastFM::__populate_loved_tracks: %s" % e)
 
@@ -453,3 +482,23 @@ class LastFM(GObject.Object, LastFMNetwork, LibreFMNetwork):
         value = monitor.get_property("network-available")
         if value and not self.available:
             self.connect()
+        elif value:
+            self.__flush_journal()
+
+    def __on_journal_submitted(self, delay):
+        """
+            Schedule next try if submission failed
+            @param delay as int
+        """
+        self.__flushing = False
+        if delay:
+            Logger.info("LastFM: submission failed, next try in %ss", delay)
+            self.__timeout_id = GLib.timeout_add_seconds(
+                delay, self.__on_retry_timeout)
+
+    def __on_retry_timeout(self):
+        """
+            Retry submission
+        """
+        self.__timeout_id = None
+        self.__flush_journal()
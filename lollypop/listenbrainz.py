@@ -11,15 +11,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Soup, GObject, GLib
+from gi.repository import Soup, GObject, GLib, Gio
 
 import json
 import time
-from pickle import load, dump
+from pickle import load
 
 from lollypop.logger import Logger
 from lollypop.define import App, LOLLYPOP_DATA_PATH
 from lollypop.utils import get_network_available
+from lollypop.helper_task import TaskHelper
+from lollypop.database_scrobbles import ScrobblesJournal
 
 HOST_NAME = "api.listenbrainz.org"
 PATH_SUBMIT = "/1/submit-listens"
@@ -33,19 +35,23 @@ class ListenBrainz(GObject.GObject):
     """
 
     user_token = GObject.Property(type=str, default=None)
+    # Listens per import request
+    __BATCH_SIZE = 100
+    __SERVICE = "listenbrainz"
 
     def __init__(self):
         """
             Init ListenBrainz object
         """
         GObject.GObject.__init__(self)
-        try:
-            self.__queue = load(
-                open(LOLLYPOP_DATA_PATH + "/listenbrainz_queue.bin", "rb"))
-        except Exception as e:
-            Logger.info("LastFM::__init__(): %s", e)
-            self.__queue = []
+        self.__journal = ScrobblesJournal()
+        self.__flushing = False
+        self.__timeout_id = None
         self.__next_request_time = 0
+        self.__import_queue()
+        self.connect("notify::user-token", self.__on_user_token)
+        Gio.NetworkMonitor.get_default().connect("notify::network-available",
+                                                 self.__on_network_available)
 
     def listen(self, track, time):
         """
@@ -57,7 +63,8 @@ class ListenBrainz(GObject.GObject):
             return
         payload = self.__get_payload(track)
         payload[0]["listened_at"] = time
-        self.__submit("single", payload)
+        self.__journal.add(self.__SERVICE, payload[0], time)
+        self.__flush_journal()
 
     def playing_now(self, track):
         """
@@ -66,15 +73,9 @@ class ListenBrainz(GObject.GObject):
         """
         if App().settings.get_value("disable-scrobbling") or track.id < 0:
             return
-        payload = self.__get_payload(track)
-        self.__submit("playing_now", payload)
-
-    def save(self):
-        """
-            Save queue to disk
-        """
-        with open(LOLLYPOP_DATA_PATH + "/listenbrainz_queue.bin", "wb") as f:
-            dump(list(self.__queue), f)
+        if get_network_available("MUSICBRAINZ"):
+            payload = self.__get_payload(track)
+            App().task_helper.run(self.__request, "playing_now", payload)
 
     @property
     def can_love(self):
@@ -95,26 +96,67 @@ class ListenBrainz(GObject.GObject):
 #######################
 # PRIVATE             #
 #######################
-    def __clean_queue(self):
+    def __import_queue(self):
         """
-            Send tracks in queue
+            Move listens from old pickled queue to journal
         """
-        if self.__queue:
-            (listen_type, payload) = self.__queue.pop(0)
-            App().task_helper.run(self.__request, listen_type, payload)
-            GLib.timeout_add(1000, self.__clean_queue)
+        path = LOLLYPOP_DATA_PATH + "/listenbrainz_queue.bin"
+        f = Gio.File.new_for_path(path)
+        if not f.query_exists():
+            return
+        try:
+            for (listen_type, payload) in load(open(path, "rb")):
+                if listen_type == "single":
+                    self.__journal.add(self.__SERVICE, payload[0],
+                                       payload[0]["listened_at"])
+            f.delete(None)
+        except Exception as e:
+            Logger.error("ListenBrainz::__import_queue(): %s", e)
 
-    def __submit(self, listen_type, payload):
+    def __flush_journal(self):
         """
-            Submit payload to service in a thread
-            @param listen_type as str
-            @param payload as []
+            Submit pending listens in a thread
         """
-        if get_network_available("MUSICBRAINZ"):
-            self.__clean_queue()
-            App().task_helper.run(self.__request, listen_type, payload)
-        else:
-            self.__queue.append((listen_type, payload))
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+            self.__timeout_id = None
+        if self.__flushing or not self.user_token or\
+                App().settings.get_value("disable-scrobbling") or\
+                not get_network_available("MUSICBRAINZ"):
+            return
+        delay = self.__journal.get_next_try(self.__SERVICE) - time.time()
+        if delay > 0:
+            self.__timeout_id = GLib.timeout_add_seconds(
+                int(delay) + 1, self.__on_retry_timeout)
+            return
+        self.__flushing = True
+        App().task_helper.run(self.__submit_journal,
+                              callback=(self.__on_journal_submitted,))
+
+    def __submit_journal(self):
+        """
+            Submit pending listens by batches, oldest first
+            @return delay before next try as int (0 if journal is empty)
+            @thread safe
+        """
+        while True:
+            listens = self.__journal.get(self.__SERVICE, self.__BATCH_SIZE)
+            if not listens:
+                return 0
+            ids = [listen_id for (listen_id, payload) in listens]
+            payload = [payload for (listen_id, payload) in listens]
+            listen_type = "import" if len(payload) > 1 else "single"
+            status = self.__request(listen_type, payload)
+            if status == 200:
+                self.__journal.set_success(self.__SERVICE)
+                self.__journal.remove(ids)
+            # Rejected by service, retrying will not help
+            elif status == 400:
+                Logger.warning("ListenBrainz::__submit_journal(): "
+                               "dropping %s listens", len(ids))
+                self.__journal.remove(ids)
+            else:
+                return self.__journal.set_failure(self.__SERVICE)
 
     def __request(self, listen_type, payload, retry=0):
         """
@@ -122,6 +164,7 @@ class ListenBrainz(GObject.GObject):
             @param listen_type as str
             @param payload as []
             @param retry as int (internal)
+            @return HTTP status as int
         """
         self.__wait_for_ratelimit()
         Logger.debug("ListenBrainz %s: %r" % (listen_type, payload))
@@ -130,9 +173,9 @@ class ListenBrainz(GObject.GObject):
             "payload": payload
         }
         body = json.dumps(data).encode("utf-8")
-        session = Soup.Session.new()
+        session = TaskHelper.get_session("listenbrainz")
         uri = "https://%s%s" % (HOST_NAME, PATH_SUBMIT)
-        msg = Soup.Message.new("POST", uri)
+        msg = Soup.Message.new("POST", TaskHelper.get_web_service_uri(uri))
         msg.set_request("application/json",
                         Soup.MemoryUse.STATIC,
                         body)
@@ -144,9 +187,11 @@ class ListenBrainz(GObject.GObject):
             self.__handle_ratelimit(response_headers)
             # Too Many Requests
             if status == 429 and retry < 5:
-                self.__request(listen_type, payload, retry + 1)
+                return self.__request(listen_type, payload, retry + 1)
+            return status
         except Exception as e:
-            print("ListenBrainz::__submit():", e)
+            Logger.error("ListenBrainz::__request(): %s", e)
+        return 0
 
     def __wait_for_ratelimit(self):
         """
@@ -193,3 +238,37 @@ class ListenBrainz(GObject.GObject):
             }
         }
         return [payload]
+
+    def __on_journal_submitted(self, delay):
+        """
+            Schedule next try if submission failed
+            @param delay as int
+        """
+        self.__flushing = False
+        if delay:
+            Logger.info("ListenBrainz: submission failed, next try in %ss",
+                        delay)
+            self.__timeout_id = GLib.timeout_add_seconds(
+                delay, self.__on_retry_timeout)
+
+    def __on_retry_timeout(self):
+        """
+            Retry submission
+        """
+        self.__timeout_id = None
+        self.__flush_journal()
+
+    def __on_user_token(self, *ignore):
+        """
+            Submit pending listens with new token
+        """
+        self.__flush_journal()
+
+    def __on_network_available(self, monitor, spec):
+        """
+            Submit pending listens when network comes back
+            @param monitor as Gio.NetworkMonitor
+            @param spec as GObject.ParamSpec
+        """
+        if monitor.get_property("network-available"):
+            self.__flush_journal()
@@ -43,10 +43,7 @@ class PlaybackMenu(Gio.Menu):
             @return bool
         """
         if App().player.albums:
-            for album in App().player.albums:
-                if self.__track.album.id == album.id:
-                    if self.__track.id in album.track_ids:
-                        return True
+            return App().player.track_in_playback(self.__track)
         elif App().player.playlist_ids:
             if self.__track.id in App().player.playlist_track_ids:
                 return True
@@ -74,7 +71,7 @@ class PlaybackMenu(Gio.Menu):
         """
             Set queue actions
         """
-        if self.__track.id not in App().player.queue:
+        if not App().player.track_in_queue(self.__track):
             append_queue_action = Gio.SimpleAction(name="append_queue_action")
             App().add_action(append_queue_action)
             append_queue_action.connect("activate",
@@ -143,13 +140,12 @@ class PlaybackMenu(Gio.Menu):
             @param Gio.SimpleAction
             @param GLib.Variant
         """
-        for album in App().player.albums:
-            if album.id == self.__track.album.id:
-                if self.__track.id in album.track_ids:
-                    index = album.track_ids.index(self.__track.id)
-                    track = album.tracks[index]
-                    album.remove_track(track)
-                    break
+        for album in App().player.get_albums_for_id(self.__track.album.id):
+            if self.__track.id in album.track_ids:
+                index = album.track_ids.index(self.__track.id)
+                track = album.tracks[index]
+                album.remove_track(track)
+                break
         App().player.set_next()
         App().player.set_prev()
 
@@ -159,7 +155,8 @@ class PlaybackMenu(Gio.Menu):
             @param Gio.SimpleAction
             @param GLib.Variant
         """
-        App().player.append_to_queue(self.__track.id, False)
+        App().player.append_to_queue(self.__track.id, False,
+                                     self.__track.album.id)
         App().player.emit("queue-changed")
 
     def __remove_from_queue(self, action, variant):
@@ -14,6 +14,7 @@
 from gi.repository import GLib, Gio
 
 import json
+from collections.abc import MutableSequence
 
 from urllib.parse import urlparse
 from lollypop.radios import Radios
@@ -699,3 +700,163 @@ class Track(Base):
         if getattr(self, "_album_artists") is None:
             self._album_artists = self.album.artists
         return self._album_artists
+
+
+class LazyAlbums(MutableSequence):
+    """
+        Albums backed by album ids, Album objects are created on access
+    """
+
+    def __init__(self, items=None, genre_ids=None, artist_ids=None,
+                 disallow_ignored_tracks=False):
+        """
+            Init albums
+            @param items as [int/Album]
+            @param genre_ids as [int]
+            @param artist_ids as [int]
+            @param disallow_ignored_tracks as bool
+        """
+        self.__items = [] if items is None else list(items)
+        self.__genre_ids = [] if genre_ids is None else genre_ids
+        self.__artist_ids = [] if artist_ids is None else artist_ids
+        self.__disallow_ignored_tracks = disallow_ignored_tracks
+        # Positions for each album id
+        self.__positions = None
+
+    def insert(self, index, album):
+        """
+            Insert album before index
+            @param index as int
+            @param album as Album/int
+        """
+        self.__items.insert(index, album)
+        self.__positions = None
+
+    def index(self, album, start=0, stop=None):
+        """
+            Get album position without creating other albums
+            @param album as Album
+            @param start as int
+            @param stop as int
+            @return int
+        """
+        if stop is None:
+            stop = len(self.__items)
+        for position in range(start, stop):
+            if self.__items[position] is album:
+                return position
+        raise ValueError("%s not in albums" % album)
+
+    def get_album(self, album_id):
+        """
+            Get first album for id
+            @param album_id as int
+            @return Album/None
+        """
+        positions = self.get_positions(album_id)
+        if not positions:
+            return None
+        return self[positions[0]]
+
+    def get_positions(self, album_id):
+        """
+            Get positions of albums for id
+            @param album_id as int
+            @return [int]
+        """
+        if self.__positions is None:
+            self.__positions = {}
+            for (position, item_id) in enumerate(self.ids):
+                if item_id in self.__positions.keys():
+                    self.__positions[item_id].append(position)
+                else:
+                    self.__positions[item_id] = [position]
+        return self.__positions.get(album_id, [])
+
+    def get_state(self):
+        """
+            Get albums state, only albums differing from the ones created
+            on restore are not saved as ids
+            @return {}
+        """
+        items = []
+        for item in self.__items:
+            if isinstance(item, Album):
+                # Do not load artist ids and tracks from DB
+                artist_ids = vars(item).get("artist_ids", [])
+                track_ids = [track.id for track in item._tracks]
+                if not track_ids and\
+                        item.genre_ids == self.__genre_ids and\
+                        artist_ids == self.__artist_ids:
+                    items.append(item.id)
+                else:
+                    items.append([item.id, item.genre_ids, artist_ids,
+                                  track_ids])
+            else:
+                items.append(item)
+        return {"items": items,
+                "genre_ids": self.__genre_ids,
+                "artist_ids": self.__artist_ids,
+                "disallow_ignored_tracks": self.__disallow_ignored_tracks}
+
+    def set_state(self, state):
+        """
+            Restore albums from state
+            @param state as {}
+        """
+        self.__genre_ids = state["genre_ids"]
+        self.__artist_ids = state["artist_ids"]
+        self.__disallow_ignored_tracks = state["disallow_ignored_tracks"]
+        self.__items = []
+        for item in state["items"]:
+            if isinstance(item, list):
+                (album_id, genre_ids, artist_ids, track_ids) = item
+                album = Album(album_id, genre_ids, artist_ids,
+                              self.__disallow_ignored_tracks)
+                if track_ids:
+                    album.set_tracks([Track(track_id)
+                                      for track_id in track_ids])
+                item = album
+            self.__items.append(item)
+        self.__positions = None
+
+    def shuffle(self):
+        """
+            Shuffle albums
+        """
+        from random import shuffle
+        shuffle(self.__items)
+        self.__positions = None
+
+    @property
+    def ids(self):
+        """
+            Get album ids
+            @return [int]
+        """
+        return [item.id if isinstance(item, Album) else item
+                for item in self.__items]
+
+    def __contains__(self, album):
+        return album in self.__items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self.__items[index]
+        if not isinstance(item, Album):
+            item = Album(item, self.__genre_ids, self.__artist_ids,
+                         self.__disallow_ignored_tracks)
+            self.__items[index] = item
+        return item
+
+    def __setitem__(self, index, album):
+        self.__items[index] = album
+        self.__positions = None
+
+    def __delitem__(self, index):
+        del self.__items[index]
+        self.__positions = None
@@ -10,10 +10,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst, GLib
+from gi.repository import Gst, GLib, Gio
 
+import json
 from pickle import load
-from random import choice, shuffle
+from random import choice
 from lollypop.player_bin import BinPlayer
 from lollypop.player_queue import QueuePlayer
 from lollypop.player_linear import LinearPlayer
@@ -23,8 +24,10 @@ from lollypop.player_playlist import PlaylistPlayer
 from lollypop.player_similars import SimilarsPlayer
 from lollypop.radios import Radios
 from lollypop.logger import Logger
-from lollypop.objects import Track, Album
-from lollypop.define import App, Type, LOLLYPOP_DATA_PATH, Shuffle
+from lollypop.watchdog import traced
+from lollypop.objects import Track, Album, LazyAlbums
+from lollypop.define import App, Type, LOLLYPOP_DATA_PATH, Shuffle, Repeat
+from lollypop.define import TaskPriority
 
 
 class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
@@ -33,6 +36,13 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         Player object used to manage playback and playlists
     """
 
+    # Web tracks to resolve ahead in queue
+    __PREFETCH_SIZE = 2
+    __STATE_PATH = "%s/player_state.json" % LOLLYPOP_DATA_PATH
+    __STATE_VERSION = 1
+    __LEGACY_STATE_FILES = ["Albums.bin", "track_id.bin", "queue.bin",
+                            "playlist_ids.bin", "player.bin", "position.bin"]
+
     def __init__(self):
         """
             Init player
@@ -137,9 +147,8 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param album_id as int
         """
         try:
-            for album in self._albums:
-                if album.id == album_id:
-                    self.remove_album(album)
+            for album in self.get_albums_for_id(album_id):
+                self.remove_album(album)
             self.emit("playlist-changed")
         except Exception as e:
             Logger.error("Player::remove_album_by_id(): %s" % e)
@@ -152,13 +161,12 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
         try:
             removed = []
-            for album in self._albums:
-                if album.id == album_id:
-                    for track in list(album.tracks):
-                        if track.id in disc.track_ids:
-                            empty = album.remove_track(track)
-                            if empty:
-                                removed.append(album)
+            for album in self.get_albums_for_id(album_id):
+                for track in list(album.tracks):
+                    if track.id in disc.track_ids:
+                        empty = album.remove_track(track)
+                        if empty:
+                            removed.append(album)
             for album in removed:
                 self._albums.remove(album)
             self.emit("playlist-changed")
@@ -181,7 +189,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         else:
             track = album.tracks[0]
         self.load(track)
-        self._albums = [album]
+        self._albums = LazyAlbums([album])
         self.emit("playlist-changed")
 
     def play_albums(self, album_id, filter1_ids, filter2_ids):
@@ -191,7 +199,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param filter1_ids as [int]
             @param filter2_ids as [int]
         """
-        self._albums = []
+        self._albums = LazyAlbums()
         album_ids = []
         self.reset_history()
         # We are not playing a user playlist anymore
@@ -272,14 +280,9 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         if not album_ids:
             return
 
-        # Create album objects
-        albums = []
-        album = None
-        for _album_id in album_ids:
-            _album = Album(_album_id, filter1_ids, filter2_ids, True)
-            if album_id == _album_id:
-                album = _album
-            albums.append(_album)
+        # Album objects are only created when needed
+        albums = LazyAlbums(album_ids, filter1_ids, filter2_ids, True)
+        album = albums.get_album(album_id)
 
         shuffle_setting = App().settings.get_enum("shuffle")
         if shuffle_setting == Shuffle.ALBUMS:
@@ -322,7 +325,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
             Clear all albums
         """
-        self._albums = []
+        self._albums = LazyAlbums()
         self.set_next()
         self.set_prev()
         self.emit("playlist-changed")
@@ -346,65 +349,102 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             artists = ", ".join(self._current_track.album_artists)
         return artists
 
+    def save_state(self):
+        """
+            Save player state, only ids are saved
+        """
+        if self.current_track.id is None or\
+                self.current_track.mtime == 0:
+            track_id = None
+        elif self.current_track.id == Type.RADIOS:
+            track_id = Radios().get_id(self.current_track.radio_name)
+        else:
+            track_id = self.current_track.id
+        if self.current_track.id == Type.RADIOS:
+            playlist_ids = [Type.RADIOS]
+        else:
+            playlist_ids = self.playlist_ids
+        state = {"version": self.__STATE_VERSION,
+                 "track_id": track_id,
+                 "is_playing": self.is_playing,
+                 "is_party": self.is_party,
+                 "position": self.position if track_id is not None else 0,
+                 "queue": self.queue,
+                 "playlist_ids": playlist_ids,
+                 "albums": None,
+                 "shuffle": None}
+        # Party albums are restored from settings
+        if track_id is not None and self.current_track.id >= 0:
+            if not self.is_party:
+                state["albums"] = self._albums.get_state()
+            state["shuffle"] = self.get_shuffle_state()
+        self.__write_state(state)
+
     def restore_state(self):
         """
             Restore player state
         """
         try:
-            if App().settings.get_value("save-state"):
-                self._current_playback_track = Track(
-                    load(open(LOLLYPOP_DATA_PATH + "/track_id.bin", "rb")))
-                self.set_queue(load(open(LOLLYPOP_DATA_PATH +
-                                         "/queue.bin", "rb")))
-                albums = load(open(LOLLYPOP_DATA_PATH + "/Albums.bin", "rb"))
-                playlist_ids = load(open(LOLLYPOP_DATA_PATH +
-                                         "/playlist_ids.bin", "rb"))
-                (is_playing, was_party) = load(open(LOLLYPOP_DATA_PATH +
-                                                    "/player.bin", "rb"))
-                if playlist_ids and playlist_ids[0] == Type.RADIOS:
-                    radios = Radios()
+            if not App().settings.get_value("save-state"):
+                return
+            f = Gio.File.new_for_path(self.__STATE_PATH)
+            if f.query_exists():
+                (status, content, tag) = f.load_contents(None)
+                state = json.loads(content.decode("utf-8"))
+            else:
+                state = self.__load_legacy_state()
+                if state is None:
+                    return
+                self.__write_state(state)
+            if state["version"] != self.__STATE_VERSION:
+                Logger.info("Player::restore_state(): unknown version")
+                return
+            self._current_playback_track = Track(state["track_id"])
+            self.set_queue(state["queue"])
+            playlist_ids = state["playlist_ids"]
+            if playlist_ids and playlist_ids[0] == Type.RADIOS:
+                radios = Radios()
+                track = Track()
+                name = radios.get_name(self._current_playback_track.id)
+                uri = radios.get_uri(self._current_playback_track.id)
+                track.set_radio(name, uri)
+                self.load(track, state["is_playing"])
+            elif self._current_playback_track.uri:
+                albums = state["albums"]
+                if state["is_party"] or (albums and albums["items"]):
+                    if state["is_party"]:
+                        App().lookup_action("party").change_state(
+                            GLib.Variant("b", True))
+                    else:
+                        self._albums = LazyAlbums()
+                        self._albums.set_state(albums)
+                    if state["shuffle"] is not None:
+                        self.set_shuffle_state(state["shuffle"])
+                    # Load track from player albums
+                    album = self._albums.get_album(
+                        self._current_playback_track.album.id)
+                    for track in album.tracks:
+                        if track.id == self._current_playback_track.id:
+                            self._load_track(track)
+                            break
+                else:
+                    tracks = []
                     track = Track()
-                    name = radios.get_name(self._current_playback_track.id)
-                    uri = radios.get_uri(self._current_playback_track.id)
-                    track.set_radio(name, uri)
-                    self.load(track, is_playing)
-                elif self._current_playback_track.uri:
-                    if albums:
-                        if was_party:
-                            App().lookup_action("party").change_state(
-                                GLib.Variant("b", True))
-                        else:
-                            self._albums = load(open(
-                                                LOLLYPOP_DATA_PATH +
-                                                "/Albums.bin",
-                                                "rb"))
-                        # Load track from player albums
-                        index = self.album_ids.index(
-                            self._current_playback_track.album.id)
-                        for track in self._albums[index].tracks:
+                    for playlist_id in playlist_ids:
+                        tracks += App().playlists.get_tracks(playlist_id)
+                        for track in tracks:
                             if track.id == self._current_playback_track.id:
-                                self._load_track(track)
                                 break
-                    else:
-                        tracks = []
-                        track = Track()
-                        for playlist_id in playlist_ids:
-                            tracks += App().playlists.get_tracks(playlist_id)
-                            for track in tracks:
-                                if track.id == self._current_playback_track.id:
-                                    break
-                        self.populate_playlist_by_tracks(
-                            tracks, playlist_ids, track)
-                    if is_playing:
-                        self.play()
-                    else:
-                        self.pause()
-                    position = load(open(LOLLYPOP_DATA_PATH + "/position.bin",
-                                    "rb"))
-                    self.seek(position / Gst.SECOND)
+                    self.populate_playlist_by_tracks(
+                        tracks, playlist_ids, track)
+                if state["is_playing"]:
+                    self.play()
                 else:
-                    Logger.info("Player::restore_state(): track missing")
-                self.emit("playlist-changed")
+                    self.pause()
+                self.seek(state["position"] / Gst.SECOND)
+            else:
+                Logger.info("Player::restore_state(): track missing")
+            self.emit("playlist-changed")
         except Exception as e:
             Logger.error("Player::restore_state(): %s" % e)
 
@@ -438,6 +478,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         except Exception as e:
             Logger.error("Player::set_prev(): %s" % e)
 
+    @traced
     def set_next(self):
         """
             Play next track
@@ -463,8 +504,10 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
                 next_track = LinearPlayer.next(self)
 
             self._next_track = next_track
-            if next_track.is_web:
-                App().task_helper.run(self._load_from_web, next_track, False)
+            if next_track.id is not None and next_track.id >= 0:
+                App().task_helper.run(self._preroll_track, next_track,
+                                      priority=TaskPriority.BACKGROUND)
+            self.__prefetch_web_tracks()
             self.emit("next-changed")
         except Exception as e:
             Logger.error("Player::set_next(): %s" % e)
@@ -506,11 +549,9 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param track as Track
             @return bool
         """
-        for album in self._albums:
-            if album.id == track.album.id:
-                for track_id in album.track_ids:
-                    if track.id == track_id:
-                        return True
+        for album in self.get_albums_for_id(track.album.id):
+            if track.id in album.track_ids:
+                return True
         return False
 
     def get_albums_for_id(self, album_id):
@@ -519,7 +560,8 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param album_id as int
             @return [Album]
         """
-        return [album for album in self._albums if album.id == album_id]
+        return [self._albums[position]
+                for position in self._albums.get_positions(album_id)]
 
     @property
     def next_track(self):
@@ -549,7 +591,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             Return albums ids
             @return albums ids as [int]
         """
-        return [album.id for album in self._albums]
+        return self._albums.ids
 
     @property
     def stop_after_track_id(self):
@@ -562,6 +604,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
 #######################
 # PROTECTED           #
 #######################
+    @traced
     def _on_stream_start(self, bus, message):
         """
             On stream start, set next and previous track
@@ -578,20 +621,132 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
 #######################
 # PRIVATE             #
 #######################
+    def __write_state(self, state):
+        """
+            Write state to disk, remove state files from previous versions
+            @param state as {}
+        """
+        try:
+            f = Gio.File.new_for_path(self.__STATE_PATH)
+            # Replacing contents is atomic
+            f.replace_contents(json.dumps(state).encode("utf-8"), None,
+                               False, Gio.FileCreateFlags.REPLACE_DESTINATION,
+                               None)
+            for filename in self.__LEGACY_STATE_FILES:
+                f = Gio.File.new_for_path("%s/%s" % (LOLLYPOP_DATA_PATH,
+                                                     filename))
+                if f.query_exists():
+                    f.delete(None)
+        except Exception as e:
+            Logger.error("Player::__write_state(): %s" % e)
+
+    def __load_legacy_file(self, filename, default):
+        """
+            Load a state file pickled by previous versions
+            @param filename as str
+            @param default as object
+            @return object
+        """
+        path = "%s/%s" % (LOLLYPOP_DATA_PATH, filename)
+        if not GLib.file_test(path, GLib.FileTest.EXISTS):
+            return default
+        with open(path, "rb") as f:
+            return load(f)
+
+    def __load_legacy_state(self):
+        """
+            Convert state pickled by previous versions
+            @return {}/None
+        """
+        try:
+            track_id = self.__load_legacy_file("track_id.bin", None)
+            if track_id is None:
+                return None
+            (is_playing, is_party) = self.__load_legacy_file(
+                "player.bin", (False, False))
+            albums = None
+            if not is_party:
+                items = self.__load_legacy_file("Albums.bin", [])
+                if items:
+                    albums = LazyAlbums(items).get_state()
+            position = self.__load_legacy_file("position.bin", 0)
+            queue = self.__load_legacy_file("queue.bin", [])
+            playlist_ids = self.__load_legacy_file("playlist_ids.bin", [])
+            return {"version": self.__STATE_VERSION,
+                    "track_id": track_id,
+                    "is_playing": is_playing,
+                    "is_party": is_party,
+                    "position": position,
+                    "queue": queue,
+                    "playlist_ids": playlist_ids,
+                    "albums": albums,
+                    "shuffle": None}
+        except Exception as e:
+            Logger.error("Player::__load_legacy_state(): %s" % e)
+            return None
+
+    def __prefetch_web_tracks(self):
+        """
+            Resolve web tracks following next track
+        """
+        tracks = [track for track in
+                  self.__get_upcoming_tracks(self.__PREFETCH_SIZE)
+                  if track.is_web]
+        if tracks:
+            from lollypop.helper_web import WebHelper
+            App().task_helper.run(WebHelper().prefetch, tracks,
+                                  priority=TaskPriority.BACKGROUND)
+
+    def __get_upcoming_tracks(self, count):
+        """
+            Get tracks following next track in queue, user playlist or
+            albums. Shuffled tracks are not known before being dealt
+            @param count as int
+            @return [Track]
+        """
+        next_track = self._next_track
+        if next_track.id is None or next_track.id < 0 or\
+                App().settings.get_enum("repeat") == Repeat.TRACK:
+            return []
+        if self.queue:
+            return [Track(track_id)
+                    for track_id in self.queue[:count + 1]
+                    if track_id != next_track.id][:count]
+        if self.is_party or self._shuffle == Shuffle.TRACKS:
+            return []
+        if self._playlist_tracks:
+            track_ids = self.playlist_track_ids
+            if next_track.id not in track_ids:
+                return []
+            index = track_ids.index(next_track.id) + 1
+            return self._playlist_tracks[index:index + count]
+        album = next_track.album
+        tracks = album.tracks[next_track.position + 1:]
+        for position in self._albums.get_positions(album.id):
+            if self._albums[position] is not album:
+                continue
+            position += 1
+            while len(tracks) < count and position < len(self._albums):
+                tracks += self._albums[position].tracks
+                position += 1
+            break
+        return tracks[:count]
+
     def __play_shuffle_albums(self, album, albums):
         """
             Start shuffle albums playback. Prepend album if not None
             @param album as Album
-            @param albums as [albums]
+            @param albums as LazyAlbums
         """
         track = None
         if album is None:
             album = choice(albums)
+            albums.shuffle()
         else:
-            self._albums = [album]
             albums.remove(album)
-        shuffle(albums)
-        self._albums += albums
+            albums.shuffle()
+            albums.insert(0, album)
+        self._albums = albums
         if album.tracks:
             track = album.tracks[0]
         if track is not None:
@@ -601,7 +756,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
             Start shuffle tracks playback.
             @param album as Album
-            @param albums as [albums]
+            @param albums as LazyAlbums
         """
         if album is None:
             album = choice(albums)
@@ -617,7 +772,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
             Start albums playback.
             @param album as Album
-            @param albums as [albums]
+            @param albums as LazyAlbums
         """
         if album is None:
             album = albums[0]
@@ -13,7 +13,7 @@
 from gi.repository import GObject
 
 from lollypop.define import App
-from lollypop.objects import Track
+from lollypop.objects import Track, LazyAlbums
 
 
 class BasePlayer(GObject.GObject):
@@ -58,7 +58,7 @@ class BasePlayer(GObject.GObject):
             self._next_track = Track()
             self._prev_track = Track()
             # Albums in current playlist
-            self._albums = []
+            self._albums = LazyAlbums()
             # Current shuffle mode
             self._shuffle = App().settings.get_enum("shuffle")
             # For tracks from the cmd line
@@ -17,17 +17,20 @@ from time import time
 from lollypop.player_base import BasePlayer
 from lollypop.tagreader import TagReader
 from lollypop.player_plugins import PluginsPlayer
-from lollypop.define import GstPlayFlags, App
+from lollypop.define import GstPlayFlags, App, TaskPriority
 from lollypop.codecs import Codecs
 from lollypop.define import Type
 from lollypop.logger import Logger
-from lollypop.objects import Track
+from lollypop.watchdog import traced
+from lollypop.objects import Track, LazyAlbums
 
 
 class BinPlayer(BasePlayer):
     """
         Gstreamer bin player
     """
+    # Bytes read from next track file to warm up storage
+    __WARM_UP_SIZE = 65536
 
     def __init__(self):
         """
@@ -35,6 +38,12 @@ class BinPlayer(BasePlayer):
         """
         BasePlayer.__init__(self)
         self.__cancellable = Gio.Cancellable()
+        # Next track ready for a gapless transition:
+        # (Track, uri, ReplayGain as tuple)
+        self.__prerolled = (None, None, None)
+        # ReplayGain from DB for loaded track: (track id, tuple/None)
+        self.__replaygain = (None, None)
+        self.__started_track_id = None
         self.__codecs = Codecs()
         self._playbin = self.__playbin1 = Gst.ElementFactory.make(
             "playbin", "player")
@@ -122,7 +131,7 @@ class BinPlayer(BasePlayer):
             self._next_track = Track()
             App().player.emit("prev-changed")
             App().player.emit("next-changed")
-            self._albums = []
+            self._albums = LazyAlbums()
             self.reset_history()
 
     def stop_all(self):
@@ -253,6 +262,7 @@ class BinPlayer(BasePlayer):
             @return False if track not loaded
         """
         if init_volume:
+            self._plugins.clear_fade()
             self._plugins.volume.props.volume = 1.0
         Logger.debug("BinPlayer::_load_track(): %s" % track.uri)
         try:
@@ -263,11 +273,16 @@ class BinPlayer(BasePlayer):
             # Will not work if we add another music provider one day
             track_uri = App().tracks.get_uri(track.id)
             if track.is_web and track.uri == track_uri:
-                self.emit("loading-changed", True)
-                App().task_helper.run(self._load_from_web, track)
-                return False
-            else:
-                self._playbin.set_property("uri", track.uri)
+                # Content uri may have been prefetched
+                from lollypop.helper_web import WebHelper
+                uri = WebHelper().get_cached_track_content(track)
+                if uri is None:
+                    self.emit("loading-changed", True)
+                    App().task_helper.run(self._load_from_web, track)
+                    return False
+                track.set_uri(uri)
+            self._playbin.set_property("uri", track.uri)
+            self.__load_replaygain(track)
         except Exception as e:  # Gstreamer error
             Logger.error("BinPlayer::_load_track(): %s" % e)
             return False
@@ -292,6 +307,35 @@ class BinPlayer(BasePlayer):
         uri = helper.get_track_content(track)
         GLib.idle_add(play_uri, uri)
 
+    def _preroll_track(self, track):
+        """
+            Prepare track for a gapless transition: resolve its uri, load
+            its duration and ReplayGain and warm up its file
+            @param track as Track
+            @thread safe
+        """
+        try:
+            if track.is_web:
+                from lollypop.helper_web import WebHelper
+                helper = WebHelper()
+                helper.prefetch([track])
+                uri = helper.get_cached_track_content(track)
+            else:
+                uri = App().tracks.get_uri(track.id)
+                f = Gio.File.new_for_uri(uri)
+                if f.is_native():
+                    stream = f.read(None)
+                    stream.read_bytes(self.__WARM_UP_SIZE, None)
+                    stream.close(None)
+            # Load duration from DB
+            track.duration
+            replaygain = App().tracks.get_replaygain(track.id)\
+                if track.id is not None and track.id >= 0 else None
+            if uri:
+                self.__prerolled = (track, uri, replaygain)
+        except Exception as e:
+            Logger.error("BinPlayer::_preroll_track(): %s" % e)
+
     def _scrobble(self, finished, finished_start_time):
         """
             Scrobble on lastfm
@@ -321,11 +365,19 @@ class BinPlayer(BasePlayer):
         Logger.debug("Player::_on_stream_start(): %s" %
                      self._current_track.uri)
         self.emit("current-changed")
+        self.__started_track_id = self._current_track.id
+        (track_id, replaygain) = self.__replaygain
+        if track_id != self._current_track.id:
+            self._plugins.set_replaygain(None, None)
+        # Else, set when loaded
+        elif replaygain is not None:
+            self._plugins.set_replaygain(replaygain[0], replaygain[2])
         for scrobbler in App().scrobblers:
             if scrobbler.available:
                 scrobbler.playing_now(self._current_track)
-        App().tracks.set_listened_at(self._current_track.id, int(time()))
+        App().stats.set_listened_at(self._current_track.id, int(time()))
 
+    @traced
     def _on_bus_message_tag(self, bus, message):
         """
             Read tags from stream
@@ -413,32 +465,13 @@ class BinPlayer(BasePlayer):
             return
         if self._current_track.id == Type.RADIOS:
             return
-        self._scrobble(self._current_track, self._start_time)
-        # Increment popularity
-        if self._current_track.id is not None and self._current_track.id >= 0:
-            App().tracks.set_more_popular(self._current_track.id)
-            # In party mode, linear popularity
-            if self.is_party:
-                pop_to_add = 1
-            # In normal mode, based on tracks count
-            else:
-                # Some users report an issue where get_tracks_count() return 0
-                # See issue #886
-                # Don"t understand how this can happen!
-                count = App().albums.get_tracks_count(
-                    self._current_track.album_id)
-                if count:
-                    pop_to_add = int(App().albums.max_count / count)
-                else:
-                    pop_to_add = 1
-            App().albums.set_more_popular(self._current_track.album_id,
-                                          pop_to_add)
+        # We are in gstreamer thread, do not wait for bookkeeping
+        self.__track_finished(self._current_track, self._start_time)
         if self._next_track.id is None:
-            # We are in gstreamer thread
             GLib.idle_add(self.stop)
             # Reenable as it has been disabled by do_crossfading()
             self.update_crossfading()
-        else:
+        elif not self.__load_prerolled(self._next_track):
             self._load_track(self._next_track)
 
 #######################
@@ -470,17 +503,12 @@ class BinPlayer(BasePlayer):
         if self._playbin != playbin:
             return
         if duration > 0:
-            vol = plugins.volume.props.volume
-            steps = duration / 0.25
-            vol_up = (1.0 - vol) / steps
-            rate = vol + vol_up
-            if rate < 1.0:
-                plugins.volume.props.volume = rate
-                GLib.timeout_add(250, self.__volume_up,
-                                 playbin, plugins, duration - 0.25)
-            else:
-                plugins.volume.props.volume = 1.0
+            fade_id = plugins.fade(self.__get_stream_time(playbin),
+                                   duration, 1.0)
+            GLib.timeout_add(int(duration * 1000), self.__on_fade_done,
+                             playbin, plugins, fade_id)
         else:
+            plugins.clear_fade()
             plugins.volume.props.volume = 1.0
 
     def __volume_down(self, playbin, plugins, duration):
@@ -494,18 +522,12 @@ class BinPlayer(BasePlayer):
         if self._playbin == playbin:
             return
         if duration > 0:
-            vol = plugins.volume.props.volume
-            steps = duration / 0.25
-            vol_down = vol / steps
-            rate = vol - vol_down
-            if rate > 0:
-                plugins.volume.props.volume = rate
-                GLib.timeout_add(250, self.__volume_down,
-                                 playbin, plugins, duration - 0.25)
-            else:
-                plugins.volume.props.volume = 0.0
-                playbin.set_state(Gst.State.NULL)
+            fade_id = plugins.fade(self.__get_stream_time(playbin),
+                                   duration, 0.0)
+            GLib.timeout_add(int(duration * 1000), self.__on_fade_done,
+                             playbin, plugins, fade_id)
         else:
+            plugins.clear_fade()
             plugins.volume.props.volume = 0.0
             playbin.set_state(Gst.State.NULL)
 
@@ -516,23 +538,7 @@ class BinPlayer(BasePlayer):
             @param track as Track
         """
         if track is None:
-            self._scrobble(self._current_track, self._start_time)
-            # Increment popularity
-            App().tracks.set_more_popular(self._current_track.id)
-            # In party mode, linear popularity
-            if self.is_party:
-                pop_to_add = 1
-            # In normal mode, based on tracks count
-            else:
-                count = App().albums.get_tracks_count(
-                    self._current_track.album_id)
-                if count:
-                    pop_to_add = int(App().albums.max_count / count)
-                else:
-                    pop_to_add = 0
-            if pop_to_add > 0:
-                App().albums.set_more_popular(self._current_track.album_id,
-                                              pop_to_add)
+            self.__track_finished(self._current_track, self._start_time)
 
         GLib.idle_add(self.__volume_down, self._playbin,
                       self._plugins, duration)
@@ -545,15 +551,103 @@ class BinPlayer(BasePlayer):
 
         if track is not None and track.id is not None:
             self.__load(track, False)
+            self._plugins.clear_fade()
             self._plugins.volume.props.volume = 0
             GLib.idle_add(self.__volume_up, self._playbin,
                           self._plugins, duration)
         elif self._next_track.id is not None:
             self.__load(self._next_track, False)
+            self._plugins.clear_fade()
             self._plugins.volume.props.volume = 0
             GLib.idle_add(self.__volume_up, self._playbin,
                           self._plugins, duration)
 
+    def __load_replaygain(self, track):
+        """
+            Load track ReplayGain from DB in background
+            @param track as Track
+        """
+        if track.id is None or track.id < 0:
+            self.__replaygain = (None, None)
+            return
+        self.__replaygain = (track.id, None)
+        App().task_helper.run(App().tracks.get_replaygain, track.id,
+                              callback=(self.__on_replaygain, track.id),
+                              priority=TaskPriority.INTERACTIVE)
+
+    def __load_prerolled(self, track):
+        """
+            Load track if prerolled, only swap playbin uri
+            @param track as Track
+            @return False if track not prerolled
+        """
+        (prerolled, uri, replaygain) = self.__prerolled
+        if prerolled is not track:
+            return False
+        self.__prerolled = (None, None, None)
+        if replaygain is None:
+            self.__load_replaygain(track)
+        else:
+            self.__replaygain = (track.id, replaygain)
+        self._plugins.volume.props.volume = 1.0
+        self._current_track = track
+        if track.is_web:
+            track.set_uri(uri)
+        self._playbin.set_property("uri", uri)
+        return True
+
+    def __track_finished(self, track, start_time):
+        """
+            Queue bookkeeping for finished track
+            @param track as Track
+            @param start_time as int
+        """
+        if track.id is None or track.id < 0:
+            return
+        GLib.idle_add(self._scrobble, track, start_time)
+        App().task_helper.run(self.__update_popularity, track, self.is_party,
+                              priority=TaskPriority.BACKGROUND)
+
+    def __update_popularity(self, track, is_party):
+        """
+            Increment popularity for track and its album
+            @param track as Track
+            @param is_party as bool
+        """
+        # In party mode, linear popularity
+        if is_party:
+            pop_to_add = 1
+        # In normal mode, based on tracks count
+        else:
+            # Some users report an issue where get_tracks_count() return 0
+            # See issue #886
+            # Don"t understand how this can happen!
+            count = App().albums.get_tracks_count(track.album_id)
+            if count:
+                pop_to_add = int(App().albums.max_count / count)
+            else:
+                pop_to_add = 1
+        App().stats.add_popularity(track.id, track.album_id, pop_to_add)
+
+    def __get_stream_time(self, playbin):
+        """
+            Get playbin stream time, fades are scheduled against it
+            @param playbin as Gst.Bin
+            @return int
+        """
+        (success, position) = playbin.query_position(Gst.Format.TIME)
+        return position if success and position > 0 else 0
+
+    def __on_fade_done(self, playbin, plugins, fade_id):
+        """
+            Remove fade, stop playbin if not active anymore
+            @param playbin as Gst.Bin
+            @param plugins as PluginsPlayer
+            @param fade_id as int
+        """
+        if plugins.clear_fade(fade_id) and self._playbin != playbin:
+            playbin.set_state(Gst.State.NULL)
+
     def __update_current_duration(self, track, uri):
         """
             Update current track duration
@@ -583,3 +677,17 @@ class BinPlayer(BasePlayer):
             vol = self.__playbin2.get_volume(GstAudio.StreamVolumeFormat.CUBIC)
             self.__playbin1.set_volume(GstAudio.StreamVolumeFormat.CUBIC, vol)
         self.emit("volume-changed")
+
+    def __on_replaygain(self, replaygain, track_id):
+        """
+            Set ReplayGain if track stream already started
+            @param replaygain as (float/None, float/None,
+                                  float/None, float/None)
+            @param track_id as int
+        """
+        if self.__replaygain[0] != track_id:
+            return
+        self.__replaygain = (track_id, replaygain)
+        if self.__started_track_id == track_id and\
+                self._current_track.id == track_id:
+            self._plugins.set_replaygain(replaygain[0], replaygain[2])
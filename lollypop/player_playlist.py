@@ -14,7 +14,7 @@ from gi.repository import GLib
 
 from lollypop.define import Repeat, App
 from lollypop.player_base import BasePlayer
-from lollypop.objects import Track
+from lollypop.objects import Track, LazyAlbums
 
 
 class PlaylistPlayer(BasePlayer):
@@ -64,7 +64,7 @@ class PlaylistPlayer(BasePlayer):
             @param track as Track
         """
         App().lookup_action("party").change_state(GLib.Variant("b", False))
-        self._albums = []
+        self._albums = LazyAlbums()
         self._playlist_tracks = tracks
         self._playlist_ids = playlist_ids
         self.emit("playlist-changed")
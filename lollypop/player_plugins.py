@@ -11,9 +11,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst
+from gi.repository import Gst, GstController
 
-from lollypop.define import App
+from math import sin, pi
+
+from lollypop.define import App, TransitionCurve
 from lollypop.logger import Logger
 
 
@@ -21,6 +23,8 @@ class PluginsPlayer:
     """
         Replay gain player
     """
+    # Points used to sample non linear fade curves
+    __CURVE_POINTS = 8
 
     def __init__(self, playbin):
         """
@@ -28,12 +32,17 @@ class PluginsPlayer:
             @param playbin as Gst.bin
         """
         self.__playbin = playbin
+        self.__fade_binding = None
+        self.__fade_volume = 1.0
+        self.__fade_id = 0
         self.init()
 
     def init(self):
         """
             Init playbin
         """
+        # Fade is bound to current volume element
+        self.clear_fade()
         bin = Gst.ElementFactory.make("bin", "bin")
 
         rg_audioconvert1 = Gst.ElementFactory.make("audioconvert",
@@ -128,6 +137,86 @@ class PluginsPlayer:
         except Exception as e:
             Logger.error("PluginsPlayer::set_equalizer():", e)
 
+    def set_replaygain(self, track_gain, album_gain):
+        """
+            Set gain used by rgvolume for tracks without ReplayGain tags
+            @param track_gain as float/None
+            @param album_gain as float/None
+        """
+        if self.rgvolume is None:
+            return
+        if self.rgvolume.props.album_mode and album_gain is not None:
+            gain = album_gain
+        elif track_gain is not None:
+            gain = track_gain
+        else:
+            gain = 0.0
+        self.rgvolume.props.fallback_gain = gain
+
+    def fade(self, position, duration, volume):
+        """
+            Fade volume, values are computed by GStreamer for each buffer
+            @param position as int (stream time fade starts at)
+            @param duration as float (seconds)
+            @param volume as float (volume at fade end)
+            @return fade id as int
+        """
+        self.clear_fade()
+        self.__fade_id += 1
+        start = self.volume.props.volume
+        curve = App().settings.get_enum("transition-curve")
+        source = GstController.InterpolationControlSource.new()
+        if curve == TransitionCurve.LINEAR:
+            source.props.mode = GstController.InterpolationMode.LINEAR
+            points = [(0, 0), (1, 1)]
+        else:
+            source.props.mode =\
+                GstController.InterpolationMode.CUBIC_MONOTONIC
+            points = self.__get_curve_points(curve, volume < start)
+        for (x, y) in points:
+            source.set(position + int(x * duration * Gst.SECOND),
+                       start + (volume - start) * y)
+        self.__fade_binding = GstController.DirectControlBinding.new_absolute(
+            self.volume, "volume", source)
+        self.__fade_volume = volume
+        self.volume.add_control_binding(self.__fade_binding)
+        return self.__fade_id
+
+    def clear_fade(self, fade_id=None):
+        """
+            Stop fade and set volume to its end value
+            @param fade_id as int, only clear this fade if not None
+            @return True if fade cleared
+        """
+        if self.__fade_binding is None or\
+                (fade_id is not None and fade_id != self.__fade_id):
+            return False
+        self.volume.remove_control_binding(self.__fade_binding)
+        self.__fade_binding = None
+        self.volume.props.volume = self.__fade_volume
+        return True
+
 #######################
 # PRIVATE             #
 #######################
+    def __get_curve_points(self, curve, down):
+        """
+            Get normalized points for curve
+            @param curve as TransitionCurve
+            @param down as bool
+            @return [(float, float)]
+        """
+        points = []
+        for i in range(0, self.__CURVE_POINTS + 1):
+            x = i / self.__CURVE_POINTS
+            # Fading down mirrors fading up: gain goes 1 -> 0 as 0 -> 1
+            if down:
+                x = 1 - x
+            if curve == TransitionCurve.EQUAL_POWER:
+                y = sin(x * pi / 2)
+            else:
+                y = x * x * (3 - 2 * x)
+            if down:
+                (x, y) = (1 - x, 1 - y)
+            points.append((x, y))
+        return points
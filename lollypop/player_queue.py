@@ -10,53 +10,58 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
+
 from lollypop.objects import Track
+from lollypop.define import App
 
 
 class QueuePlayer:
     """
         Manage queue
+        Queue maps track ids to album ids in play order, so rows can check
+        their state and tracks can be added/removed in constant time
     """
 
     def __init__(self):
         """
             Init queue
         """
-        self.__queue = []
+        self.__set_queue([])
 
     def set_queue(self, queue):
         """
             Set queue
             @param queue as [int]
         """
-        self.__queue = queue
+        self.__set_queue(queue)
 
-    def append_to_queue(self, track_id, notify=True):
+    def append_to_queue(self, track_id, notify=True, album_id=None):
         """
             Append track to queue,
             remove previous track if exist
             @param track_id as int
             @param notify as bool
+            @param album_id as int, looked up in DB if None
         """
-        if track_id in self.__queue:
-            self.__queue.remove(track_id)
-        self.__queue.append(track_id)
+        self.__remove(track_id)
+        self.__add(track_id, len(self.__queue), album_id)
         self.set_next()
         self.set_prev()
         if notify:
             self.emit("queue-changed")
 
-    def insert_in_queue(self, track_id, pos=0, notify=True):
+    def insert_in_queue(self, track_id, pos=0, notify=True, album_id=None):
         """
             Prepend track to queue,
             remove previous track if exist
             @param track_id as int
             @param pos as int
             @param notify as bool
+            @param album_id as int, looked up in DB if None
         """
-        if track_id in self.__queue:
-            self.__queue.remove(track_id)
-        self.__queue.insert(pos, track_id)
+        self.__remove(track_id)
+        self.__add(track_id, pos, album_id)
         self.set_next()
         self.set_prev()
         if notify:
@@ -68,8 +73,7 @@ class QueuePlayer:
             @param track_id as int
             @param notify as bool
         """
-        if track_id in self.__queue:
-            self.__queue.remove(track_id)
+        self.__remove(track_id)
         if notify:
             self.emit("queue-changed")
 
@@ -79,7 +83,7 @@ class QueuePlayer:
             @param [ids as int]
             @param notify as bool
         """
-        self.__queue = []
+        self.__set_queue([])
         if notify:
             self.emit("queue-changed")
 
@@ -89,10 +93,7 @@ class QueuePlayer:
             @param track as Track
             @return bool
         """
-        if self.__queue:
-            return track.id in self.__queue
-        else:
-            return False
+        return track.id in self.__queue.keys()
 
     def album_in_queue(self, album):
         """
@@ -100,11 +101,17 @@ class QueuePlayer:
             @param album as Album
             @return bool
         """
-        if self.__queue:
-            union = set(self.__queue) & set(album.track_ids)
-            return len(union) == len(album.track_ids)
-        else:
+        count = self.__album_counts.get(album.id, 0)
+        # Do not load album tracks if none queued
+        if count == 0:
+            return False
+        track_ids = album.track_ids
+        if count < len(track_ids):
             return False
+        for track_id in track_ids:
+            if track_id not in self.__queue.keys():
+                return False
+        return True
 
     def get_track_position(self, track_id):
         """
@@ -112,26 +119,94 @@ class QueuePlayer:
             @param track_id as int
             @return position as int
         """
-        return self.__queue.index(track_id) + 1
+        if self.__positions is None:
+            self.__positions = {}
+            for (position, _track_id) in enumerate(self.__queue.keys()):
+                self.__positions[_track_id] = position
+        return self.__positions[track_id] + 1
 
     def next(self):
         """
             Get next track id
             @return Track
         """
-        track_id = None
-        if self.__queue:
-            track_id = self.__queue[0]
-        return Track(track_id)
+        for track_id in self.__queue.keys():
+            return Track(track_id)
+        return Track()
 
     @property
     def queue(self):
         """
-            Return queue
+            Return queue, do not modify it
             @return [ids as int]
         """
-        return self.__queue
+        if self.__track_ids is None:
+            self.__track_ids = list(self.__queue.keys())
+        return self.__track_ids
 
 #######################
 # PRIVATE             #
 #######################
+    def __set_queue(self, queue):
+        """
+            Set queue and build indexes
+            @param queue as [int]
+        """
+        # Track id => album id, in play order
+        self.__queue = OrderedDict()
+        # Album id => tracks count in queue
+        self.__album_counts = {}
+        # Track id => position, built on demand
+        self.__positions = None
+        # Queue as list, built on demand
+        self.__track_ids = None
+        album_ids = {}
+        if queue:
+            album_ids = App().tracks.get_album_ids_for_tracks(queue)
+        for track_id in queue:
+            if track_id not in self.__queue.keys():
+                self.__add(track_id, len(self.__queue),
+                           album_ids.get(track_id, -1))
+
+    def __add(self, track_id, pos, album_id):
+        """
+            Add track to queue
+            @param track_id as int
+            @param pos as int
+            @param album_id as int/None
+        """
+        if album_id is None:
+            album_id = App().tracks.get_album_id(track_id)
+        self.__album_counts[album_id] = self.__album_counts.get(album_id,
+                                                                0) + 1
+        self.__track_ids = None
+        if pos >= len(self.__queue):
+            self.__queue[track_id] = album_id
+            if self.__positions is not None:
+                self.__positions[track_id] = len(self.__queue) - 1
+        elif pos <= 0:
+            self.__queue[track_id] = album_id
+            self.__queue.move_to_end(track_id, False)
+            self.__positions = None
+        else:
+            # Only drag and drop inserts in the middle of the queue
+            items = list(self.__queue.items())
+            items.insert(pos, (track_id, album_id))
+            self.__queue = OrderedDict(items)
+            self.__positions = None
+
+    def __remove(self, track_id):
+        """
+            Remove track from queue if exists
+            @param track_id as int
+        """
+        if track_id not in self.__queue.keys():
+            return
+        album_id = self.__queue.pop(track_id)
+        count = self.__album_counts[album_id] - 1
+        if count:
+            self.__album_counts[album_id] = count
+        else:
+            del self.__album_counts[album_id]
+        self.__track_ids = None
+        self.__positions = None
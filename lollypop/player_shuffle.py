@@ -11,10 +11,11 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import random
+from collections import Counter
 
 from lollypop.define import Shuffle, Repeat, App, Type
 from lollypop.player_base import BasePlayer
-from lollypop.objects import Track, Album
+from lollypop.objects import Track, LazyAlbums
 from lollypop.list import LinkedList
 from lollypop.logger import Logger
 
@@ -34,6 +35,7 @@ class ShufflePlayer(BasePlayer):
         self.__is_party = False
         self.reset_history()
         App().settings.connect("changed::shuffle", self.__set_shuffle)
+        self.connect("playlist-changed", self.__on_playlist_changed)
 
     def reset_history(self):
         """
@@ -43,8 +45,9 @@ class ShufflePlayer(BasePlayer):
         self.__history = []
         # Albums already played
         self.__already_played_albums = []
-        # Tracks already played for albums
+        # Tracks ids already played for albums
         self.__already_played_tracks = {}
+        self.__reset_deck()
         # Reset user playlist
         self._playlist_tracks = []
         self._playlist_ids = []
@@ -113,7 +116,7 @@ class ShufflePlayer(BasePlayer):
                 self.play()
         else:
             # We want current album to continue playback
-            self._albums = [self._current_playback_track.album]
+            self._albums = LazyAlbums([self._current_playback_track.album])
         if self._current_playback_track.id is not None:
             self.set_next()
             self.set_prev()
@@ -127,12 +130,43 @@ class ShufflePlayer(BasePlayer):
         album_ids = App().albums.get_ids([], party_ids, True)
         if not album_ids:
             album_ids = App().albums.get_ids([], party_ids, False)
-        self._albums = []
-        for album_id in album_ids:
-            album = Album(album_id, [], [], True)
-            self._albums.append(album)
+        self._albums = LazyAlbums(album_ids, [], [], True)
         self.emit("playlist-changed")
 
+    def get_shuffle_state(self):
+        """
+            Get shuffle deck state
+            @return {}
+        """
+        album_decks = {}
+        for (album_id, tracks) in self.__album_decks.items():
+            album_decks[album_id] = [track.id for track in tracks]
+        played_tracks = {}
+        for (album_id, track_ids) in self.__already_played_tracks.items():
+            played_tracks[album_id] = list(track_ids)
+        return {"deck": self.__deck,
+                "deck_albums": list(self.__deck_albums.elements()),
+                "album_decks": album_decks,
+                "played_tracks": played_tracks,
+                "played_albums": self.__already_played_albums}
+
+    def set_shuffle_state(self, state):
+        """
+            Restore shuffle deck, albums added since are dealt on next track
+            @param state as {}
+        """
+        self.__deck = state["deck"]
+        self.__deck_albums = Counter(state["deck_albums"])
+        self.__deck_source = None
+        self.__album_decks = {}
+        for (album_id, track_ids) in state["album_decks"].items():
+            self.__album_decks[int(album_id)] = [Track(track_id)
+                                                 for track_id in track_ids]
+        self.__already_played_tracks = {}
+        for (album_id, track_ids) in state["played_tracks"].items():
+            self.__already_played_tracks[int(album_id)] = set(track_ids)
+        self.__already_played_albums = state["played_albums"]
+
     @property
     def is_party(self):
         """
@@ -195,6 +229,7 @@ class ShufflePlayer(BasePlayer):
                 new_list = LinkedList(self._current_playback_track)
                 self.__history = new_list
             self.__add_to_shuffle_history(self._current_playback_track)
+            self.__commit_deal(self._current_playback_track)
 
 #######################
 # PRIVATE             #
@@ -234,6 +269,7 @@ class ShufflePlayer(BasePlayer):
                     self.__already_played_albums = []
                     self.__already_played_tracks = {}
                     self.__history = []
+                    self.__reset_deck()
                     repeat = App().settings.get_enum("repeat")
                     if repeat == Repeat.ALL:
                         return self.__get_next()
@@ -251,37 +287,136 @@ class ShufflePlayer(BasePlayer):
                 self._playlist_tracks, key=lambda *args: random.random()):
             # Ignore current track, not an issue if playing one track
             # in shuffle because LinearPlayer will handle next()
-            if track != App().player.current_track and (
-                   track.album not in self.__already_played_tracks.keys() or
-                   track not in self.__already_played_tracks[track.album]):
+            if track.id != App().player.current_track.id and\
+                    track.id not in self.__already_played_tracks.get(
+                        track.album.id, []):
                 return track
         return Track()
 
     def __get_tracks_random(self):
         """
             Return a random track and make sure it has never been played
+            Albums are dealt from a shuffled deck, then a track is dealt
+            from a shuffled deck of album tracks
+            Track stays on top of decks until it starts playing
             @return Track
         """
-        for album in sorted(self._albums, key=lambda *args: random.random()):
-            for track in sorted(album.tracks,
-                                key=lambda *args: random.random()):
-                # Ignore current track, not an issue if playing one track
-                # in shuffle because LinearPlayer will handle next()
-                if track != App().player.current_track and (
-                        album not in self.__already_played_tracks.keys() or
-                        track not in self.__already_played_tracks[album]):
-                    return track
-            if album in self.__already_played_tracks.keys():
-                self.__already_played_tracks.pop(album)
-                self.__already_played_albums.append(album)
+        self.__update_deck()
+        for i in range(0, 2):
+            while self.__deck:
+                album_id = self.__deck[-1]
+                # Album removed from playback
+                if album_id not in self.__deck_albums:
+                    self.__deck.pop()
+                    continue
+                tracks = self.__album_decks.get(album_id, None)
+                if tracks is None:
+                    tracks = self.__get_album_tracks(album_id)
+                    random.shuffle(tracks)
+                    self.__album_decks[album_id] = tracks
+                played = self.__already_played_tracks.get(album_id, [])
+                while tracks:
+                    track = tracks[-1]
+                    # Ignore current track, not an issue if playing one
+                    # track in shuffle because LinearPlayer will handle
+                    # next()
+                    if track.id != App().player.current_track.id and\
+                            track.id not in played:
+                        return track
+                    tracks.pop()
+                self.__deck.pop()
+                if album_id in self.__already_played_tracks.keys():
+                    self.__already_played_tracks.pop(album_id)
+                self.__already_played_albums.append(album_id)
+            # Deal albums with tracks left again
+            self.__deck = [album_id for album_id in
+                           self.__deck_albums.elements()
+                           if self.__album_decks.get(album_id, True)]
+            random.shuffle(self.__deck)
         return Track()
 
+    def __reset_deck(self):
+        """
+            Forget dealt albums and tracks
+        """
+        # Album ids to deal, last one first
+        self.__deck = []
+        # Album ids known by deck => copies in playback
+        self.__deck_albums = Counter()
+        self.__deck_source = None
+        self.__deck_size = 0
+        # Tracks to deal for album ids
+        self.__album_decks = {}
+
+    def __commit_deal(self, track):
+        """
+            Remove track and its album from top of decks if dealt
+            @param track as Track
+        """
+        album_id = track.album.id
+        tracks = self.__album_decks.get(album_id, None)
+        if not self.__deck or self.__deck[-1] != album_id or\
+                not tracks or tracks[-1].id != track.id:
+            return
+        tracks.pop()
+        self.__deck.pop()
+
+    def __update_deck(self):
+        """
+            Add new playback albums to deck at random positions
+            An album in playback more than once (a clone with some of its
+            tracks) is dealt once per copy from the tracks of all copies
+        """
+        if self.__deck_source is self._albums and\
+                self.__deck_size == len(self._albums):
+            return
+        album_ids = Counter(self._albums.ids)
+        for (album_id, count) in album_ids.items():
+            previous = self.__deck_albums[album_id]
+            if count == previous:
+                continue
+            # Copies changed, tracks will be dealt from current copies
+            self.__album_decks.pop(album_id, None)
+            for i in range(previous, count):
+                # Fisher-Yates insertion keeps deck uniformly shuffled
+                self.__deck.append(album_id)
+                index = random.randint(0, len(self.__deck) - 1)
+                (self.__deck[index], self.__deck[-1]) =\
+                    (self.__deck[-1], self.__deck[index])
+        for album_id in self.__deck_albums.keys() - album_ids.keys():
+            self.__album_decks.pop(album_id, None)
+        self.__deck_albums = album_ids
+        self.__deck_source = self._albums
+        self.__deck_size = len(self._albums)
+
+    def __get_album_tracks(self, album_id):
+        """
+            Get tracks of all playback copies of album
+            @param album_id as int
+            @return [Track]
+        """
+        tracks = []
+        track_ids = set()
+        for position in self._albums.get_positions(album_id):
+            for track in self._albums[position].tracks:
+                if track.id not in track_ids:
+                    track_ids.add(track.id)
+                    tracks.append(track)
+        return tracks
+
     def __add_to_shuffle_history(self, track):
         """
             Add a track to shuffle history
             @param track as Track
         """
-        if track.album not in self.__already_played_tracks.keys():
-            self.__already_played_tracks[track.album] = []
-        if track not in self.__already_played_tracks[track.album]:
-            self.__already_played_tracks[track.album].append(track)
+        album_id = track.album.id
+        if album_id not in self.__already_played_tracks.keys():
+            self.__already_played_tracks[album_id] = set()
+        self.__already_played_tracks[album_id].add(track.id)
+
+    def __on_playlist_changed(self, player):
+        """
+            Update deck on next track
+            @param player as Player
+        """
+        self.__deck_source = None
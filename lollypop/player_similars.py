@@ -10,14 +10,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gio
+from gi.repository import Gio, GLib
 
 from random import shuffle
 
 from lollypop.objects import Album, Track
 from lollypop.logger import Logger
-from lollypop.define import App, Repeat
+from lollypop.define import App, Repeat, TaskPriority
 from lollypop.utils import get_network_available
+from lollypop.database_similars import SimilarsCache
+from lollypop.downloader import Downloader
 
 
 class SimilarsPlayer:
@@ -30,7 +32,13 @@ class SimilarsPlayer:
             Init player
         """
         self.__cancellable = Gio.Cancellable()
+        self.__similars = SimilarsCache()
+        self.__precomputing = False
         self.connect("next-changed", self.__on_next_changed)
+        App().settings.connect("changed::repeat",
+                               self.__on_similars_repeat_changed)
+        # Let startup finish before querying web services
+        GLib.timeout_add_seconds(60, self.__on_similars_repeat_changed)
 
 #######################
 # PRIVATE             #
@@ -80,6 +88,68 @@ class SimilarsPlayer:
                     similar_artist_ids.append(similar_artist_id)
         return similar_artist_ids
 
+    def __search_similar_artist_ids(self, artist_name):
+        """
+            Search similar artists on web services and cache local ones
+            @param artist_name as str
+            @return [int]/None if no web service available
+            @thread safe
+        """
+        artists = None
+        similar_artist_ids = []
+        if App().lastfm is not None and get_network_available("LASTFM"):
+            Downloader.wait_for_webservice("Last.fm")
+            artists = App().lastfm.get_similar_artists(artist_name,
+                                                       self.__cancellable)
+            similar_artist_ids = self.__get_artist_ids(artists)
+            if similar_artist_ids:
+                Logger.info("Found similar artists via Last.fm")
+        # Also when similar artists are not in collection
+        if not similar_artist_ids and get_network_available("SPOTIFY"):
+            Downloader.wait_for_webservice("Spotify")
+            spotify_id = App().spotify.get_artist_id_sync(artist_name,
+                                                          self.__cancellable)
+            artists = []
+            if spotify_id is not None:
+                Downloader.wait_for_webservice("Spotify")
+                artists = App().spotify.get_similar_artists(
+                    spotify_id, self.__cancellable)
+            similar_artist_ids = self.__get_artist_ids(artists)
+            if similar_artist_ids:
+                Logger.info("Found similar artists via Spotify")
+        if artists is None or self.__cancellable.is_cancelled():
+            return None
+        self.__similars.add(artist_name, similar_artist_ids)
+        return similar_artist_ids
+
+    def __precompute_similars(self):
+        """
+            Cache similar artists for collection artists
+            @thread safe
+        """
+        cached = self.__similars.get_names()
+        for artist_id in App().artists.get_ids():
+            if App().settings.get_enum("repeat") != Repeat.AUTO or\
+                    self.__cancellable.is_cancelled():
+                break
+            artist_name = App().artists.get_name(artist_id)
+            if artist_name is None or artist_name.lower() in cached:
+                continue
+            if self.__search_similar_artist_ids(artist_name) is None:
+                break
+
+    def __add_similar(self, similar_artist_ids):
+        """
+            Add an album or a track from similar artists
+            @param similar_artist_ids as [int]
+        """
+        if not similar_artist_ids:
+            return
+        if self.albums:
+            self.__add_a_new_album(similar_artist_ids)
+        else:
+            self.__add_a_new_track(similar_artist_ids)
+
     def __on_next_changed(self, player):
         """
             Add a new album if playback finished and wanted by user
@@ -89,58 +159,30 @@ class SimilarsPlayer:
                 player.next_track.id is None and\
                 player.current_track.id is not None and\
                 player.current_track.id >= 0 and\
-                Gio.NetworkMonitor.get_default().get_network_available() and\
                 player.current_track.artist_ids:
             artist_id = player.current_track.artist_ids[0]
             artist_name = App().artists.get_name(artist_id)
-            if App().lastfm is not None and get_network_available("LASTFM"):
-                App().task_helper.run(
-                              App().lastfm.get_similar_artists,
-                              artist_name, self.__cancellable,
-                              callback=(self.__on_lastfm_similar_artists,))
-            elif get_network_available("SPOTIFY"):
-                App().spotify.get_artist_id(artist_name,
-                                            self.__on_get_spotify_artist_id)
+            similar_artist_ids = self.__similars.get(artist_name)
+            if similar_artist_ids is not None:
+                self.__add_similar(similar_artist_ids)
+            elif Gio.NetworkMonitor.get_default().get_network_available():
+                App().task_helper.run(self.__search_similar_artist_ids,
+                                      artist_name,
+                                      callback=(self.__add_similar,))
 
-    def __on_get_spotify_artist_id(self, artist_id):
+    def __on_similars_repeat_changed(self, *ignore):
         """
-            Get similars
-            @param artist_id as str
-        """
-        if artist_id is None:
-            return
-        App().task_helper.run(App().spotify.get_similar_artists,
-                              artist_id, self.__cancellable,
-                              callback=(self.__on_spotify_similar_artists,))
-
-    def __on_lastfm_similar_artists(self, artists):
+            Precompute similar artists if needed
         """
-            Add one album or run a Spotify search if none
-            @param artists as [str]
-        """
-        similar_artist_ids = self.__get_artist_ids(artists)
-        if not similar_artist_ids:
-            if self.current_track.artist_ids:
-                artist_id = self.current_track.artist_ids[0]
-                artist_name = App().artists.get_name(artist_id)
-                App().spotify.get_artist_id(artist_name,
-                                            self.__on_get_spotify_artist_id)
-        else:
-            Logger.info("Found a similar artist via Last.fm")
-            if self.albums:
-                self.__add_a_new_album(similar_artist_ids)
-            else:
-                self.__add_a_new_track(similar_artist_ids)
+        if App().settings.get_enum("repeat") == Repeat.AUTO and\
+                not self.__precomputing:
+            self.__precomputing = True
+            App().task_helper.run(self.__precompute_similars,
+                                  priority=TaskPriority.DOWNLOAD,
+                                  callback=(self.__on_similars_precomputed,))
 
-    def __on_spotify_similar_artists(self, artists):
+    def __on_similars_precomputed(self, *ignore):
         """
-            Add one album
-            @param artists as [str]
+            Allow a new precomputation
         """
-        similar_artist_ids = self.__get_artist_ids(artists)
-        if similar_artist_ids:
-            Logger.info("Found similar artists via Spotify:")
-            if self.albums:
-                self.__add_a_new_album(similar_artist_ids)
-            else:
-                self.__add_a_new_track(similar_artist_ids)
+        self.__precomputing = False
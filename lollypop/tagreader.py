@@ -430,6 +430,23 @@ class TagReader(Discoverer):
             pass
         return None
 
+    def get_replaygain(self, tags):
+        """
+            Get track ReplayGain from tags
+            @param tags as Gst.TagList
+            @return (gain as float, peak as float/None)/None
+        """
+        try:
+            if tags is not None:
+                (exists, gain) = tags.get_double_index(Gst.TAG_TRACK_GAIN, 0)
+                if exists:
+                    (exists, peak) = tags.get_double_index(
+                        Gst.TAG_TRACK_PEAK, 0)
+                    return (gain, peak if exists else None)
+        except:
+            pass
+        return None
+
     def get_popm(self, tags):
         """
             Get popularity tag
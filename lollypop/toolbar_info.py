@@ -18,6 +18,8 @@ from lollypop.logger import Logger
 from lollypop.widgets_utils import Popover
 from lollypop.controller_information import InformationController
 from lollypop.define import App, Type, ArtBehaviour
+from lollypop.objects import Track
+from lollypop.information_store import InformationStore
 
 
 class ToolbarInfo(Gtk.Bin, InformationController):
@@ -25,6 +27,9 @@ class ToolbarInfo(Gtk.Bin, InformationController):
         Informations toolbar
     """
 
+    # Queued tracks to prefetch information for
+    __PREFETCH_SIZE = 10
+
     def __init__(self):
         """
             Init toolbar
@@ -38,6 +43,7 @@ class ToolbarInfo(Gtk.Bin, InformationController):
         builder.connect_signals(self)
         self.__timeout_id = None
         self.__width = 0
+        self.__information_store = InformationStore()
 
         self._infobox = builder.get_object("info")
         self.add(self._infobox)
@@ -105,6 +111,7 @@ class ToolbarInfo(Gtk.Bin, InformationController):
             InformationController.on_current_changed(self,
                                                      self.__art_size,
                                                      None)
+        self.__prefetch_information(player)
 
     @property
     def art_size(self):
@@ -146,6 +153,27 @@ class ToolbarInfo(Gtk.Bin, InformationController):
 #######################
 # PRIVATE             #
 #######################
+    def __prefetch_information(self, player):
+        """
+            Cache information for current, next and queued artists
+            @param player as Player
+        """
+        if player.current_track.id is None or player.current_track.id < 0:
+            return
+        artist_ids = []
+        tracks = [player.current_track, player.next_track]
+        tracks += [Track(track_id) for track_id in
+                   player.queue[:self.__PREFETCH_SIZE]]
+        for track in tracks:
+            if track.id is None or track.id < 0:
+                continue
+            for artist_id in track.album.artist_ids[:1]:
+                if artist_id >= 0 and artist_id not in artist_ids:
+                    artist_ids.append(artist_id)
+        artists = [App().artists.get_name(artist_id)
+                   for artist_id in artist_ids]
+        self.__information_store.cache_artists_info(artists)
+
     def __update_cover(self, art, album_id):
         """
             Update cover for album_id
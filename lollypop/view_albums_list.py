@@ -535,13 +535,14 @@ class AlbumsListView(LazyLoadingView, ViewController):
     def populate(self, albums):
         """
             Populate widget with album rows
-            @param albums as [Album]
+            Albums are read one by one, LazyAlbums only create added ones
+            @param albums as [Album]/LazyAlbums
         """
         if albums:
             self._lazy_queue = []
             for child in self._box.get_children():
                 GLib.idle_add(child.destroy)
-            self.__add_albums(list(albums))
+            self.__add_albums(iter(albums))
         else:
             LazyLoadingView.populate(self)
 
@@ -700,13 +701,13 @@ class AlbumsListView(LazyLoadingView, ViewController):
     def __add_albums(self, albums, previous_row=None):
         """
             Add items to the view
-            @param albums ids as [Album]
+            @param albums as iterator of Album
             @param previous_row as AlbumRow
         """
         if self._lazy_queue is None or self._viewport is None:
             return
-        if albums:
-            album = albums.pop(0)
+        album = next(albums, None)
+        if album is not None:
             row = self.__row_for_album(album, album in self.__reveals)
             row.set_previous_row(previous_row)
             if previous_row is not None:
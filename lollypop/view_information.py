@@ -192,7 +192,9 @@ class InformationView(BaseView, Gtk.Bin):
                                     escape(self.__artist_name))
         f = Gio.File.new_for_uri(uri)
         if not f.query_exists():
-            f.replace_contents(b"", None, False,
+            content = self.__information_store.get_information(
+                self.__artist_name)
+            f.replace_contents(content or b"", None, False,
                                Gio.FileCreateFlags.NONE, None)
         Gtk.show_uri_on_window(App().window,
                                uri,
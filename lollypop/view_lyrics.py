@@ -79,6 +79,8 @@ class LyricsView(View, InformationController):
         Show lyrics for track
     """
 
+    __LYRICS_PATH = GLib.get_user_data_dir() + "/lollypop/lyrics"
+
     def __init__(self):
         """
             Init view
@@ -91,6 +93,7 @@ class LyricsView(View, InformationController):
         self.__current_changed_id = None
         self.__size_allocate_timeout_id = None
         self.__lyrics_timeout_id = None
+        self.__lyrics_index = None
         self.__downloads_running = 0
         self.__lyrics_text = ""
         self.__size = 0
@@ -124,9 +127,10 @@ class LyricsView(View, InformationController):
         self.__update_lyrics_style()
         if self.__sync_lyrics_helper.available:
             self.__translate_button.hide()
+            self.__lyrics_index = None
             if self.__lyrics_timeout_id is None:
                 self.__lyrics_timeout_id = GLib.timeout_add(
-                    500, self.__show_sync_lyrics)
+                    100, self.__show_sync_lyrics)
             return
         else:
             self.__translate_button.show()
@@ -143,6 +147,8 @@ class LyricsView(View, InformationController):
         if info is not None:
             tags = info.get_tags()
             self.__lyrics_text = reader.get_lyrics(tags)
+        if not self.__lyrics_text:
+            self.__lyrics_text = self.__get_saved_lyrics()
         if self.__lyrics_text:
             self.__lyrics_label.set_text(self.__lyrics_text)
         else:
@@ -198,6 +204,11 @@ class LyricsView(View, InformationController):
             Show sync lyrics for track
         """
         timestamp = App().player.position / 1000000
+        # Only update label when current line changes
+        index = self.__sync_lyrics_helper.get_index_for_timestamp(timestamp)
+        if index == self.__lyrics_index:
+            return True
+        self.__lyrics_index = index
         (previous, current, next) =\
             self.__sync_lyrics_helper.get_lyrics_for_timestamp(timestamp)
         lyrics = ""
@@ -302,6 +313,57 @@ class LyricsView(View, InformationController):
                                 "song_body-lyrics",
                                 "")
 
+    def __get_lyrics_file(self):
+        """
+            Get file for downloaded lyrics
+            @return Gio.File/None
+        """
+        if self.__current_track.id is None or\
+                self.__current_track.id < 0:
+            return None
+        if self.__current_track.artists:
+            artist = self.__current_track.artists[0]
+        elif self.__current_track.album_artists:
+            artist = self.__current_track.album_artists[0]
+        else:
+            artist = ""
+        filename = escape("%s_%s" % (artist, self.__current_track.name))
+        return Gio.File.new_for_path("%s/%s.txt" % (self.__LYRICS_PATH,
+                                                    filename))
+
+    def __get_saved_lyrics(self):
+        """
+            Get previously downloaded lyrics
+            @return str
+        """
+        try:
+            f = self.__get_lyrics_file()
+            if f is not None and f.query_exists():
+                (status, content, tag) = f.load_contents()
+                if status:
+                    return content.decode("utf-8")
+        except Exception as e:
+            Logger.error("LyricsView::__get_saved_lyrics(): %s", e)
+        return ""
+
+    def __save_lyrics(self, lyrics):
+        """
+            Save downloaded lyrics
+            @param lyrics as str
+        """
+        try:
+            f = self.__get_lyrics_file()
+            if f is None:
+                return
+            d = f.get_parent()
+            if not d.query_exists():
+                d.make_directory_with_parents()
+            f.replace_contents(lyrics.encode("utf-8"), None, False,
+                               Gio.FileCreateFlags.REPLACE_DESTINATION,
+                               None)
+        except Exception as e:
+            Logger.error("LyricsView::__save_lyrics(): %s", e)
+
     def __update_lyrics_style(self):
         """
             Update lyrics style based on current view width
@@ -373,6 +435,7 @@ class LyricsView(View, InformationController):
                 self.__lyrics_text = soup.find_all(
                     "div", class_=cls)[0].get_text(separator=separator)
                 self.__lyrics_label.set_text(self.__lyrics_text)
+                self.__save_lyrics(self.__lyrics_text)
             except Exception as e:
                 Logger.warning("LyricsView::__on_lyrics_downloaded(): %s", e)
         if not self.__lyrics_text and self.__downloads_running == 0:
@@ -177,7 +177,8 @@ class QueueView(View):
         if down:
             position += 1
         self.__view.insert(new_row, position)
-        App().player.insert_in_queue(new_row.track.id, position)
+        App().player.insert_in_queue(new_row.track.id, position, True,
+                                     new_row.track.album.id)
         if down:
             new_row.set_previous_row(row)
             new_row.set_next_row(row.next_row)
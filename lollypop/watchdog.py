@@ -0,0 +1,228 @@
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sys
+import json
+from time import monotonic, time, strftime, localtime
+from threading import Thread, Lock, Event, main_thread
+from traceback import format_stack
+from functools import wraps
+
+from lollypop.define import App, LOLLYPOP_DATA_PATH
+from lollypop.logger import Logger
+
+
+def traced(method):
+    """
+        Trace method duration when watchdog is running
+        @param method as function
+        @return function
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if not Watchdog.tracing:
+            return method(*args, **kwargs)
+        start = monotonic()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            App().watchdog.add_trace(method.__qualname__,
+                                     monotonic() - start)
+    return wrapper
+
+
+class Watchdog:
+    """
+        Detect main loop stalls and record main thread stack
+        Main loop ticks a high frequency timeout, a thread checks ticks
+        are not late. Stalls and slow traced calls go to a log file
+    """
+    # True if traced methods should be timed
+    tracing = False
+    __LOG_PATH = "%s/watchdog.log" % LOLLYPOP_DATA_PATH
+    # Main loop tick in ms
+    __INTERVAL = 20
+    # Stall threshold in seconds
+    __THRESHOLD = 0.2
+    # Kept stalls in report
+    __MAX_STALLS = 50
+
+    def __init__(self):
+        """
+            Init watchdog, start it if enabled
+        """
+        self.__lock = Lock()
+        self.__stop_event = None
+        self.__timeout_id = None
+        self.__last_tick = 0
+        self.__max_latency = 0
+        self.__ticks = 0
+        self.__late_ticks = 0
+        # [{time, duration, stack}]
+        self.__stalls = []
+        # Stall currently blocking main loop
+        self.__stall = None
+        # name => [count, total, max]
+        self.__traces = {}
+        # Lines waiting to be written to log file
+        self.__pending_lines = []
+        App().settings.connect("changed::watchdog",
+                               self.__on_watchdog_changed)
+        if App().settings.get_value("watchdog"):
+            self.start()
+
+    def start(self):
+        """
+            Start watchdog
+        """
+        if self.__stop_event is not None:
+            return
+        Logger.info("Watchdog: logging to %s", self.__LOG_PATH)
+        self.__last_tick = monotonic()
+        self.__stop_event = Event()
+        self.__timeout_id = GLib.timeout_add(self.__INTERVAL, self.__on_tick)
+        thread = Thread(target=self.__watch, args=(self.__stop_event,))
+        thread.daemon = True
+        thread.start()
+        Watchdog.tracing = True
+
+    def stop(self):
+        """
+            Stop watchdog
+        """
+        if self.__stop_event is None:
+            return
+        Watchdog.tracing = False
+        GLib.source_remove(self.__timeout_id)
+        self.__timeout_id = None
+        self.__stop_event.set()
+        self.__stop_event = None
+
+    def add_trace(self, name, duration):
+        """
+            Add a traced call duration
+            @param name as str
+            @param duration as float (seconds)
+        """
+        with self.__lock:
+            if name in self.__traces.keys():
+                trace = self.__traces[name]
+                trace[0] += 1
+                trace[1] += duration
+                trace[2] = max(trace[2], duration)
+            else:
+                self.__traces[name] = [1, duration, duration]
+            if duration >= self.__THRESHOLD:
+                self.__pending_lines.append(
+                    "%s SLOW %s: %.3fs\n" % (self.__get_date(),
+                                             name, duration))
+
+    def get_report(self):
+        """
+            Get watchdog report
+            @return str (JSON)
+        """
+        with self.__lock:
+            traces = {}
+            for (name, (count, total, maximum)) in self.__traces.items():
+                traces[name] = {"count": count,
+                                "average": total / count,
+                                "max": maximum}
+            report = {"enabled": self.__stop_event is not None,
+                      "log": self.__LOG_PATH,
+                      "ticks": self.__ticks,
+                      "late_ticks": self.__late_ticks,
+                      "max_latency": self.__max_latency,
+                      "stalls": list(self.__stalls),
+                      "traces": traces}
+        return json.dumps(report)
+
+#######################
+# PRIVATE             #
+#######################
+    def __watch(self, stop_event):
+        """
+            Check main loop ticks, write log file
+            @param stop_event as threading.Event
+            @thread safe
+        """
+        main_ident = main_thread().ident
+        while not stop_event.wait(self.__INTERVAL / 1000):
+            with self.__lock:
+                late = monotonic() - self.__last_tick
+                if late >= self.__THRESHOLD and self.__stall is None:
+                    frame = sys._current_frames().get(main_ident)
+                    stack = "".join(format_stack(frame)) if frame else ""
+                    self.__stall = {"time": time(),
+                                    "duration": late,
+                                    "stack": stack}
+                lines = self.__pending_lines
+                self.__pending_lines = []
+            self.__write(lines)
+
+    def __write(self, lines):
+        """
+            Append lines to log file
+            @param lines as [str]
+        """
+        if not lines:
+            return
+        try:
+            with open(self.__LOG_PATH, "a") as f:
+                f.writelines(lines)
+        except Exception as e:
+            Logger.error("Watchdog::__write(): %s", e)
+
+    def __get_date(self, timestamp=None):
+        """
+            Get date for log file
+            @param timestamp as float
+            @return str
+        """
+        return strftime("%Y-%m-%d %H:%M:%S", localtime(timestamp))
+
+    def __on_tick(self):
+        """
+            Measure main loop latency, finish stall if any
+            @return bool
+        """
+        with self.__lock:
+            now = monotonic()
+            latency = max(0, now - self.__last_tick - self.__INTERVAL / 1000)
+            self.__last_tick = now
+            self.__ticks += 1
+            self.__max_latency = max(self.__max_latency, latency)
+            if latency >= self.__THRESHOLD:
+                self.__late_ticks += 1
+            if self.__stall is not None:
+                stall = self.__stall
+                self.__stall = None
+                stall["duration"] = latency
+                self.__stalls.append(stall)
+                self.__stalls = self.__stalls[-self.__MAX_STALLS:]
+                self.__pending_lines.append(
+                    "%s STALL %.3fs\n%s\n" % (self.__get_date(stall["time"]),
+                                              latency, stall["stack"]))
+        return True
+
+    def __on_watchdog_changed(self, settings, value):
+        """
+            Start/stop watchdog
+            @param settings as Gio.Settings
+            @param value as GLib.Variant
+        """
+        if App().settings.get_value("watchdog"):
+            self.start()
+        else:
+            self.stop()
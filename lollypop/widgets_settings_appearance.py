@@ -12,6 +12,8 @@
 
 from gi.repository import Gtk, GLib
 
+from gettext import gettext as _
+
 from lollypop.define import App
 
 
@@ -62,6 +64,8 @@ class AppearanceSettingsWidget(Gtk.Bin):
         scale_coversize.set_range(170, 300)
         scale_coversize.set_value(
             App().settings.get_value("cover-size").get_int32())
+        self.__cache_label = builder.get_object("cache_label")
+        self.__update_cache_label()
         self.add(builder.get_object("widget"))
         builder.connect_signals(self)
 
@@ -158,7 +162,8 @@ class AppearanceSettingsWidget(Gtk.Bin):
             Clean artwork cache
             @param button as Gtk.Button
         """
-        App().task_helper.run(App().art.clean_all_cache)
+        App().task_helper.run(App().art.clean_all_cache,
+                              callback=(self.__update_cache_label,))
         button.set_sensitive(False)
 
 #######################
@@ -175,3 +180,25 @@ class AppearanceSettingsWidget(Gtk.Bin):
         App().settings.set_value("cover-size", GLib.Variant("i", value))
         App().art.update_art_size()
         App().window.container.reload_view()
+
+    def __update_cache_label(self, *ignore):
+        """
+            Update artwork cache statistics
+        """
+        App().task_helper.run(App().art.get_cache_stats,
+                              callback=(self.__on_cache_stats,))
+
+    def __on_cache_stats(self, stats):
+        """
+            Show artwork cache statistics
+            @param stats as (int, float)
+        """
+        (size, rate) = stats
+        budget = App().settings.get_value("cover-cache-size").get_int32()
+        if budget > 0:
+            limit = GLib.format_size(budget * 1024 * 1024)
+        else:
+            limit = _("no limit")
+        self.__cache_label.set_text(
+            _("Artwork cache: %s of %s, %d%% hit rate") % (
+                GLib.format_size(size), limit, rate * 100))
@@ -43,6 +43,10 @@ class BehaviourSettingsWidget(Gtk.Bin):
         switch_import = builder.get_object("switch_import")
         switch_import.set_state(App().settings.get_value("import-playlists"))
 
+        switch_replaygain = builder.get_object("switch_replaygain")
+        switch_replaygain.set_state(
+            App().settings.get_value("analyze-replaygain"))
+
         switch_network_access = builder.get_object("switch_network_access")
         network_access = App().settings.get_value("network-access")
         switch_network_access.set_state(network_access)
@@ -67,6 +71,9 @@ class BehaviourSettingsWidget(Gtk.Bin):
         self.__scale_transition_duration.set_range(1, 20)
         self.__scale_transition_duration.set_value(
             App().settings.get_value("transition-duration").get_int32())
+        combo_transition_curve = builder.get_object("combo_transition_curve")
+        combo_transition_curve.set_active(
+            App().settings.get_enum("transition-curve"))
 
         self.__popover_network = builder.get_object("popover-network")
         switch_network_access = builder.get_object("switch_network_access")
@@ -149,6 +156,19 @@ class BehaviourSettingsWidget(Gtk.Bin):
         App().settings.set_value("import-playlists",
                                  GLib.Variant("b", state))
 
+    def _on_switch_replaygain_state_set(self, widget, state):
+        """
+            Update ReplayGain analysis setting
+            @param widget as Gtk.Switch
+            @param state as bool
+        """
+        App().settings.set_value("analyze-replaygain",
+                                 GLib.Variant("b", state))
+        if state:
+            App().replaygain_analyzer.start()
+        else:
+            App().replaygain_analyzer.stop()
+
     def _on_transitions_button_clicked(self, widget):
         """
             Show popover
@@ -193,6 +213,13 @@ class BehaviourSettingsWidget(Gtk.Bin):
         App().settings.set_value("transition-duration",
                                  GLib.Variant("i", value))
 
+    def _on_combo_transition_curve_changed(self, widget):
+        """
+            Update transition curve setting
+            @param widget as Gtk.ComboBoxText
+        """
+        App().settings.set_enum("transition-curve", widget.get_active())
+
     def _on_switch_artwork_tags_state_set(self, widget, state):
         """
             Update artwork in tags setting
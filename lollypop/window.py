@@ -15,7 +15,7 @@ from gi.repository import Gtk, Gio, Gdk, GLib
 from gettext import gettext as _
 
 from lollypop.container import Container
-from lollypop.define import App, Sizing, Type, ScanType
+from lollypop.define import App, Sizing, Type, ScanType, TaskPriority
 from lollypop.toolbar import Toolbar
 from lollypop.logger import Logger
 from lollypop.adaptive import AdaptiveWindow
@@ -282,7 +282,8 @@ class Window(Gtk.ApplicationWindow, AdaptiveWindow):
                     uris.append(uri)
             if uris:
                 App().task_helper.run(importer.add, uris,
-                                      callback=(App().scanner.update,))
+                                      callback=(App().scanner.update,),
+                                      priority=TaskPriority.BACKGROUND)
         except:
             pass
 
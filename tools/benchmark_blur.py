@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Micro-benchmark for artwork blur
+
+    Compare blurring at full size (previous BaseArt._get_blur()) with
+    downscaling, blurring with a smaller radius and upscaling back
+    (current BaseArt._get_blur()). Only PIL is needed, GdkPixbuf scaling
+    is replaced by PIL resampling with the same filters.
+        $ ./tools/benchmark_blur.py --size 1920x400 --runs 10
+        $ ./tools/benchmark_blur.py --image cover.jpg
+
+    Mean difference is the average absolute channel difference (0-255)
+    between both results, it should stay small for the same visual result.
+"""
+
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+from time import perf_counter
+import argparse
+import random
+
+# Same value as BaseArt._BLUR_RADIUS
+BLUR_RADIUS = 8
+# Gaussian values used by ArtBehaviour.BLUR/BLUR_HARD/BLUR_MAX
+GAUSSIANS = [25, 50, 100]
+
+
+def get_source(path, width, height):
+    """
+        Get source image, random blocks if no path
+        @param path as str/None
+        @param width as int
+        @param height as int
+        @return PIL.Image
+    """
+    if path is not None:
+        return Image.open(path).convert("RGB")
+    # Random blocks keep sharp edges like real artwork, unlike noise
+    random.seed(0)
+    small = Image.new("RGB", (32, 32))
+    small.putdata([(random.randrange(256),
+                    random.randrange(256),
+                    random.randrange(256)) for i in range(32 * 32)])
+    return small.resize((width, height), Image.NEAREST)
+
+
+def blur_full(image, gaussian, width, height):
+    """
+        Blur at wanted size
+        @param image as PIL.Image
+        @param gaussian as int
+        @param width as int
+        @param height as int
+        @return PIL.Image
+    """
+    image = image.resize((width, height), Image.NEAREST)
+    return image.filter(ImageFilter.GaussianBlur(gaussian))
+
+
+def blur_downscaled(image, gaussian, width, height):
+    """
+        Downscale, blur with equivalent radius, upscale to wanted size
+        @param image as PIL.Image
+        @param gaussian as int
+        @param width as int
+        @param height as int
+        @return PIL.Image
+    """
+    factor = max(1, gaussian / BLUR_RADIUS)
+    small_width = max(1, int(width / factor))
+    small_height = max(1, int(height / factor))
+    image = image.resize((small_width, small_height), Image.BILINEAR)
+    image = image.filter(ImageFilter.GaussianBlur(gaussian / factor))
+    if small_width != width or small_height != height:
+        image = image.resize((width, height), Image.BILINEAR)
+    return image
+
+
+def get_duration(method, image, gaussian, width, height, runs):
+    """
+        Get best duration of runs
+        @param method as function
+        @param image as PIL.Image
+        @param gaussian as int
+        @param width as int
+        @param height as int
+        @param runs as int
+        @return (float, PIL.Image)
+    """
+    best = None
+    for i in range(runs):
+        start = perf_counter()
+        result = method(image, gaussian, width, height)
+        duration = perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return (best, result)
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark Lollypop artwork blur")
+    parser.add_argument("--image", default=None,
+                        help="source image, random blocks if not set")
+    parser.add_argument("--size", default="1920x400",
+                        help="wanted size, WIDTHxHEIGHT")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="runs per measure, best one is kept")
+    args = parser.parse_args()
+    (width, height) = [int(value) for value in args.size.split("x")]
+    image = get_source(args.image, width, height)
+    print("%sx%s, best of %s runs" % (width, height, args.runs))
+    print("%8s %10s %12s %8s %10s" % ("gaussian", "full (ms)",
+                                      "downscaled", "speedup", "mean diff"))
+    for gaussian in GAUSSIANS:
+        (full, full_image) = get_duration(blur_full, image, gaussian,
+                                          width, height, args.runs)
+        (downscaled, downscaled_image) = get_duration(blur_downscaled,
+                                                      image, gaussian,
+                                                      width, height,
+                                                      args.runs)
+        diff = ImageChops.difference(full_image, downscaled_image)
+        mean = sum(ImageStat.Stat(diff).mean) / 3
+        print("%8s %10.1f %12.1f %7.1fx %10.2f" % (gaussian,
+                                                   full * 1000,
+                                                   downscaled * 1000,
+                                                   full / downscaled,
+                                                   mean))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2019 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Local stub for web services used by Lollypop
+
+    Run it, then start Lollypop with requests sent to it:
+        $ ./tools/web_services_stub.py --port 8000 --delay 0.5
+        $ LOLLYPOP_WEB_SERVICES_URI=http://localhost:8000 lollypop
+
+    Lollypop requests https://host/path?query as /host/path?query.
+    Answers are files in the fixtures directory:
+        host/path.json              default answer
+        host/path@key=value.json    answer when query has key=value
+        host/_/path.json            "_" matches any path segment
+    A trailing slash in path is ignored. Paths without fixture get a 404.
+
+    Knobs simulate slow or failing services, optionally for some hosts:
+        --delay/--jitter            answer latency in seconds
+        --error-rate/--error-status random server errors
+        --rate/--burst              per host rate limit, then 429 answers
+        --retry-after               Retry-After header of 429 answers
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+from threading import Lock
+from time import time, sleep
+import argparse
+import random
+import os
+
+
+class TokenBucket:
+    """
+        Per host rate limit
+    """
+
+    def __init__(self, rate, burst):
+        """
+            Init bucket
+            @param rate as float (requests per second)
+            @param burst as int
+        """
+        self.__rate = rate
+        self.__burst = burst
+        self.__tokens = burst
+        self.__last = time()
+        self.__lock = Lock()
+
+    def take(self):
+        """
+            Take a token
+            @return bool
+            @thread safe
+        """
+        with self.__lock:
+            now = time()
+            self.__tokens = min(self.__burst,
+                                self.__tokens +
+                                (now - self.__last) * self.__rate)
+            self.__last = now
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return True
+            return False
+
+
+class FixtureStore:
+    """
+        Find fixture files for requests
+    """
+
+    def __init__(self, path):
+        """
+            Init store
+            @param path as str
+        """
+        self.__path = path
+
+    def get(self, segments, query):
+        """
+            Get fixture path for request
+            @param segments as [str] (host then path)
+            @param query as [(str, str)]
+            @return str/None
+        """
+        return self.__find(self.__path, segments, dict(query))
+
+    def __find(self, directory, segments, query):
+        """
+            Find fixture matching segments in directory
+            @param directory as str
+            @param segments as [str]
+            @param query as {str: str}
+            @return str/None
+        """
+        if not os.path.isdir(directory):
+            return None
+        segment = segments[0]
+        names = [segment, "_"]
+        if len(segments) > 1:
+            for name in names:
+                path = self.__find(os.path.join(directory, name),
+                                   segments[1:], query)
+                if path is not None:
+                    return path
+            return None
+        for name in names:
+            default = None
+            for filename in sorted(os.listdir(directory)):
+                (base, ext) = os.path.splitext(filename)
+                (base, sep, selector) = base.partition("@")
+                if base != name:
+                    continue
+                if not sep:
+                    default = filename
+                elif all(query.get(key) == value for (key, value) in
+                         parse_qsl(selector.replace(",", "&"))):
+                    return os.path.join(directory, filename)
+            if default is not None:
+                return os.path.join(directory, default)
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+        Answer requests from fixtures
+    """
+    # Set by main()
+    options = None
+    fixtures = None
+    buckets = {}
+    buckets_lock = Lock()
+    content_types = {".json": "application/json",
+                     ".png": "image/png",
+                     ".jpg": "image/jpeg",
+                     ".xml": "application/xml",
+                     ".html": "text/html",
+                     ".txt": "text/plain"}
+
+    def do_GET(self):
+        """
+            Answer GET request
+        """
+        self.__answer()
+
+    def do_POST(self):
+        """
+            Answer POST request, body is ignored
+        """
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.__answer()
+
+    def __answer(self):
+        """
+            Send fixture or simulated failure
+        """
+        split = urlsplit(self.path)
+        segments = [segment for segment in split.path.split("/") if segment]
+        if not segments:
+            self.__send(404, b"")
+            return
+        host = segments[0]
+        options = self.options
+        knobs = not options.host or host in options.host
+        if knobs and options.delay + options.jitter > 0:
+            sleep(options.delay + random.uniform(0, options.jitter))
+        if knobs and options.rate > 0 and not self.__get_bucket(host).take():
+            self.__send(429, b"",
+                        {"Retry-After": str(options.retry_after)})
+            return
+        if knobs and random.random() < options.error_rate:
+            self.__send(options.error_status, b"")
+            return
+        path = self.fixtures.get(segments, parse_qsl(split.query))
+        if path is None:
+            self.__send(404, b"")
+            return
+        with open(path, "rb") as f:
+            content = f.read()
+        content_type = self.content_types.get(os.path.splitext(path)[1],
+                                              "application/octet-stream")
+        self.__send(200, content, {"Content-Type": content_type})
+
+    def __get_bucket(self, host):
+        """
+            Get rate limit for host
+            @param host as str
+            @return TokenBucket
+        """
+        with self.buckets_lock:
+            if host not in self.buckets.keys():
+                self.buckets[host] = TokenBucket(self.options.rate,
+                                                 self.options.burst)
+            return self.buckets[host]
+
+    def __send(self, status, content, headers={}):
+        """
+            Send answer
+            @param status as int
+            @param content as bytes
+            @param headers as {str: str}
+        """
+        self.send_response(status)
+        for (name, value) in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        # Lollypop HTTP cache must not hide knobs changes
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def main():
+    """
+        Run stub server
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(
+        description="Local stub for Lollypop web services")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fixtures",
+                        default=os.path.join(directory,
+                                             "web_services_fixtures"),
+                        help="fixtures directory")
+    parser.add_argument("--delay", type=float, default=0,
+                        help="seconds before answering")
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="random seconds added to delay")
+    parser.add_argument("--error-rate", type=float, default=0,
+                        help="fraction of requests failing (0-1)")
+    parser.add_argument("--error-status", type=int, default=503,
+                        help="HTTP status of failing requests")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="requests per second allowed by host, "
+                             "0 for no limit")
+    parser.add_argument("--burst", type=int, default=1,
+                        help="requests allowed at once by host")
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After seconds of 429 answers")
+    parser.add_argument("--host", action="append", default=[],
+                        help="only apply knobs to this host, repeatable")
+    StubHandler.options = parser.parse_args()
+    StubHandler.fixtures = FixtureStore(StubHandler.options.fixtures)
+    server = ThreadingHTTPServer(("localhost", StubHandler.options.port),
+                                 StubHandler)
+    print("Serving %s on http://localhost:%s" % (
+        StubHandler.options.fixtures, StubHandler.options.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()